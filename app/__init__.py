@@ -1,49 +1,120 @@
+import time
 from flask import Flask, redirect, url_for
-from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
-from flask_bcrypt import Bcrypt
-from flask_jwt_extended import JWTManager
-from flask_migrate import Migrate
+from werkzeug.middleware.proxy_fix import ProxyFix
 from config import Config
+from .lazy import LazyExtension
+from .routing import RoutingSQLAlchemy, ReplicaRouter
+from .cache import FragmentCache
+from .identity import IdentityCache
+from .search import SearchIndex
+from .passwords import PasswordHasher
+from .metrics import Metrics
+from .jobs import JobQueue
+from .writer import GroupCommitWriter
+from .http_cache import HttpCache
+from .ratelimit import RateLimiter
 
-db = SQLAlchemy()
-migrate = Migrate()
+db = RoutingSQLAlchemy()
+# Flask-Migrate (y Alembic) solo se importan al usar `flask db`; JWT al
+# usarse por primera vez (como tarde, antes de la primera petición)
+migrate = LazyExtension('flask_migrate:Migrate', key='migrate')
 login_manager = LoginManager()
-bcrypt = Bcrypt()
-jwt = JWTManager()
+jwt = LazyExtension('flask_jwt_extended:JWTManager', key='flask-jwt-extended',
+                    before_serving=True)
+fragment_cache = FragmentCache()
+identity_cache = IdentityCache()
+search_index = SearchIndex()
+password_hasher = PasswordHasher()
+metrics = Metrics()
+jobs = JobQueue()
+group_commit = GroupCommitWriter()
+http_cache = HttpCache()
+rate_limiter = RateLimiter()
+replica_router = ReplicaRouter()
 
 
 def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
+    # Lo que tarda cada paso se guarda para `flask startup-profile`
+    app.extensions['startup_timings'] = {}
 
+    _trust_proxies(app)
     _init_extensions(app)
-    _register_blueprints(app)
+    _timed(app, 'blueprints', _register_blueprints, app)
     _register_login_manager(app)
+    _register_commands(app)
+    _timed(app, 'tasks', _register_tasks)
 
     return app
 
 
+def _timed(app, name, func, *args):
+    start = time.perf_counter()
+    func(*args)
+    app.extensions['startup_timings'][name] = time.perf_counter() - start
+
+
+def _trust_proxies(app):
+    # Detrás de un proxy, remote_addr (y el límite por IP) sería la dirección
+    # del proxy; solo se leen las cabeceras X-Forwarded-* de los configurados
+    x_for = app.config.get('PROXY_FIX_X_FOR', 0)
+    x_proto = app.config.get('PROXY_FIX_X_PROTO', 0)
+    x_host = app.config.get('PROXY_FIX_X_HOST', 0)
+    if x_for or x_proto or x_host:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=x_for, x_proto=x_proto, x_host=x_host)
+
+
+# Extensiones en orden de inicialización: (nombre, extensión, recibe db)
+EXTENSIONS = (
+    ('db', db, False),
+    ('replica_router', replica_router, True),
+    ('migrate', migrate, True),
+    ('login_manager', login_manager, False),
+    ('jwt', jwt, False),
+    ('fragment_cache', fragment_cache, False),
+    ('identity_cache', identity_cache, False),
+    ('search_index', search_index, True),
+    ('password_hasher', password_hasher, False),
+    ('metrics', metrics, False),
+    ('jobs', jobs, True),
+    ('group_commit', group_commit, True),
+    ('http_cache', http_cache, False),
+    ('rate_limiter', rate_limiter, False),
+)
+
+
 def _init_extensions(app):
-    db.init_app(app)
-    migrate.init_app(app, db)
-    login_manager.init_app(app)
-    bcrypt.init_app(app)
-    jwt.init_app(app)
+    for name, extension, needs_db in EXTENSIONS:
+        args = (app, db) if needs_db else (app,)
+        _timed(app, name, extension.init_app, *args)
 
 
 def _register_blueprints(app):
     from .routes import main
+    from .api import api
     app.register_blueprint(main)
+    app.register_blueprint(api)
 
 
 def _register_login_manager(app):
-    from .models import User
-
     @login_manager.unauthorized_handler
     def unauthorized():
         return redirect(url_for('main.login'))
 
     @login_manager.user_loader
     def load_user(user_id):
-        return User.query.get(int(user_id))
+        # Snapshot en caché: evita un SELECT a users en cada petición
+        return identity_cache.get(int(user_id))
+
+
+def _register_commands(app):
+    from .commands import COMMANDS
+    for command in COMMANDS:
+        app.cli.add_command(command)
+
+
+def _register_tasks():
+    # Registra los handlers de los trabajos en segundo plano
+    from . import tasks  # noqa: F401
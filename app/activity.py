@@ -0,0 +1,63 @@
+from . import db
+from .models import User, Question, Answer, Vote
+from .pagination import paginate_keyset
+from .timeago import iso_utc
+
+# Tipos de actividad de un perfil. Los votos solo los ve su autor.
+ACTIVITY_KINDS = ('questions', 'answers', 'votes')
+
+
+def activity_query(kind, user_id):
+    """
+    Devuelve (consulta, modelo) con la actividad `kind` de un usuario. Cada
+    consulta lee solo las columnas que se muestran y se pagina sobre el
+    índice (autor, created_at, id) de su tabla.
+    """
+    if kind == 'questions':
+        query = db.session.query(
+            Question.id, Question.id.label('question_id'), Question.title,
+            Question.total_votes, Question.total_answers, Question.created_at,
+        ).filter(Question.user_id == user_id)
+        return query, Question
+    if kind == 'answers':
+        query = db.session.query(
+            Answer.id, Answer.question_id, Question.title,
+            Answer.total_votes, Answer.created_at,
+        ).join(Question, Question.id == Answer.question_id) \
+            .filter(Answer.author_id == user_id)
+        return query, Answer
+    if kind == 'votes':
+        query = db.session.query(
+            Vote.id, Vote.question_id, Vote.answer_id, Question.title,
+            Vote.value, Vote.created_at,
+        ).join(Question, Question.id == Vote.question_id) \
+            .filter(Vote.user_id == user_id)
+        return query, Vote
+    raise ValueError(f"Tipo de actividad desconocido: {kind}")
+
+
+def user_activity(user_id, kind, cursor=None, per_page=20):
+    """
+    Página de actividad de un usuario, de la más reciente a la más antigua.
+    """
+    query, model = activity_query(kind, user_id)
+    return paginate_keyset(query, model, cursor=cursor, per_page=per_page)
+
+
+def user_stats(user_id):
+    """
+    Estadísticas del perfil, leídas de los contadores desnormalizados de
+    users en lugar de contarse en cada visita.
+    """
+    return db.session.query(User.question_count, User.answer_count, User.reputation) \
+        .filter(User.id == user_id).first()
+
+
+def serialize_activity(row):
+    """
+    Convierte una fila de actividad en un dict apto para JSON, con las
+    fechas en el mismo formato que el resto de la API (iso_utc).
+    """
+    item = dict(row._mapping)
+    item['created_at'] = iso_utc(row.created_at)
+    return item
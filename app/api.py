@@ -0,0 +1,191 @@
+import gzip
+import json
+from flask import Blueprint, abort, current_app, request
+from .models import db, User
+from .activity import ACTIVITY_KINDS, user_activity, serialize_activity
+from .readapi import page_size, read_feed, read_question, read_profile
+from . import password_hasher
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# API JSON versionada para clientes móviles e integraciones. Todas las rutas
+# salvo /token exigen un token JWT (cabecera Authorization: Bearer ...).
+api = Blueprint('api', __name__, url_prefix='/api/v1')
+
+# Campos que se pueden pedir con ?fields= en cada recurso
+FEED_FIELDS = ('id', 'title', 'excerpt', 'author', 'total_votes', 'total_answers',
+               'created_at', 'tags')
+QUESTION_FIELDS = ('id', 'title', 'content', 'author', 'total_votes', 'total_answers',
+                   'created_at', 'tags', 'answers')
+PROFILE_FIELDS = ('id', 'username', 'question_count', 'answer_count', 'reputation')
+
+# Las respuestas más pequeñas no compensan el costo de comprimirlas
+COMPRESS_MIN_SIZE = 512
+GZIP_LEVEL = 5
+BROTLI_QUALITY = 4
+
+
+def _dumps(payload):
+    # orjson es varias veces más rápido; sin él, JSON compacto de la stdlib
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def _json(payload, status=200):
+    return current_app.response_class(_dumps(payload), status=status,
+                                      mimetype='application/json')
+
+
+def _fields(allowed):
+    """
+    Devuelve los campos pedidos con ?fields=a,b (todos si no se indica).
+    Responde 400 si se pide un campo que el recurso no tiene.
+    """
+    raw = request.args.get('fields')
+    if not raw:
+        return set(allowed)
+    fields = {field.strip() for field in raw.split(',') if field.strip()}
+    unknown = fields - set(allowed)
+    if unknown:
+        abort(400, f"Campos desconocidos: {', '.join(sorted(unknown))}")
+    return fields
+
+
+def _select(item, fields):
+    return {key: value for key, value in item.items() if key in fields}
+
+
+def _current_user_id():
+    from flask_jwt_extended import get_jwt_identity
+    return int(get_jwt_identity())
+
+
+@api.before_request
+def authenticate():
+    """
+    Exige un token válido en todas las rutas de la API salvo la que lo emite.
+    """
+    if request.endpoint == 'api.token':
+        return
+    # Se importa aquí para que la extensión JWT siga cargándose de forma perezosa
+    from flask_jwt_extended import verify_jwt_in_request
+    verify_jwt_in_request()
+
+
+@api.after_request
+def compress(response):
+    """
+    Comprime con brotli (si está instalado) o gzip las respuestas grandes,
+    según lo que acepte el cliente.
+    """
+    if (response.direct_passthrough or response.status_code < 200
+            or 'Content-Encoding' in response.headers):
+        return response
+    response.vary.add('Accept-Encoding')
+    body = response.get_data()
+    if len(body) < COMPRESS_MIN_SIZE:
+        return response
+    if brotli is not None and request.accept_encodings['br']:
+        response.set_data(brotli.compress(body, quality=BROTLI_QUALITY))
+        response.headers['Content-Encoding'] = 'br'
+    elif request.accept_encodings['gzip']:
+        response.set_data(gzip.compress(body, compresslevel=GZIP_LEVEL))
+        response.headers['Content-Encoding'] = 'gzip'
+    return response
+
+
+@api.errorhandler(400)
+@api.errorhandler(404)
+def error(e):
+    # Mismo formato que los errores de la extensión JWT
+    return _json({'msg': e.description}, e.code)
+
+
+@api.route('/token', methods=['POST'])
+def token():
+    """
+    Emite un token de acceso a partir del correo (o nombre de usuario) y la
+    contraseña enviados en JSON.
+    """
+    data = request.get_json(silent=True) or {}
+    login, password = data.get('email'), data.get('password')
+    if not login or not password:
+        abort(400, "Se requieren 'email' y 'password'")
+    user = User.query.filter((User.email == login) | (User.username == login)).first()
+    if user is None or not password_hasher.verify_and_upgrade(user, password):
+        return _json({'msg': "Correo o contraseña incorrectos"}, 401)
+    db.session.commit()
+    from flask_jwt_extended import create_access_token
+    expires = current_app.config.get('JWT_ACCESS_TOKEN_EXPIRES')
+    return _json({
+        'access_token': create_access_token(identity=str(user.id)),
+        'token_type': 'Bearer',
+        'expires_in': int(expires.total_seconds()) if expires else None,
+    })
+
+
+@api.route('/feed')
+def feed():
+    """
+    Página del feed, paginada por cursor (?cursor=, ?limit=).
+    """
+    fields = _fields(FEED_FIELDS)
+    page = read_feed(request.args.get('cursor'), page_size(request.args.get('limit', type=int)),
+                     with_tags='tags' in fields)
+    return _json({'items': [_select(item, fields) for item in page['items']],
+                  'next_cursor': page['next_cursor']})
+
+
+@api.route('/questions/<int:question_id>')
+def question(question_id):
+    """
+    Una pregunta con sus etiquetas y una página de respuestas, paginadas
+    por cursor (?cursor=, ?limit=). El cursor de la página siguiente va en
+    `answers_next_cursor`.
+    """
+    fields = _fields(QUESTION_FIELDS)
+    payload = read_question(question_id, request.args.get('cursor'),
+                            page_size(request.args.get('limit', type=int)),
+                            with_tags='tags' in fields, with_answers='answers' in fields)
+    if payload is None:
+        abort(404, "Pregunta no encontrada")
+    if 'answers' in fields:
+        fields.add('answers_next_cursor')
+    return _json(_select(payload, fields))
+
+
+@api.route('/users/<int:user_id>')
+def user(user_id):
+    """
+    Perfil público de un usuario con sus estadísticas.
+    """
+    fields = _fields(PROFILE_FIELDS)
+    payload = read_profile(user_id)
+    if payload is None:
+        abort(404, "Usuario no encontrado")
+    return _json(_select(payload, fields))
+
+
+@api.route('/users/<int:user_id>/activity')
+def user_activity_page(user_id):
+    """
+    Una página de actividad de un usuario (?kind=questions|answers|votes).
+    Los votos de un usuario solo los puede ver él mismo.
+    """
+    kind = request.args.get('kind', 'questions')
+    if kind not in ACTIVITY_KINDS or (kind == 'votes' and user_id != _current_user_id()):
+        abort(404, "Actividad no encontrada")
+    page = user_activity(user_id, kind, cursor=request.args.get('cursor'),
+                         per_page=page_size(request.args.get('limit', type=int)))
+    return _json({'kind': kind,
+                  'items': [serialize_activity(row) for row in page.items],
+                  'next_cursor': page.next_cursor})
@@ -0,0 +1,170 @@
+import json
+import re
+from urllib.parse import parse_qs
+from itsdangerous import BadSignature
+from sqlalchemy.engine import make_url
+from werkzeug.http import parse_cookie
+from .readapi import (
+    answers_statement, feed_payload, feed_statement, page_size, question_payload,
+    question_statement, tags_statement,
+)
+
+# Driver asíncrono que reemplaza al síncrono de SQLALCHEMY_DATABASE_URI
+ASYNC_DRIVERS = {
+    'postgresql': 'postgresql+asyncpg',
+    'sqlite': 'sqlite+aiosqlite',
+}
+
+FEED_PATH = re.compile(r'^/api/feed/?$')
+QUESTION_PATH = re.compile(r'^/api/questions/(\d+)/?$')
+
+
+def async_database_url(url):
+    """
+    Traduce la URL síncrona de la base de datos a la de su driver asíncrono
+    (asyncpg o aiosqlite).
+    """
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No hay driver asíncrono para {backend}; define ASYNC_DATABASE_URL")
+    return url.set(drivername=ASYNC_DRIVERS[backend])
+
+
+def _wsgi_to_asgi(app):
+    try:
+        from asgiref.wsgi import WsgiToAsgi
+    except ImportError as exc:
+        raise RuntimeError("El modo ASGI requiere el paquete 'asgiref'") from exc
+    return WsgiToAsgi(app)
+
+
+class AsyncReadAPI:
+    """
+    Aplicación ASGI que sirve /api/feed y /api/questions/<id> con un motor
+    de SQLAlchemy asíncrono y delega todo lo demás en la aplicación Flask
+    (que corre en el pool de hilos de asgiref). Mientras una petición espera
+    a la base de datos el worker atiende otras, así que muchas lecturas
+    concurrentes comparten unas pocas conexiones.
+
+    La sesión se lee de la misma cookie firmada que usa Flask, y las
+    respuestas tienen el mismo formato que las rutas JSON síncronas
+    (app/readapi.py).
+
+    Configuración:
+        ASYNC_DATABASE_URL: URL con driver asíncrono (por defecto se deriva
+            de SQLALCHEMY_DATABASE_URI)
+        ASYNC_DATABASE_POOL_SIZE: conexiones del motor asíncrono por worker
+        ASYNC_DATABASE_MAX_OVERFLOW: conexiones extra en picos
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.wsgi = _wsgi_to_asgi(app)
+        self.engine = None
+        self._sessions = app.session_interface.get_signing_serializer(app)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] == 'http' and scope['method'] in ('GET', 'HEAD'):
+            path = scope['path']
+            match = QUESTION_PATH.match(path)
+            if FEED_PATH.match(path) or match:
+                if self._user_id(scope) is None:
+                    await _send(send, 302, b'', [(b'location', b'/login')])
+                elif match:
+                    if not await self._question(scope, send, int(match.group(1))):
+                        # Una pregunta inexistente la responde Flask, con la
+                        # misma página 404 que sin ASGI
+                        await self.wsgi(scope, receive, send)
+                else:
+                    await self._feed(scope, send)
+                return
+        await self.wsgi(scope, receive, send)
+
+    async def _feed(self, scope, send):
+        cursor, limit = _page_args(scope)
+        async with self._engine().connect() as conn:
+            rows = (await conn.execute(feed_statement(cursor, limit))).all()
+            ids = [row.id for row in rows[:limit]]
+            tag_rows = (await conn.execute(tags_statement(ids))).all() if ids else []
+        await _send_json(send, 200, feed_payload(rows, tag_rows, limit))
+
+    async def _question(self, scope, send, question_id):
+        """
+        Envía la pregunta y devuelve True, o devuelve False sin enviar nada
+        si no existe.
+        """
+        cursor, limit = _page_args(scope)
+        async with self._engine().connect() as conn:
+            row = (await conn.execute(question_statement(question_id))).first()
+            if row is None:
+                return False
+            tag_rows = (await conn.execute(tags_statement([question_id]))).all()
+            answer_rows = (await conn.execute(answers_statement(question_id, cursor, limit))).all()
+        await _send_json(send, 200, question_payload(row, tag_rows, answer_rows, limit))
+        return True
+
+    def _user_id(self, scope):
+        headers = dict(scope.get('headers') or ())
+        cookies = parse_cookie(headers.get(b'cookie', b'').decode('latin-1'))
+        value = cookies.get(self.app.config['SESSION_COOKIE_NAME'])
+        if not value:
+            return None
+        try:
+            data = self._sessions.loads(
+                value, max_age=int(self.app.permanent_session_lifetime.total_seconds()))
+        except BadSignature:
+            return None
+        return data.get('_user_id')
+
+    def _engine(self):
+        # Se crea dentro del bucle de eventos del worker, no al importar
+        if self.engine is None:
+            from sqlalchemy.ext.asyncio import create_async_engine
+            config = self.app.config
+            url = config.get('ASYNC_DATABASE_URL') or async_database_url(
+                config['SQLALCHEMY_DATABASE_URI'])
+            options = {}
+            if make_url(url).get_backend_name() != 'sqlite':
+                options = {'pool_size': config.get('ASYNC_DATABASE_POOL_SIZE', 5),
+                           'max_overflow': config.get('ASYNC_DATABASE_MAX_OVERFLOW', 5),
+                           'pool_pre_ping': config.get('DATABASE_POOL_PRE_PING', True)}
+            self.engine = create_async_engine(url, **options)
+        return self.engine
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                if self.engine is not None:
+                    await self.engine.dispose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+
+def _page_args(scope):
+    # ?cursor= y ?limit= como en las rutas de Flask; un limit inválido usa
+    # el tamaño por defecto
+    args = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+    cursor = args.get('cursor', [None])[0]
+    try:
+        limit = page_size(int(args['limit'][0]) if 'limit' in args else None)
+    except ValueError:
+        limit = page_size(None)
+    return cursor, limit
+
+
+async def _send(send, status, body, headers):
+    await send({'type': 'http.response.start', 'status': status,
+                'headers': headers + [(b'content-length', str(len(body)).encode('ascii'))]})
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def _send_json(send, status, payload):
+    body = json.dumps(payload).encode('utf-8')
+    await _send(send, status, body, [(b'content-type', b'application/json')])
@@ -0,0 +1,396 @@
+import csv
+import io
+import json
+import uuid
+from datetime import datetime
+from sqlalchemy import delete, insert, text, update
+from . import db
+from .models import (User, Question, Answer, Vote, Tag, ImportProgress, ImportIdMap,
+                     question_tags)
+from .tags import get_or_create_tags, parse_tags
+from .votes import UPVOTE, DOWNVOTE
+
+# Orden de importación: cada tipo depende de los anteriores
+KINDS = ('users', 'questions', 'answers', 'votes')
+
+MODELS = {'users': User, 'questions': Question, 'answers': Answer, 'votes': Vote}
+
+# Columnas que se escriben en cada tabla (sin los contadores, que se
+# recalculan al final con reconcile_counters)
+COLUMNS = {
+    'users': ('id', 'username', 'email', 'password', 'role'),
+    'questions': ('id', 'title', 'content', 'user_id', 'created_at'),
+    'answers': ('id', 'content', 'question_id', 'author_id', 'created_at'),
+    'votes': ('user_id', 'question_id', 'answer_id', 'value', 'created_at'),
+}
+
+# Campos de cada tipo que contienen ids de origen de otro tipo
+REFERENCES = {
+    'questions': (('users', 'user_id'),),
+    'answers': (('questions', 'question_id'), ('users', 'author_id'), ('users', 'user_id')),
+    'votes': (('users', 'user_id'), ('questions', 'question_id'), ('answers', 'answer_id')),
+}
+
+# Ids de origen por consulta al traducirlos (límite de parámetros de SQLite)
+LOOKUP_CHUNK = 500
+
+# Hash imposible de verificar para usuarios importados sin contraseña
+UNUSABLE_PASSWORD = '!'
+
+
+def read_records(path, fmt=None):
+    """
+    Lee un volcado JSONL o CSV registro por registro, sin cargarlo entero
+    en memoria. El formato se deduce de la extensión si no se indica.
+    """
+    fmt = fmt or ('csv' if path.endswith('.csv') else 'jsonl')
+    with open(path, newline='', encoding='utf-8') as f:
+        if fmt == 'csv':
+            for row in csv.DictReader(f):
+                yield {key: (value if value != '' else None) for key, value in row.items()}
+        else:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+
+
+def _parse_vote(value):
+    """
+    Valor de un voto importado (1 o -1), o None si no es válido.
+    """
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        return None
+    return value if value in (UPVOTE, DOWNVOTE) else None
+
+
+def _parse_datetime(value):
+    if value is None or isinstance(value, datetime):
+        return value or datetime.utcnow()
+    return datetime.fromisoformat(str(value).replace('Z', '+00:00')).replace(tzinfo=None)
+
+
+class Checkpoint:
+    """
+    Progreso de una importación guardado en la base (tablas import_progress
+    e import_id_maps): cuántos registros de cada tipo ya se guardaron y el id
+    nuevo de cada id de origen. Se escribe en la misma transacción que cada
+    lote, así que una importación interrumpida se retoma desde el último lote
+    confirmado sin repetir ni perder filas. Los mapas de ids no se cargan
+    enteros: cada lote lee solo los ids que referencia (ver `load`).
+
+    Sin nombre se usa uno temporal: la importación no se puede retomar y su
+    progreso se borra con `discard` al terminar.
+    """
+
+    def __init__(self, name=None):
+        self.name = name or f'tmp-{uuid.uuid4().hex}'
+        self.temporary = name is None
+        self.id_maps = {kind: {} for kind in KINDS}
+
+    def offset(self, kind):
+        """
+        Registros de tipo `kind` ya guardados.
+        """
+        imported = db.session.query(ImportProgress.imported) \
+            .filter_by(name=self.name, kind=kind).scalar()
+        return imported or 0
+
+    def advance(self, kind, count, id_pairs):
+        """
+        Anota, dentro de la transacción del lote, `count` registros más de
+        tipo `kind` y sus pares (id de origen, id nuevo).
+        """
+        if id_pairs:
+            db.session.execute(insert(ImportIdMap), [
+                {'name': self.name, 'kind': kind, 'source_id': str(source_id), 'new_id': new_id}
+                for source_id, new_id in id_pairs])
+        updated = db.session.execute(
+            update(ImportProgress)
+            .where(ImportProgress.name == self.name, ImportProgress.kind == kind)
+            .values(imported=ImportProgress.imported + count)
+            .execution_options(synchronize_session=False)).rowcount
+        if not updated:
+            db.session.execute(insert(ImportProgress),
+                               [{'name': self.name, 'kind': kind, 'imported': count}])
+
+    def load(self, kind, source_ids):
+        """
+        Lee los ids nuevos de `source_ids` para traducirlos con `resolve`,
+        reemplazando los del lote anterior.
+        """
+        source_ids = sorted({str(source_id) for source_id in source_ids if source_id is not None})
+        mapping = {}
+        for start in range(0, len(source_ids), LOOKUP_CHUNK):
+            mapping.update(db.session.query(ImportIdMap.source_id, ImportIdMap.new_id).filter(
+                ImportIdMap.name == self.name, ImportIdMap.kind == kind,
+                ImportIdMap.source_id.in_(source_ids[start:start + LOOKUP_CHUNK])))
+        self.id_maps[kind] = mapping
+
+    def resolve(self, kind, source_id):
+        """
+        Traduce un id del volcado al id asignado al importarlo.
+        """
+        if source_id is None:
+            return None
+        new_id = self.id_maps[kind].get(str(source_id))
+        if new_id is None:
+            raise ValueError(f"{kind} con id de origen {source_id} no fue importado")
+        return new_id
+
+    def discard(self):
+        """
+        Borra el progreso y los mapas de ids de esta importación.
+        """
+        db.session.execute(delete(ImportIdMap).where(ImportIdMap.name == self.name))
+        db.session.execute(delete(ImportProgress).where(ImportProgress.name == self.name))
+        db.session.commit()
+
+
+class IdAllocator:
+    """
+    Reserva ids para filas nuevas antes de insertarlas, de modo que los
+    mapas de ids se conocen sin tener que leer lo insertado. En PostgreSQL
+    se piden a la secuencia de la tabla; en otros motores se continúa desde
+    el máximo actual (la importación debe ser el único escritor).
+    """
+
+    def __init__(self):
+        self._next = {}
+
+    def allocate(self, table, count):
+        if db.engine.dialect.name == 'postgresql':
+            rows = db.session.execute(text(
+                "SELECT nextval(pg_get_serial_sequence(:table, 'id')) "
+                "FROM generate_series(1, :count)"), {'table': table, 'count': count})
+            return [row[0] for row in rows]
+        if table not in self._next:
+            current = db.session.execute(text(f"SELECT max(id) FROM {table}")).scalar()
+            self._next[table] = (current or 0) + 1
+        start = self._next[table]
+        self._next[table] += count
+        return list(range(start, start + count))
+
+
+def _copy_rows(table, columns, rows):
+    """
+    Inserta un lote. En PostgreSQL usa COPY FROM STDIN; en otros motores,
+    un INSERT con executemany.
+    """
+    if not rows:
+        return
+    if db.engine.dialect.name == 'postgresql':
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow(['' if row[column] is None else row[column] for column in columns])
+        buffer.seek(0)
+        cursor = db.session.connection().connection.cursor()
+        cursor.copy_expert(
+            f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+        return
+    db.session.execute(MODELS[table].__table__.insert(), rows)
+
+
+class Importer:
+    """
+    Importa volcados de usuarios, preguntas, respuestas y votos por lotes,
+    con memoria constante: cada lote lee solo los ids que necesita traducir.
+    """
+
+    def __init__(self, checkpoint, batch_size=5000, echo=None):
+        self.checkpoint = checkpoint
+        self.batch_size = batch_size
+        self.echo = echo or (lambda message: None)
+        self.allocator = IdAllocator()
+        # Registros descartados por tipo (votos inválidos o repetidos)
+        self.skipped = {kind: 0 for kind in KINDS}
+
+    def run(self, kind, path, fmt=None):
+        """
+        Importa un archivo de tipo `kind`. Devuelve el número de registros
+        importados en esta ejecución.
+        """
+        skip = self.checkpoint.offset(kind)
+        read = imported = 0
+        batch = []
+        for index, record in enumerate(read_records(path, fmt)):
+            if index < skip:
+                continue
+            batch.append(record)
+            if len(batch) >= self.batch_size:
+                imported += self._flush(kind, batch)
+                read += len(batch)
+                self.echo(f"{kind}: {skip + read} registros")
+                batch = []
+        if batch:
+            imported += self._flush(kind, batch)
+            read += len(batch)
+            self.echo(f"{kind}: {skip + read} registros")
+        if self.skipped[kind]:
+            self.echo(f"Aviso: {self.skipped[kind]} registros de {kind} omitidos "
+                      f"(valor inválido o repetido).")
+        return imported
+
+    def _flush(self, kind, records):
+        wanted = {}
+        for target, field in REFERENCES.get(kind, ()):
+            wanted.setdefault(target, set()).update(record.get(field) for record in records)
+        for target, source_ids in wanted.items():
+            self.checkpoint.load(target, source_ids)
+
+        rows = [self._convert(kind, record) for record in records]
+        if kind == 'votes':
+            rows = self._new_votes(rows)
+            self.skipped[kind] += len(records) - len(rows)
+        id_pairs = []
+        if kind != 'votes':
+            ids = self.allocator.allocate(kind, len(rows))
+            for row, new_id, record in zip(rows, ids, records):
+                row['id'] = new_id
+                if record.get('id') is not None:
+                    id_pairs.append((record['id'], new_id))
+
+        # Las filas, las etiquetas y el progreso se confirman juntos. El
+        # progreso cuenta registros leídos, incluidos los omitidos
+        _copy_rows(kind, COLUMNS[kind], rows)
+        if kind == 'questions':
+            self._attach_tags(rows, records)
+        self.checkpoint.advance(kind, len(records), id_pairs)
+        db.session.commit()
+        return len(rows)
+
+    def _convert(self, kind, record):
+        resolve = self.checkpoint.resolve
+        if kind == 'users':
+            return {'username': record['username'], 'email': record['email'],
+                    'password': record.get('password') or UNUSABLE_PASSWORD,
+                    'role': record.get('role') or 'standard'}
+        if kind == 'questions':
+            return {'title': record['title'], 'content': record['content'],
+                    'user_id': resolve('users', record['user_id']),
+                    'created_at': _parse_datetime(record.get('created_at'))}
+        if kind == 'answers':
+            return {'content': record['content'],
+                    'question_id': resolve('questions', record['question_id']),
+                    'author_id': resolve('users', record.get('author_id', record.get('user_id'))),
+                    'created_at': _parse_datetime(record.get('created_at'))}
+        return {'user_id': resolve('users', record['user_id']),
+                'question_id': resolve('questions', record['question_id']),
+                'answer_id': resolve('answers', record.get('answer_id')),
+                'value': _parse_vote(record.get('value')),
+                'created_at': _parse_datetime(record.get('created_at'))}
+
+    @staticmethod
+    def _new_votes(rows):
+        """
+        Descarta los votos con valor inválido y los que repiten el par
+        (usuario, pregunta o respuesta) de otro voto del lote o de uno ya
+        guardado, que violarían los índices únicos de votes y harían
+        fallar el lote entero. Se conserva el primero.
+        """
+        def key(vote):
+            # Un voto a respuesta se identifica por la respuesta
+            return (vote['user_id'], vote['answer_id'],
+                    vote['question_id'] if vote['answer_id'] is None else None)
+
+        user_ids = sorted({row['user_id'] for row in rows if row['value'] is not None})
+        seen = set()
+        for start in range(0, len(user_ids), LOOKUP_CHUNK):
+            seen.update(key(vote._mapping) for vote in
+                        db.session.query(Vote.user_id, Vote.question_id, Vote.answer_id)
+                        .filter(Vote.user_id.in_(user_ids[start:start + LOOKUP_CHUNK])))
+        valid = []
+        for row in rows:
+            if row['value'] is None or key(row) in seen:
+                continue
+            seen.add(key(row))
+            valid.append(row)
+        return valid
+
+    @staticmethod
+    def _attach_tags(rows, records):
+        """
+        Asocia las etiquetas del lote con un solo INSERT y ajusta los
+        contadores de cada etiqueta una vez por lote. Las etiquetas de todo
+        el lote se buscan (o crean) de una vez.
+        """
+        names_by_row = []
+        for record in records:
+            raw = record.get('tags')
+            names_by_row.append(parse_tags(','.join(raw) if isinstance(raw, list) else raw))
+        tag_ids = {tag.name: tag.id for tag in get_or_create_tags(
+            sorted({name for names in names_by_row for name in names}))}
+        links = []
+        counts = {}
+        for row, names in zip(rows, names_by_row):
+            for name in names:
+                links.append({'question_id': row['id'], 'tag_id': tag_ids[name]})
+                counts[tag_ids[name]] = counts.get(tag_ids[name], 0) + 1
+        if links:
+            db.session.execute(question_tags.insert(), links)
+            for tag_id, amount in counts.items():
+                db.session.execute(
+                    Tag.__table__.update()
+                    .where(Tag.id == tag_id)
+                    .values(question_count=Tag.question_count + amount))
+
+
+def export_records(kind, batch_size=5000):
+    """
+    Recorre una tabla por clave primaria (WHERE id > último ORDER BY id)
+    en lotes, sin OFFSET, y genera un dict por fila.
+    """
+    model = MODELS[kind]
+    table = model.__table__
+    columns = [table.c.id] + [table.c[name] for name in COLUMNS[kind] if name != 'id']
+    last_id = 0
+    while True:
+        rows = db.session.query(*columns).filter(model.id > last_id) \
+            .order_by(model.id).limit(batch_size).all()
+        if not rows:
+            break
+        tags = _tags_by_question([row.id for row in rows]) if kind == 'questions' else {}
+        for row in rows:
+            record = dict(row._mapping)
+            if kind == 'questions':
+                record['tags'] = tags.get(row.id, [])
+            yield record
+        last_id = rows[-1].id
+
+
+def _tags_by_question(question_ids):
+    result = {}
+    rows = db.session.query(question_tags.c.question_id, Tag.name) \
+        .join(Tag, Tag.id == question_tags.c.tag_id) \
+        .filter(question_tags.c.question_id.in_(question_ids))
+    for question_id, name in rows:
+        result.setdefault(question_id, []).append(name)
+    return result
+
+
+def write_records(records, path, fmt=None):
+    """
+    Escribe los registros en JSONL o CSV a medida que llegan. Devuelve
+    cuántos se escribieron.
+    """
+    fmt = fmt or ('csv' if path.endswith('.csv') else 'jsonl')
+    written = 0
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = None
+        for record in records:
+            record = {key: (value.isoformat() if isinstance(value, datetime) else value)
+                      for key, value in record.items()}
+            if fmt == 'csv':
+                if isinstance(record.get('tags'), list):
+                    record['tags'] = ','.join(record['tags'])
+                if writer is None:
+                    writer = csv.DictWriter(f, fieldnames=list(record))
+                    writer.writeheader()
+                writer.writerow(record)
+            else:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+            written += 1
+    return written
@@ -0,0 +1,187 @@
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from markupsafe import Markup
+
+
+class LRUBackend:
+    """
+    Caché en memoria del proceso con política LRU y expiración por TTL.
+    Es segura entre hilos, pero cada worker tiene la suya: una invalidación
+    solo afecta al proceso que la ejecuta.
+    """
+
+    def __init__(self, maxsize=2048):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class LocalStore:
+    """
+    Sustituto local de un almacén clave-valor compartido (tipo Redis).
+    Implementa el subconjunto de la interfaz de redis-py que usa
+    `SharedBackend`, guardando los valores como bytes.
+    """
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key, value, ex=None):
+        expires_at = time.monotonic() + ex if ex else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+        return True
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def update(self, key, func, ex=None):
+        """
+        Reemplaza el valor de `key` por `func(valor actual)` de forma atómica.
+        Hace las veces de los scripts Lua que se usan con Redis.
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            current = None
+            if entry is not None and (entry[1] is None or entry[1] >= time.monotonic()):
+                current = entry[0]
+            value = func(current)
+            self._data[key] = (value, time.monotonic() + ex if ex else None)
+            return value
+
+    def flushdb(self):
+        with self._lock:
+            self._data.clear()
+
+
+class SharedBackend:
+    """
+    Caché compartida entre procesos sobre un cliente con la interfaz de
+    redis-py (get/set/delete). Las invalidaciones se ven en todos los workers.
+    """
+
+    def __init__(self, client, prefix='so:'):
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        return pickle.loads(raw) if raw is not None else None
+
+    def set(self, key, value, ttl=None):
+        self.client.set(self.prefix + key, pickle.dumps(value), ex=ttl)
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+    def clear(self):
+        self.client.flushdb()
+
+
+def _shared_client(url):
+    """
+    Crea el cliente del almacén compartido. Sin URL se usa `LocalStore`;
+    con URL se necesita el paquete `redis`.
+    """
+    if not url:
+        return LocalStore()
+    try:
+        import redis
+    except ImportError as exc:
+        raise RuntimeError(
+            "El almacén compartido requiere el paquete 'redis'") from exc
+    return redis.Redis.from_url(url)
+
+
+class FragmentCache:
+    """
+    Caché de fragmentos HTML renderizados, indexados por id de pregunta y su
+    revisión (Question.revision). La revisión vive en la base de datos y
+    cambia en la misma transacción que cada respuesta o voto, así que todos
+    los workers calculan la misma clave sin avisarse: las entradas viejas
+    quedan inalcanzables y el backend las descarta solo.
+
+    Configuración:
+        FRAGMENT_CACHE_BACKEND: 'lru' (por defecto), 'shared' o 'null'
+        FRAGMENT_CACHE_SIZE: número máximo de entradas del backend LRU
+        FRAGMENT_CACHE_TTL: segundos de vida de cada fragmento
+        FRAGMENT_CACHE_URL: URL de Redis para el backend compartido
+    """
+
+    def __init__(self, app=None):
+        self.backend = None
+        self.ttl = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        kind = app.config.get('FRAGMENT_CACHE_BACKEND', 'lru')
+        self.ttl = app.config.get('FRAGMENT_CACHE_TTL', 300)
+        if kind == 'lru':
+            self.backend = LRUBackend(app.config.get('FRAGMENT_CACHE_SIZE', 2048))
+        elif kind == 'shared':
+            self.backend = SharedBackend(
+                _shared_client(app.config.get('FRAGMENT_CACHE_URL')))
+        elif kind == 'null':
+            self.backend = None
+        else:
+            raise ValueError(f"FRAGMENT_CACHE_BACKEND desconocido: {kind}")
+
+    def get_or_render(self, question_id, revision, name, render):
+        """
+        Devuelve el fragmento `name` de la pregunta en su revisión `revision`
+        desde la caché o, si no está, lo genera llamando a `render()` y lo
+        guarda.
+        """
+        if self.backend is None:
+            return Markup(render())
+        key = f"frag:{name}:{question_id}:{revision}"
+        html = self.backend.get(key)
+        if html is None:
+            html = render()
+            self.backend.set(key, html, ttl=self.ttl)
+        return Markup(html)
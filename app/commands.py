@@ -0,0 +1,203 @@
+import click
+from flask.cli import with_appcontext
+
+
+@click.command('reconcile-counters')
+@with_appcontext
+def reconcile_counters_command():
+    """
+    Recalcula total_answers y total_votes de preguntas y respuestas.
+    """
+    from .counters import reconcile_counters
+    fixed = reconcile_counters()
+    click.echo(f"Contadores corregidos en {fixed} filas.")
+
+
+@click.command('reindex-search')
+@with_appcontext
+def reindex_search_command():
+    """
+    Reconstruye el índice de búsqueda de preguntas y respuestas.
+    """
+    from . import search_index
+    total = search_index.reindex()
+    click.echo(f"Índice de búsqueda reconstruido ({total} documentos).")
+
+
+@click.command('import-data')
+@click.option('--users', type=click.Path(exists=True, dir_okay=False))
+@click.option('--questions', type=click.Path(exists=True, dir_okay=False))
+@click.option('--answers', type=click.Path(exists=True, dir_okay=False))
+@click.option('--votes', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'fmt', type=click.Choice(['jsonl', 'csv']),
+              help='Formato de los archivos (por defecto según la extensión).')
+@click.option('--batch-size', default=5000, show_default=True)
+@click.option('--checkpoint',
+              help='Nombre de la importación, para retomarla si se interrumpe '
+                   '(el progreso se guarda en la base).')
+@with_appcontext
+def import_data_command(users, questions, answers, votes, fmt, batch_size, checkpoint):
+    """
+    Importa volcados JSONL/CSV de usuarios, preguntas, respuestas y votos.
+    """
+    from . import similarity
+    from .bulk import Checkpoint, Importer
+    from .counters import reconcile_counters
+    from .rankings import redecay
+    progress = Checkpoint(checkpoint)
+    importer = Importer(progress, batch_size=batch_size, echo=click.echo)
+    paths = {'users': users, 'questions': questions, 'answers': answers, 'votes': votes}
+    for kind, path in paths.items():
+        if path:
+            total = importer.run(kind, path, fmt)
+            click.echo(f"{kind}: {total} registros importados.")
+    if progress.temporary:
+        progress.discard()
+    reconcile_counters()
+    click.echo("Contadores recalculados.")
+    # Las filas importadas no pasan por create_question: sus filas de
+    # ranking y sus firmas de similitud se crean aquí
+    total = redecay()
+    click.echo(f"Puntajes recalculados para {total} preguntas.")
+    total = similarity.reindex()
+    click.echo(f"Firmas de similitud recalculadas para {total} preguntas.")
+
+
+@click.command('export-data')
+@click.argument('kind', type=click.Choice(['users', 'questions', 'answers', 'votes']))
+@click.argument('output', type=click.Path(dir_okay=False))
+@click.option('--format', 'fmt', type=click.Choice(['jsonl', 'csv']),
+              help='Formato del archivo (por defecto según la extensión).')
+@click.option('--batch-size', default=5000, show_default=True)
+@with_appcontext
+def export_data_command(kind, output, fmt, batch_size):
+    """
+    Exporta una tabla a JSONL/CSV recorriéndola por clave primaria.
+    """
+    from .bulk import export_records, write_records
+    total = write_records(export_records(kind, batch_size), output, fmt)
+    click.echo(f"{kind}: {total} registros exportados a {output}.")
+
+
+@click.command('jobs-worker')
+@click.option('--threads', default=4, show_default=True, help='Hilos que ejecutan trabajos.')
+@click.option('--poll-interval', default=1.0, show_default=True,
+              help='Segundos de espera cuando no hay trabajos listos.')
+@click.option('--burst', is_flag=True, help='Termina cuando no quedan trabajos listos.')
+@with_appcontext
+def jobs_worker_command(threads, poll_interval, burst):
+    """
+    Atiende la cola de trabajos en segundo plano (JOBS_BACKEND=database).
+    """
+    from . import jobs
+    click.echo(f"Atendiendo la cola con {threads} hilos.")
+    try:
+        jobs.work(threads, poll_interval, burst=burst)
+    except KeyboardInterrupt:
+        pass
+
+
+@click.command('jobs-purge')
+@click.option('--days', default=7, show_default=True)
+@with_appcontext
+def jobs_purge_command(days):
+    """
+    Borra los trabajos terminados hace más de `days` días.
+    """
+    from datetime import datetime, timedelta
+    from . import jobs
+    deleted = jobs.backend.purge(datetime.utcnow() - timedelta(days=days))
+    click.echo(f"{deleted} trabajos borrados.")
+
+
+@click.command('refresh-rankings')
+@click.option('--since-days', type=int,
+              help='Solo preguntas con actividad en los últimos N días.')
+@click.option('--batch-size', default=1000, show_default=True)
+@with_appcontext
+def refresh_rankings_command(since_days, batch_size):
+    """
+    Recalcula el decaimiento de los puntajes "hot" (pensado para cron).
+    """
+    from datetime import datetime, timedelta
+    from .rankings import redecay
+    since = datetime.utcnow() - timedelta(days=since_days) if since_days else None
+    total = redecay(batch_size=batch_size, since=since)
+    click.echo(f"Puntajes recalculados para {total} preguntas.")
+
+
+@click.command('reindex-similarity')
+@click.option('--batch-size', default=1000, show_default=True)
+@with_appcontext
+def reindex_similarity_command(batch_size):
+    """
+    Recalcula las firmas de similitud de todas las preguntas.
+    """
+    from .similarity import reindex
+    total = reindex(batch_size=batch_size)
+    click.echo(f"Firmas de similitud recalculadas para {total} preguntas.")
+
+
+@click.command('dedup-report')
+@click.option('--min-score', default=0.7, show_default=True,
+              help='Similitud mínima (0 a 1) para considerar dos preguntas duplicadas.')
+@click.option('--output', type=click.Path(dir_okay=False),
+              help='Archivo JSONL donde guardar un grupo de duplicados por línea.')
+@click.option('--top', default=20, show_default=True, help='Grupos a mostrar.')
+@with_appcontext
+def dedup_report_command(min_score, output, top):
+    """
+    Reporta los grupos de preguntas casi duplicadas, según las firmas de
+    similitud (ver `reindex-similarity`).
+    """
+    import json
+    from .models import Question
+    from .similarity import duplicate_clusters
+    clusters = duplicate_clusters(min_score)
+    ids = {question_id for cluster in clusters for question_id in cluster['questions']}
+    titles = dict(Question.query.with_entities(Question.id, Question.title)
+                  .filter(Question.id.in_(ids))) if ids else {}
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            for cluster in clusters:
+                record = dict(cluster, titles=[titles.get(question_id)
+                                               for question_id in cluster['questions']])
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+    click.echo(f"{len(clusters)} grupos de duplicados ({len(ids)} preguntas).")
+    for cluster in clusters[:top]:
+        original, *duplicates = cluster['questions']
+        click.echo(f"  #{original} {titles.get(original)!r}: duplicados {', '.join(f'#{i}' for i in duplicates)}")
+
+
+@click.command('startup-profile')
+@click.option('--top', default=15, show_default=True, help='Paquetes a mostrar.')
+def startup_profile_command(top):
+    """
+    Mide en un proceso nuevo cuánto cuesta arrancar la aplicación: imports
+    por paquete, cada paso de create_app y memoria.
+    """
+    from .startup import imports_by_package, measure_startup
+    report = measure_startup(importtime=True)
+    click.echo(f"Arranque: {report['total_ms']:.0f} ms (imports {report['import_ms']:.0f} ms, "
+               f"create_app {report['create_app_ms']:.0f} ms), "
+               f"{report['max_rss_kb'] / 1024:.0f} MB de memoria, {report['modules']} módulos")
+    click.echo("\nPasos de create_app (init_app de cada extensión, blueprints, tareas):")
+    for name, ms in sorted(report['steps_ms'].items(), key=lambda item: -item[1]):
+        click.echo(f"  {name:<20} {ms:8.2f} ms")
+    click.echo("\nImports por paquete (tiempo propio):")
+    for package, ms, modules in imports_by_package(report['imports'], top):
+        click.echo(f"  {package:<20} {ms:8.1f} ms  {modules} módulos")
+
+
+COMMANDS = [
+    reconcile_counters_command,
+    reindex_search_command,
+    import_data_command,
+    export_data_command,
+    jobs_worker_command,
+    jobs_purge_command,
+    refresh_rankings_command,
+    reindex_similarity_command,
+    dedup_report_command,
+    startup_profile_command,
+]
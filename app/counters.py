@@ -0,0 +1,144 @@
+from sqlalchemy import update
+from . import db
+from .models import User, Question, Answer, Vote
+
+# Reputación que gana (o pierde) el autor por cada voto recibido
+QUESTION_VOTE_REPUTATION = 5
+ANSWER_VOTE_REPUTATION = 10
+
+
+def _bump(column, question_id, delta):
+    """
+    Ejecuta `UPDATE questions SET <columna> = <columna> + delta` dentro de la
+    transacción actual. El incremento lo hace la base de datos, así que dos
+    peticiones concurrentes nunca pisan el valor de la otra.
+    """
+    db.session.execute(
+        update(Question)
+        .where(Question.id == question_id)
+        .values({column: column + delta})
+        .execution_options(synchronize_session=False))
+
+
+def increment_answers(question_id, delta=1):
+    """
+    Ajusta el contador de respuestas de una pregunta y su revisión.
+    """
+    db.session.execute(
+        update(Question)
+        .where(Question.id == question_id)
+        .values(total_answers=Question.total_answers + delta,
+                revision=Question.revision + 1)
+        .execution_options(synchronize_session=False))
+
+
+def bump_revision(question_id):
+    """
+    Marca como cambiada la página de una pregunta (p. ej. tras un voto sobre
+    ella o una de sus respuestas).
+    """
+    _bump(Question.revision, question_id, 1)
+
+
+def _bump_user(column, user_id, delta):
+    """
+    Igual que `_bump`, sobre las estadísticas de un usuario. `user_id`
+    puede ser un valor o una subconsulta escalar.
+    """
+    db.session.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values({column: column + delta})
+        .execution_options(synchronize_session=False))
+
+
+def increment_user_questions(user_id, delta=1):
+    """
+    Ajusta el número de preguntas publicadas por un usuario.
+    """
+    _bump_user(User.question_count, user_id, delta)
+
+
+def increment_user_answers(user_id, delta=1):
+    """
+    Ajusta el número de respuestas publicadas por un usuario.
+    """
+    _bump_user(User.answer_count, user_id, delta)
+
+
+def adjust_reputation(model, target_id, delta):
+    """
+    Aplica a la reputación del autor de la pregunta o respuesta `target_id`
+    el cambio de puntaje `delta`. El autor se resuelve con una subconsulta,
+    sin leerlo antes.
+    """
+    if model is Question:
+        author = db.select(Question.user_id).where(Question.id == target_id)
+        weight = QUESTION_VOTE_REPUTATION
+    else:
+        author = db.select(Answer.author_id).where(Answer.id == target_id)
+        weight = ANSWER_VOTE_REPUTATION
+    _bump_user(User.reputation, author.scalar_subquery(), delta * weight)
+
+
+def reconcile_counters():
+    """
+    Recalcula en bloque total_answers y total_votes de preguntas y respuestas,
+    y las estadísticas de los usuarios, a partir de las tablas answers y
+    votes, corrigiendo cualquier desviación.
+    Solo se reescriben las filas cuyo valor no coincide. Devuelve el número
+    de filas corregidas.
+    """
+    answers = db.select(db.func.count(Answer.id)) \
+        .where(Answer.question_id == Question.id).scalar_subquery()
+    question_votes = db.select(db.func.coalesce(db.func.sum(Vote.value), 0)) \
+        .where(Vote.question_id == Question.id, Vote.answer_id.is_(None)) \
+        .scalar_subquery()
+    answer_votes = db.select(db.func.coalesce(db.func.sum(Vote.value), 0)) \
+        .where(Vote.answer_id == Answer.id).scalar_subquery()
+
+    fixed = db.session.execute(
+        update(Question)
+        .where(db.or_(Question.total_answers != answers,
+                      Question.total_votes != question_votes,
+                      Question.total_answers.is_(None),
+                      Question.total_votes.is_(None)))
+        .values(total_answers=answers, total_votes=question_votes,
+                revision=Question.revision + 1)
+        .execution_options(synchronize_session=False)).rowcount
+    # Las preguntas cuyas respuestas se corrigen cambian de revisión
+    db.session.execute(
+        update(Question)
+        .where(Question.id.in_(db.select(Answer.question_id)
+                               .where(Answer.total_votes != answer_votes)))
+        .values(revision=Question.revision + 1)
+        .execution_options(synchronize_session=False))
+    fixed += db.session.execute(
+        update(Answer)
+        .where(Answer.total_votes != answer_votes)
+        .values(total_votes=answer_votes)
+        .execution_options(synchronize_session=False)).rowcount
+
+    question_count = db.select(db.func.count(Question.id)) \
+        .where(Question.user_id == User.id).scalar_subquery()
+    answer_count = db.select(db.func.count(Answer.id)) \
+        .where(Answer.author_id == User.id).scalar_subquery()
+    reputation = (
+        db.select(db.func.coalesce(db.func.sum(Vote.value), 0))
+        .join(Question, Question.id == Vote.question_id)
+        .where(Vote.answer_id.is_(None), Question.user_id == User.id)
+        .scalar_subquery() * QUESTION_VOTE_REPUTATION
+        + db.select(db.func.coalesce(db.func.sum(Vote.value), 0))
+        .join(Answer, Answer.id == Vote.answer_id)
+        .where(Answer.author_id == User.id)
+        .scalar_subquery() * ANSWER_VOTE_REPUTATION)
+    fixed += db.session.execute(
+        update(User)
+        .where(db.or_(User.question_count != question_count,
+                      User.answer_count != answer_count,
+                      User.reputation != reputation))
+        .values(question_count=question_count, answer_count=answer_count,
+                reputation=reputation)
+        .execution_options(synchronize_session=False)).rowcount
+    db.session.commit()
+    return fixed
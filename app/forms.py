@@ -1,6 +1,7 @@
 from flask_wtf import FlaskForm
 from wtforms import StringField, PasswordField, TextAreaField, SubmitField
-from wtforms.validators import DataRequired, Email, EqualTo, Length
+from wtforms.validators import AnyOf, DataRequired, Email, EqualTo, Length
+from .votes import VOTE_VALUES
 
 
 class LoginForm(FlaskForm):
@@ -29,3 +30,8 @@ class QuestionForm(FlaskForm):
 class AnswerForm(FlaskForm):
     content = TextAreaField('Content', validators=[DataRequired()])
     submit = SubmitField('Submit')
+
+
+class VoteForm(FlaskForm):
+    # Lo envía el botón pulsado ('up' o 'down')
+    value = StringField('Voto', validators=[DataRequired(), AnyOf(list(VOTE_VALUES))])
@@ -0,0 +1,128 @@
+import hashlib
+import os
+from flask import Response, request
+from flask_login import current_user
+
+# Política por defecto de las páginas con sesión: el navegador puede guardar
+# la respuesta, pero debe revalidarla con If-None-Match en cada visita
+REVALIDATE = 'private, no-cache'
+
+
+def _digest(*parts):
+    return hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()[:20]
+
+
+class HttpCache:
+    """
+    Peticiones condicionales para las rutas de lectura y URLs con hash de
+    contenido para los archivos estáticos.
+
+    Las vistas calculan un ETag con `etag(...)` a partir del estado en la
+    base de datos de lo que muestran (ver Question.revision), leído con una
+    consulta por índice, y, si el cliente ya tiene esa versión, responden 304
+    con `not_modified(etag)` antes de cargar el resto o renderizar. El ETag incluye al usuario y un
+    hash de las plantillas, así que un despliegue que cambia el HTML invalida
+    las copias de los navegadores.
+
+    Configuración:
+        HTTP_CACHE_ENABLED: activa ETags y 304 (por defecto True)
+        HTTP_CACHE_STATIC_MAX_AGE: segundos de caché de los estáticos con hash
+    """
+
+    def __init__(self, app=None):
+        self.enabled = True
+        self.templates_digest = ''
+        self.static_folder = None
+        self.static_max_age = 31536000
+        self._static_hashes = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('HTTP_CACHE_ENABLED', True)
+        self.static_max_age = app.config.get('HTTP_CACHE_STATIC_MAX_AGE', 31536000)
+        self.static_folder = app.static_folder
+        self.templates_digest = _tree_digest(
+            os.path.join(app.root_path, app.template_folder))
+        app.url_defaults(self._static_version)
+        app.after_request(self._static_cache_control)
+
+    def etag(self, *parts):
+        """
+        ETag de una página compuesta por `parts`. Devuelve None si alguna
+        parte es None o si la caché está apagada.
+        """
+        if not self.enabled or any(part is None for part in parts):
+            return None
+        return _digest(self.templates_digest, current_user.get_id(), *parts)
+
+    @staticmethod
+    def not_modified(etag, cache_control=REVALIDATE):
+        """
+        Devuelve una respuesta 304 si el cliente ya tiene la versión `etag`,
+        o None si hay que generar la página.
+        """
+        if etag is None or request.method not in ('GET', 'HEAD'):
+            return None
+        if not request.if_none_match.contains_weak(etag):
+            return None
+        response = Response(status=304)
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = cache_control
+        return response
+
+    @staticmethod
+    def finish(response, etag, cache_control=REVALIDATE):
+        """
+        Agrega ETag y Cache-Control a la respuesta de una vista.
+        """
+        if not isinstance(response, Response):
+            response = Response(response)
+        if etag is not None:
+            response.set_etag(etag)
+        response.headers['Cache-Control'] = cache_control
+        return response
+
+    def static_hash(self, filename):
+        """
+        Hash corto del contenido de un archivo estático, recalculado si el
+        archivo cambia.
+        """
+        path = os.path.join(self.static_folder, filename)
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            return None
+        cached = self._static_hashes.get(filename)
+        if cached is None or cached[0] != mtime:
+            with open(path, 'rb') as f:
+                cached = (mtime, hashlib.sha1(f.read()).hexdigest()[:12])
+            self._static_hashes[filename] = cached
+        return cached[1]
+
+    def _static_version(self, endpoint, values):
+        # url_for('static', filename=...) agrega ?v=<hash> automáticamente
+        if endpoint == 'static' and 'filename' in values and 'v' not in values:
+            digest = self.static_hash(values['filename'])
+            if digest is not None:
+                values['v'] = digest
+
+    def _static_cache_control(self, response):
+        if request.endpoint == 'static' and response.status_code == 200:
+            filename = (request.view_args or {}).get('filename')
+            version = request.args.get('v')
+            # Solo la URL con el hash vigente es inmutable
+            if filename and version and version == self.static_hash(filename):
+                response.headers['Cache-Control'] = \
+                    f'public, max-age={self.static_max_age}, immutable'
+        return response
+
+
+def _tree_digest(folder):
+    digest = hashlib.sha1()
+    for root, _, files in sorted(os.walk(folder)):
+        for name in sorted(files):
+            with open(os.path.join(root, name), 'rb') as f:
+                digest.update(name.encode('utf-8'))
+                digest.update(f.read())
+    return digest.hexdigest()[:12]
@@ -0,0 +1,78 @@
+from flask_login import UserMixin
+from .cache import LRUBackend
+
+
+class UserSnapshot(UserMixin):
+    """
+    Copia ligera de los datos de un usuario autenticado. Es lo que Flask-Login
+    expone como `current_user`; no está ligada a la sesión de SQLAlchemy,
+    así que se puede compartir entre peticiones.
+    """
+
+    def __init__(self, id, username, email, role):
+        self.id = id
+        self.username = username
+        self.email = email
+        self.role = role
+
+
+class IdentityCache:
+    """
+    Caché de corta duración de `UserSnapshot` por id de usuario, para no
+    consultar la tabla users en cada petición autenticada.
+
+    Cada proceso tiene su propia caché y no hay invalidación entre workers:
+    un cambio de nombre, correo o rol se ve, como tarde, IDENTITY_CACHE_TTL
+    segundos después.
+
+    Configuración:
+        IDENTITY_CACHE_TTL: segundos de vida de cada entrada (0 la desactiva)
+        IDENTITY_CACHE_SIZE: número máximo de usuarios en memoria
+    """
+
+    def __init__(self, app=None):
+        self.backend = None
+        self.ttl = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.ttl = app.config.get('IDENTITY_CACHE_TTL', 30)
+        self.backend = LRUBackend(app.config.get('IDENTITY_CACHE_SIZE', 10000))
+
+    def get(self, user_id):
+        """
+        Devuelve el snapshot del usuario, leyéndolo de la base de datos solo
+        si no está en caché. Devuelve None si el usuario no existe.
+        """
+        if self.ttl:
+            snapshot = self.backend.get(user_id)
+            if snapshot is not None:
+                return snapshot
+        snapshot = load_snapshot(user_id)
+        if snapshot is not None and self.ttl:
+            self.backend.set(user_id, snapshot, ttl=self.ttl)
+        return snapshot
+
+
+def load_snapshot(user_id):
+    """
+    Lee de la base de datos solo las columnas necesarias del usuario.
+    """
+    from .models import User
+    row = User.query.with_entities(
+        User.id, User.username, User.email, User.role
+    ).filter(User.id == user_id).first()
+    return UserSnapshot(*row) if row else None
+
+
+def sync_session(session, user):
+    """
+    Copia los datos del usuario a la sesión solo si cambiaron. Asignar una
+    clave de la sesión la marca como modificada y obliga a Flask a firmar y
+    enviar una cookie nueva, así que se evita cuando no hace falta.
+    """
+    values = {'username': user.username, 'email': user.email, 'id': user.id}
+    for key, value in values.items():
+        if session.get(key) != value:
+            session[key] = value
@@ -0,0 +1,357 @@
+import heapq
+import itertools
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from sqlalchemy import event, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# Clave de session.info donde se guardan los trabajos encolados en la
+# transacción actual, hasta que se confirme
+PENDING_KEY = 'pending_jobs'
+
+
+class QueuedJob:
+    """
+    Trabajo reclamado por un worker, independiente del backend.
+    """
+
+    def __init__(self, id, name, payload, attempts, max_attempts, key=None):
+        self.id = id
+        self.name = name
+        self.payload = payload
+        self.attempts = attempts
+        self.max_attempts = max_attempts
+        self.key = key
+
+
+class MemoryBackend:
+    """
+    Cola en memoria del proceso. Los trabajos se pierden si el proceso
+    termina; pensada para pruebas y despliegues de un solo proceso. Las
+    claves de idempotencia se recuerdan mientras el trabajo no termina.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._heap = []
+        self._jobs = {}
+        self._keys = set()
+        self._ids = itertools.count(1)
+
+    def push(self, name, payload, key, max_attempts):
+        with self._lock:
+            if key is not None and key in self._keys:
+                return False
+            if key is not None:
+                self._keys.add(key)
+            job_id = next(self._ids)
+            self._jobs[job_id] = QueuedJob(job_id, name, payload, 0, max_attempts, key)
+            heapq.heappush(self._heap, (time.time(), job_id))
+            return True
+
+    def claim(self, limit):
+        claimed = []
+        now = time.time()
+        with self._lock:
+            while self._heap and len(claimed) < limit and self._heap[0][0] <= now:
+                _, job_id = heapq.heappop(self._heap)
+                job = self._jobs[job_id]
+                job.attempts += 1
+                claimed.append(job)
+        return claimed
+
+    def _forget(self, job):
+        with self._lock:
+            self._jobs.pop(job.id, None)
+            self._keys.discard(job.key)
+
+    def complete(self, job):
+        self._forget(job)
+
+    def retry(self, job, error, delay):
+        with self._lock:
+            heapq.heappush(self._heap, (time.time() + delay, job.id))
+
+    def fail(self, job, error):
+        self._forget(job)
+
+    def pending(self):
+        with self._lock:
+            return len(self._heap)
+
+    def purge(self, older_than):
+        # Los trabajos terminados ya se descartaron al terminar
+        return 0
+
+
+class DatabaseBackend:
+    """
+    Cola sobre la tabla `jobs`. El trabajo se inserta en la misma
+    transacción que la escritura que lo origina, así que solo existe si esa
+    escritura se confirmó. Los workers lo reclaman con un UPDATE condicional
+    (FOR UPDATE SKIP LOCKED en PostgreSQL) y un trabajo que quedó en
+    'running' más de `lease` segundos se considera abandonado y se reintenta.
+    """
+
+    def __init__(self, db, lease=300):
+        self.db = db
+        self.lease = lease
+
+    def add(self, session, name, payload, key, max_attempts):
+        from .models import Job
+        job = Job(name=name, payload=payload, idempotency_key=key,
+                  max_attempts=max_attempts, run_at=datetime.utcnow())
+        if key is None:
+            session.add(job)
+            return True
+        try:
+            with session.begin_nested():
+                session.add(job)
+            return True
+        except IntegrityError:
+            return False
+
+    def claim(self, limit):
+        from .models import Job
+        session = self.db.session
+        now = datetime.utcnow()
+        expired = now - timedelta(seconds=self.lease)
+        if self.db.engine.dialect.name == 'postgresql':
+            rows = session.execute(text("""
+                UPDATE jobs SET status = 'running', attempts = attempts + 1, locked_at = :now
+                WHERE id IN (
+                    SELECT id FROM jobs
+                    WHERE (status = 'pending' AND run_at <= :now)
+                       OR (status = 'running' AND locked_at < :expired)
+                    ORDER BY run_at
+                    LIMIT :limit
+                    FOR UPDATE SKIP LOCKED)
+                RETURNING id, name, payload, attempts, max_attempts
+            """), {'now': now, 'expired': expired, 'limit': limit}).all()
+            session.commit()
+            return [QueuedJob(*row) for row in rows]
+
+        candidates = session.query(Job.id).filter(
+            ((Job.status == 'pending') & (Job.run_at <= now))
+            | ((Job.status == 'running') & (Job.locked_at < expired))
+        ).order_by(Job.run_at).limit(limit).all()
+        claimed = []
+        for (job_id,) in candidates:
+            # Solo gana el worker cuyo UPDATE encuentra la fila sin tomar
+            updated = session.query(Job).filter(
+                Job.id == job_id,
+                ((Job.status == 'pending') | (Job.locked_at < expired)),
+            ).update({'status': 'running', 'attempts': Job.attempts + 1, 'locked_at': now},
+                     synchronize_session=False)
+            if updated:
+                claimed.append(job_id)
+        session.commit()
+        rows = session.query(Job.id, Job.name, Job.payload, Job.attempts, Job.max_attempts) \
+            .filter(Job.id.in_(claimed)).all() if claimed else []
+        return [QueuedJob(*row) for row in rows]
+
+    def _finish(self, job, **values):
+        from .models import Job
+        session = self.db.session
+        session.query(Job).filter(Job.id == job.id).update(values, synchronize_session=False)
+        session.commit()
+
+    def complete(self, job):
+        self._finish(job, status='done', locked_at=None, last_error=None)
+
+    def retry(self, job, error, delay):
+        self._finish(job, status='pending', locked_at=None, last_error=error,
+                     run_at=datetime.utcnow() + timedelta(seconds=delay))
+
+    def fail(self, job, error):
+        self._finish(job, status='failed', locked_at=None, last_error=error)
+
+    def pending(self):
+        from .models import Job
+        return self.db.session.query(Job).filter(Job.status == 'pending').count()
+
+    def purge(self, older_than):
+        """
+        Borra los trabajos terminados antes de `older_than`. Sus claves de
+        idempotencia dejan de bloquear nuevos encolados.
+        """
+        from .models import Job
+        session = self.db.session
+        deleted = session.query(Job).filter(
+            Job.status == 'done', Job.created_at < older_than,
+        ).delete(synchronize_session=False)
+        session.commit()
+        return deleted
+
+
+class JobQueue:
+    """
+    Trabajos en segundo plano para los efectos secundarios de las
+    escrituras, de modo que la petición responde sin esperarlos.
+
+    Los handlers se registran con `@jobs.task('nombre')` y se encolan con
+    `jobs.enqueue('nombre', key=..., **payload)` dentro de la transacción de
+    la escritura. Cada trabajo se reintenta con backoff exponencial hasta
+    JOBS_MAX_ATTEMPTS veces; los handlers deben ser idempotentes.
+
+    Configuración:
+        JOBS_BACKEND: 'memory' (por defecto; cola del proceso atendida por
+            hilos propios) o 'database' (tabla `jobs`, atendida por
+            `flask jobs-worker`)
+        JOBS_WORKERS: hilos que atienden la cola en memoria (0 = ninguno;
+            los trabajos se ejecutan con run_pending(), útil en pruebas)
+        JOBS_MAX_ATTEMPTS: intentos por trabajo antes de marcarlo fallido
+        JOBS_BACKOFF: segundos de espera antes del primer reintento
+        JOBS_LEASE: segundos tras los que un trabajo en curso se da por
+            abandonado (solo backend 'database')
+    """
+
+    def __init__(self, app=None, db=None):
+        self.handlers = {}
+        self.app = None
+        self.db = db
+        self.backend = None
+        self.workers = 0
+        self.max_attempts = 5
+        self.backoff = 2.0
+        self._dispatcher = None
+        self._wakeup = threading.Event()
+        if app is not None:
+            self.init_app(app, db)
+
+    def init_app(self, app, db):
+        self.app = app
+        self.db = db
+        kind = app.config.get('JOBS_BACKEND', 'memory')
+        self.workers = app.config.get('JOBS_WORKERS', 2)
+        self.max_attempts = app.config.get('JOBS_MAX_ATTEMPTS', 5)
+        self.backoff = app.config.get('JOBS_BACKOFF', 2.0)
+        if kind == 'memory':
+            self.backend = MemoryBackend()
+        elif kind == 'database':
+            self.backend = DatabaseBackend(db, app.config.get('JOBS_LEASE', 300))
+        else:
+            raise ValueError(f"JOBS_BACKEND desconocido: {kind}")
+        _listen_session_events()
+
+    def task(self, name):
+        """
+        Registra la función decorada como handler del trabajo `name`.
+        """
+        def decorator(func):
+            self.handlers[name] = func
+            return func
+        return decorator
+
+    def enqueue(self, name, key=None, **payload):
+        """
+        Encola el trabajo `name`. Se hace visible a los workers cuando se
+        confirma la transacción actual y se descarta si se revierte. Con
+        `key`, un segundo encolado con la misma clave se ignora.
+        """
+        if name not in self.handlers:
+            raise KeyError(f"Trabajo no registrado: {name}")
+        session = self.db.session
+        if isinstance(self.backend, DatabaseBackend):
+            self.backend.add(session, name, payload, key, self.max_attempts)
+        else:
+            session.info.setdefault(PENDING_KEY, []).append((self, name, payload, key))
+
+    def _publish(self, name, payload, key):
+        if self.backend.push(name, payload, key, self.max_attempts) and self.workers:
+            self._ensure_dispatcher()
+            self._wakeup.set()
+
+    def run_pending(self, limit=100):
+        """
+        Ejecuta en el hilo actual los trabajos listos. Devuelve cuántos
+        se ejecutaron con éxito.
+        """
+        return sum(self._execute(job) for job in self.backend.claim(limit))
+
+    def _execute(self, job):
+        handler = self.handlers.get(job.name)
+        try:
+            if handler is None:
+                raise KeyError(f"Trabajo no registrado: {job.name}")
+            handler(**job.payload)
+        except Exception as e:
+            self.db.session.rollback()
+            error = f"{type(e).__name__}: {e}"
+            if job.attempts >= job.max_attempts:
+                logger.exception("Trabajo %s (%s) fallido tras %d intentos",
+                                 job.id, job.name, job.attempts)
+                self.backend.fail(job, error)
+            else:
+                delay = self.backoff * 2 ** (job.attempts - 1) * random.uniform(0.5, 1.5)
+                logger.warning("Trabajo %s (%s) falló, reintento en %.1f s: %s",
+                               job.id, job.name, delay, error)
+                self.backend.retry(job, error, delay)
+            return False
+        self.backend.complete(job)
+        return True
+
+    def work(self, threads, poll_interval=1.0, stop=None, burst=False):
+        """
+        Atiende la cola con un pool de `threads` hilos hasta que se active
+        `stop` (o, con `burst`, hasta que no queden trabajos listos).
+        """
+        stop = stop or threading.Event()
+        with ThreadPoolExecutor(max_workers=threads, thread_name_prefix='jobs') as pool:
+            while not stop.is_set():
+                jobs = self.backend.claim(threads)
+                if not jobs:
+                    if burst:
+                        break
+                    self._wakeup.wait(poll_interval)
+                    self._wakeup.clear()
+                    continue
+                for future in [pool.submit(self._execute_in_context, job) for job in jobs]:
+                    future.result()
+
+    def _execute_in_context(self, job):
+        with self.app.app_context():
+            try:
+                return self._execute(job)
+            finally:
+                self.db.session.remove()
+
+    def _ensure_dispatcher(self):
+        # La cola en memoria se atiende con hilos del propio proceso web
+        if self._dispatcher is None or not self._dispatcher.is_alive():
+            self._dispatcher = threading.Thread(
+                target=self._dispatch, name='jobs-dispatcher', daemon=True)
+            self._dispatcher.start()
+
+    def _dispatch(self):
+        with self.app.app_context():
+            self.work(self.workers)
+
+
+def _after_commit(session):
+    for queue, name, payload, key in session.info.pop(PENDING_KEY, ()):
+        queue._publish(name, payload, key)
+
+
+def _after_soft_rollback(session, previous_transaction):
+    # Revertir un SAVEPOINT no descarta lo encolado en la transacción externa
+    if previous_transaction.parent is None:
+        session.info.pop(PENDING_KEY, None)
+
+
+_session_events_registered = False
+
+
+def _listen_session_events():
+    global _session_events_registered
+    if not _session_events_registered:
+        event.listen(Session, 'after_commit', _after_commit)
+        event.listen(Session, 'after_soft_rollback', _after_soft_rollback)
+        _session_events_registered = True
@@ -0,0 +1,69 @@
+import importlib
+
+
+class LazyExtension:
+    """
+    Extensión de Flask que no se importa al crear la aplicación. `init_app`
+    solo anota la aplicación; el paquete se importa y se inicializa la
+    primera vez que se usa el objeto (o alguien lee `app.extensions[key]`).
+
+    `target` es 'modulo:Clase'. Con `key`, se deja en app.extensions un
+    marcador que carga la extensión al usarse, para las extensiones que se
+    buscan ahí (p. ej. los comandos `flask db` de Flask-Migrate). Con
+    `before_serving`, la carga se hace a más tardar antes de la primera
+    petición, para extensiones que registran manejadores en la aplicación.
+    """
+
+    def __init__(self, target, key=None, before_serving=False):
+        self._target = target
+        self._key = key
+        self._before_serving = before_serving
+        self._extension = None
+        self._pending = []
+
+    @property
+    def loaded(self):
+        return self._extension is not None and not self._pending
+
+    def init_app(self, app, *args, **kwargs):
+        self._pending.append((app, args, kwargs))
+        if self._key is not None:
+            app.extensions[self._key] = _Placeholder(self, app)
+        if self._before_serving:
+            app.before_first_request(self.load)
+
+    def load(self):
+        """
+        Importa la extensión (una sola vez) e inicializa las aplicaciones
+        registradas que faltan. Devuelve la instancia real.
+        """
+        if self._extension is None:
+            module, _, name = self._target.partition(':')
+            self._extension = getattr(importlib.import_module(module), name)()
+        pending, self._pending = self._pending, []
+        for app, args, kwargs in pending:
+            self._extension.init_app(app, *args, **kwargs)
+        return self._extension
+
+    def __getattr__(self, name):
+        # Solo se llama para atributos que no son del propio LazyExtension
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.load(), name)
+
+
+class _Placeholder:
+    """
+    Ocupa app.extensions[key] hasta que la extensión se carga; al primer
+    acceso la carga y delega en lo que la extensión dejó en su lugar.
+    """
+
+    def __init__(self, lazy, app):
+        self._lazy = lazy
+        self._app = app
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        self._lazy.load()
+        return getattr(self._app.extensions[self._lazy._key], name)
@@ -0,0 +1,219 @@
+import hmac
+import logging
+import threading
+import time
+from bisect import bisect_left
+from flask import Response, abort, current_app, g, has_request_context, request
+from jinja2 import Template
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Límites superiores (en segundos) de los buckets de los histogramas
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+    """
+    Histograma acumulativo con buckets fijos, al estilo de Prometheus.
+    """
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        index = bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.total += value
+        self.count += 1
+
+    def samples(self):
+        """
+        Devuelve [(le, conteo acumulado)] incluyendo el bucket +Inf.
+        """
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            yield _format_number(bound), cumulative
+        yield '+Inf', self.count
+
+
+def _format_number(value):
+    return repr(float(value)) if not float(value).is_integer() else f"{float(value):.1f}"
+
+
+class MetricsRegistry:
+    """
+    Histogramas por (métrica, endpoint). Cada proceso mantiene los suyos.
+    """
+
+    METRICS = {
+        'http_request_duration_seconds': ('Tiempo total de la petición', DEFAULT_BUCKETS),
+        'sql_queries_per_request': ('Consultas SQL por petición', QUERY_BUCKETS),
+        'sql_duration_seconds': ('Tiempo en SQL por petición', DEFAULT_BUCKETS),
+        'template_render_seconds': ('Tiempo de renderizado de plantillas por petición', DEFAULT_BUCKETS),
+    }
+
+    def __init__(self):
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name, endpoint, value):
+        with self._lock:
+            histogram = self._histograms.get((name, endpoint))
+            if histogram is None:
+                histogram = self._histograms[(name, endpoint)] = Histogram(self.METRICS[name][1])
+            histogram.observe(value)
+
+    def mean(self, name, endpoint):
+        """
+        Promedio de lo observado para (métrica, endpoint), o None si no hay datos.
+        """
+        with self._lock:
+            histogram = self._histograms.get((name, endpoint))
+            if histogram is None or not histogram.count:
+                return None
+            return histogram.total / histogram.count
+
+    def render(self):
+        """
+        Serializa todos los histogramas en el formato de texto de Prometheus.
+        """
+        lines = []
+        with self._lock:
+            for name, (description, _) in self.METRICS.items():
+                lines.append(f"# HELP {name} {description}")
+                lines.append(f"# TYPE {name} histogram")
+                for (metric, endpoint), histogram in sorted(self._histograms.items()):
+                    if metric != name:
+                        continue
+                    label = f'endpoint="{endpoint}"'
+                    for bound, count in histogram.samples():
+                        lines.append(f'{name}_bucket{{{label},le="{bound}"}} {count}')
+                    lines.append(f'{name}_sum{{{label}}} {histogram.total}')
+                    lines.append(f'{name}_count{{{label}}} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+    def clear(self):
+        with self._lock:
+            self._histograms.clear()
+
+
+class TimedTemplate(Template):
+    """
+    Plantilla de Jinja que acumula su tiempo de renderizado en la petición
+    actual. Los {% include %} se renderizan dentro de la plantilla padre,
+    así que no se cuentan dos veces.
+    """
+
+    def render(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return super().render(*args, **kwargs)
+        finally:
+            if has_request_context() and hasattr(g, '_metrics_start'):
+                g._metrics_template_time += time.perf_counter() - start
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and hasattr(g, '_metrics_start'):
+        context._metrics_query_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, '_metrics_query_start', None)
+    if started is not None and has_request_context() and hasattr(g, '_metrics_start'):
+        g._metrics_sql_count += 1
+        g._metrics_sql_time += time.perf_counter() - started
+
+
+class Metrics:
+    """
+    Instrumentación por endpoint: tiempo total, número y tiempo de consultas
+    SQL (vía eventos del Engine de SQLAlchemy) y tiempo de renderizado de
+    plantillas. Los datos se exponen como histogramas en /metrics y las
+    peticiones lentas se registran en el log.
+
+    /metrics responde 403 salvo con `Authorization: Bearer <METRICS_TOKEN>`,
+    desde una IP de METRICS_ALLOWED_IPS o en modo debug; sin configurar
+    ninguno de los dos, fuera de desarrollo nadie puede leerlo.
+
+    Configuración:
+        METRICS_ENABLED: activa la instrumentación (por defecto True)
+        METRICS_SLOW_REQUEST_MS: umbral para registrar una petición lenta
+        METRICS_TOKEN: token que permite leer /metrics
+        METRICS_ALLOWED_IPS: IPs que pueden leer /metrics sin token
+    """
+
+    _engine_events_registered = False
+
+    def __init__(self, app=None):
+        self.registry = MetricsRegistry()
+        self.slow_request_ms = 500
+        self.token = None
+        self.allowed_ips = frozenset()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        if not app.config.get('METRICS_ENABLED', True):
+            return
+        self.slow_request_ms = app.config.get('METRICS_SLOW_REQUEST_MS', 500)
+        self.token = app.config.get('METRICS_TOKEN')
+        self.allowed_ips = frozenset(app.config.get('METRICS_ALLOWED_IPS') or ())
+        app.jinja_env.template_class = TimedTemplate
+
+        if not Metrics._engine_events_registered:
+            event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+            Metrics._engine_events_registered = True
+
+        app.before_request(self._start)
+        app.after_request(self._finish)
+        app.add_url_rule('/metrics', 'metrics', self._expose)
+
+    @staticmethod
+    def _start():
+        g._metrics_start = time.perf_counter()
+        g._metrics_sql_count = 0
+        g._metrics_sql_time = 0.0
+        g._metrics_template_time = 0.0
+
+    def _finish(self, response):
+        started = g.pop('_metrics_start', None)
+        endpoint = request.endpoint
+        if started is None or endpoint is None or endpoint in ('metrics', 'static'):
+            return response
+
+        elapsed = time.perf_counter() - started
+        self.registry.observe('http_request_duration_seconds', endpoint, elapsed)
+        self.registry.observe('sql_queries_per_request', endpoint, g._metrics_sql_count)
+        self.registry.observe('sql_duration_seconds', endpoint, g._metrics_sql_time)
+        self.registry.observe('template_render_seconds', endpoint, g._metrics_template_time)
+
+        if elapsed * 1000 >= self.slow_request_ms:
+            logger.warning(
+                "Petición lenta: %s %s (%s) %.1f ms, %d consultas SQL (%.1f ms), plantillas %.1f ms",
+                request.method, request.path, endpoint, elapsed * 1000,
+                g._metrics_sql_count, g._metrics_sql_time * 1000,
+                g._metrics_template_time * 1000)
+        return response
+
+    def _authorized(self):
+        if current_app.debug or request.remote_addr in self.allowed_ips:
+            return True
+        scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+        return bool(self.token) and scheme.lower() == 'bearer' and \
+            hmac.compare_digest(token.encode('utf-8'), self.token.encode('utf-8'))
+
+    def _expose(self):
+        if not self._authorized():
+            abort(403)
+        return Response(self.registry.render(),
+                        mimetype='text/plain; version=0.0.4; charset=utf-8')
@@ -1,7 +1,17 @@
 from datetime import datetime
 from . import db
 from flask_login import UserMixin
-from sqlalchemy.dialects.postgresql import ARRAY
+
+
+# Tabla de asociación entre preguntas y etiquetas. La clave primaria cubre la
+# búsqueda por pregunta y el índice (tag_id, question_id) la búsqueda por etiqueta.
+question_tags = db.Table(
+    'question_tags',
+    db.Column('question_id', db.Integer, db.ForeignKey(
+        'questions.id'), primary_key=True),
+    db.Column('tag_id', db.Integer, db.ForeignKey('tags.id'), primary_key=True),
+    db.Index('ix_question_tags_tag_id_question_id', 'tag_id', 'question_id'),
+)
 
 
 class User(db.Model, UserMixin):
@@ -11,6 +21,14 @@ class User(db.Model, UserMixin):
     email = db.Column(db.String(150), unique=True, nullable=False)
     password = db.Column(db.String(150), nullable=False)
     role = db.Column(db.String(50), nullable=False)
+    # Estadísticas del perfil, mantenidas de forma incremental por
+    # app/counters.py y corregidas con reconcile_counters
+    question_count = db.Column(db.Integer, nullable=False,
+                               default=0, server_default='0')
+    answer_count = db.Column(db.Integer, nullable=False,
+                             default=0, server_default='0')
+    reputation = db.Column(db.Integer, nullable=False,
+                           default=0, server_default='0')
     # Cambio de nombre del backref a 'user_answers' para evitar conflicto
     questions = db.relationship('Question', backref='creator', lazy=True)
     answers = db.relationship('Answer', backref='answer_author', lazy=True)
@@ -22,12 +40,33 @@ class Question(db.Model):
     title = db.Column(db.String(200), nullable=False)
     content = db.Column(db.Text, nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
-    total_votes = db.Column(db.Integer, default=0)
-    total_answers = db.Column(db.Integer, default=0)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Contadores desnormalizados, mantenidos por app/counters.py
+    total_votes = db.Column(db.Integer, nullable=False,
+                            default=0, server_default='0')
+    total_answers = db.Column(db.Integer, nullable=False,
+                              default=0, server_default='0')
+    # Aumenta con cada respuesta o voto sobre la pregunta o sus respuestas,
+    # en la misma transacción (ver app/counters.py). Las claves de la caché
+    # de fragmentos y los ETag salen de aquí
+    revision = db.Column(db.Integer, nullable=False,
+                         default=0, server_default='0')
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     author = db.relationship(
         'User', backref=db.backref('user_questions', lazy=True))
-    tags = db.Column(ARRAY(db.String), default=list)
+    tags = db.relationship('Tag', secondary=question_tags, lazy=True,
+                           order_by='Tag.name')
+
+    # Índices compuestos usados por la paginación por cursor del feed y de
+    # la actividad de cada usuario
+    __table_args__ = (
+        db.Index('ix_questions_created_at_id', 'created_at', 'id'),
+        db.Index('ix_questions_user_id_created_at_id', 'user_id', 'created_at', 'id'),
+        # Feeds "más votadas" y "sin respuesta" (ver app/rankings.py)
+        db.Index('ix_questions_total_votes_id', 'total_votes', 'id'),
+        db.Index('ix_questions_unanswered', 'created_at', 'id',
+                 postgresql_where=db.text('total_answers = 0'),
+                 sqlite_where=db.text('total_answers = 0')),
+    )
 
 
 class Answer(db.Model):
@@ -38,18 +77,76 @@ class Answer(db.Model):
         'questions.id'), nullable=False)
     author_id = db.Column(
         db.Integer, db.ForeignKey('users.id'), nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    # Puntaje desnormalizado, mantenido por app/votes.py
+    total_votes = db.Column(db.Integer, nullable=False,
+                            default=0, server_default='0')
 
     author = db.relationship(
         'User', backref=db.backref('user_answers', lazy=True))
     question = db.relationship(
         'Question', backref=db.backref('answers', lazy=True))
 
+    # Actividad del usuario y respuestas de cada pregunta paginadas por
+    # cursor; el primero de los índices por pregunta sirve también para
+    # buscar por question_id
+    __table_args__ = (
+        db.Index('ix_answers_author_id_created_at_id', 'author_id', 'created_at', 'id'),
+        db.Index('ix_answers_question_id_created_at_id', 'question_id', 'created_at', 'id'),
+        db.Index('ix_answers_question_id_total_votes_id', 'question_id', 'total_votes', 'id'),
+    )
+
+
+class QuestionRanking(db.Model):
+    __tablename__ = 'question_rankings'
+    question_id = db.Column(db.Integer, db.ForeignKey('questions.id'), primary_key=True)
+    # Puntaje "hot" con decaimiento por edad, materializado por app/rankings.py
+    hot_score = db.Column(db.Float, nullable=False, default=0, server_default='0')
+    # Última respuesta o voto recibido (o la creación de la pregunta)
+    last_activity_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    refreshed_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    # Cada feed ordenado es una lectura de un rango de estos índices
+    __table_args__ = (
+        db.Index('ix_question_rankings_hot', 'hot_score', 'question_id'),
+        db.Index('ix_question_rankings_activity', 'last_activity_at', 'question_id'),
+    )
+
 
-# class Tags(db.Model):
-#     __tablename__ = 'tags'
-#     id = db.Column(db.Integer, primary_key=True)
-#     name = db.Column(db.String(100), nullable=False)
+class QuestionSignature(db.Model):
+    __tablename__ = 'question_signatures'
+    question_id = db.Column(db.Integer, db.ForeignKey('questions.id'), primary_key=True)
+    # Firma MinHash de título + contenido, mantenida por app/similarity.py
+    signature = db.Column(db.LargeBinary, nullable=False)
+    # Firma del título solo, para las sugerencias mientras se escribe el
+    # título (None si el título no tiene términos)
+    title_signature = db.Column(db.LargeBinary, nullable=True)
+
+
+class QuestionBucket(db.Model):
+    __tablename__ = 'question_lsh_buckets'
+    # Una fila por banda de la firma: las preguntas que comparten algún
+    # (band, bucket) son candidatas a ser parecidas. Las bandas de la firma
+    # del título van a continuación de las de la firma completa
+    band = db.Column(db.SmallInteger, primary_key=True, autoincrement=False)
+    bucket = db.Column(db.BigInteger, primary_key=True, autoincrement=False)
+    question_id = db.Column(db.Integer, db.ForeignKey('questions.id'), primary_key=True)
+
+    # Para reemplazar las bandas de una pregunta al recalcular su firma
+    __table_args__ = (
+        db.Index('ix_question_lsh_buckets_question_id', 'question_id'),
+    )
+
+
+class Tag(db.Model):
+    __tablename__ = 'tags'
+    id = db.Column(db.Integer, primary_key=True)
+    # Nombre normalizado (ver app/tags.py). En PostgreSQL el autocompletado
+    # usa además el índice ix_tags_name_prefix (varchar_pattern_ops)
+    name = db.Column(db.String(100), unique=True, nullable=False)
+    # Número de preguntas con la etiqueta, mantenido de forma incremental
+    question_count = db.Column(db.Integer, nullable=False,
+                               default=0, server_default='0')
 
 
 class Vote(db.Model):
@@ -59,6 +156,70 @@ class Vote(db.Model):
     # Clave foránea a usuarios
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
 
-    # Clave foránea a preguntas
+    # Clave foránea a preguntas. En los votos a respuestas es la pregunta
+    # a la que pertenece la respuesta
     question_id = db.Column(db.Integer, db.ForeignKey(
         'questions.id'), nullable=False)
+
+    # Clave foránea a respuestas; NULL si el voto es a la pregunta
+    answer_id = db.Column(db.Integer, db.ForeignKey('answers.id'))
+
+    # +1 (a favor) o -1 (en contra)
+    value = db.Column(db.SmallInteger, nullable=False, default=1)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    # Un voto por usuario y objetivo; los upserts de app/votes.py usan
+    # estos índices como destino de ON CONFLICT
+    __table_args__ = (
+        db.Index('uq_votes_user_question', 'user_id', 'question_id', unique=True,
+                 postgresql_where=db.text('answer_id IS NULL'),
+                 sqlite_where=db.text('answer_id IS NULL')),
+        db.Index('uq_votes_user_answer', 'user_id', 'answer_id', unique=True,
+                 postgresql_where=db.text('answer_id IS NOT NULL'),
+                 sqlite_where=db.text('answer_id IS NOT NULL')),
+        db.CheckConstraint('value IN (-1, 1)', name='ck_votes_value'),
+        db.Index('ix_votes_user_id_created_at_id', 'user_id', 'created_at', 'id'),
+    )
+
+
+class Job(db.Model):
+    __tablename__ = 'jobs'
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    payload = db.Column(db.JSON, nullable=False, default=dict)
+
+    # Clave opcional para no encolar dos veces el mismo trabajo
+    idempotency_key = db.Column(db.String(200), unique=True)
+
+    # 'pending', 'running', 'done' o 'failed'
+    status = db.Column(db.String(20), nullable=False, default='pending')
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=5)
+    run_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    locked_at = db.Column(db.DateTime)
+    last_error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    # Los workers buscan los trabajos pendientes más antiguos
+    __table_args__ = (
+        db.Index('ix_jobs_status_run_at', 'status', 'run_at'),
+    )
+
+
+class ImportProgress(db.Model):
+    __tablename__ = 'import_progress'
+    # Registros de cada tipo ya guardados por una importación con nombre
+    # (ver app/bulk.py); se actualiza en la transacción de cada lote
+    name = db.Column(db.String(100), primary_key=True)
+    kind = db.Column(db.String(20), primary_key=True)
+    imported = db.Column(db.Integer, nullable=False, default=0)
+
+
+class ImportIdMap(db.Model):
+    __tablename__ = 'import_id_maps'
+    # Id de origen del volcado -> id asignado al importarlo, escritos junto
+    # con las filas del lote
+    name = db.Column(db.String(100), primary_key=True)
+    kind = db.Column(db.String(20), primary_key=True)
+    source_id = db.Column(db.String(100), primary_key=True)
+    new_id = db.Column(db.Integer, nullable=False)
@@ -0,0 +1,123 @@
+import base64
+import binascii
+from datetime import datetime
+from sqlalchemy import and_, literal, or_, select, text
+from . import db
+
+
+def encode_cursor(position, item_id):
+    """
+    Codifica la posición (valor de orden, id) de una fila en un cursor
+    opaco apto para usarse en la URL. El valor suele ser created_at, pero
+    puede ser cualquier número o fecha.
+    """
+    value = position.isoformat() if isinstance(position, datetime) else repr(position)
+    raw = f"{value}|{item_id}".encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, value_type=datetime):
+    """
+    Decodifica un cursor generado por `encode_cursor`; `value_type` es el
+    tipo del valor de orden (datetime, int o float).
+    Devuelve None si el cursor está vacío o no es válido.
+    """
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8')
+        value, item_id = raw.split('|', 1)
+        value = datetime.fromisoformat(value) if value_type is datetime else value_type(value)
+        return value, int(item_id)
+    except (ValueError, UnicodeError, binascii.Error):
+        return None
+
+
+class KeysetPage:
+    """
+    Resultado de una consulta paginada por cursor.
+    """
+
+    def __init__(self, items, next_cursor=None, total=None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.total = total
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+
+def approximate_count(model, *criteria):
+    """
+    Devuelve un conteo aproximado de filas de la tabla del modelo, o de las
+    que cumplen `criteria`. En PostgreSQL se lee la estimación del
+    planificador (pg_class.reltuples, o las filas que EXPLAIN espera para
+    el filtro), que no recorre la tabla; en otros motores se hace un
+    COUNT(*) normal.
+    """
+    table = model.__table__
+    if db.engine.dialect.name == 'postgresql':
+        if criteria:
+            statement = select(literal(1)).select_from(table).where(*criteria).compile(
+                dialect=db.engine.dialect, compile_kwargs={'literal_binds': True})
+            plan = db.session.execute(text(f"EXPLAIN (FORMAT JSON) {statement}")).scalar()
+            estimate = plan[0]['Plan']['Plan Rows']
+        else:
+            estimate = db.session.execute(
+                text("SELECT reltuples::bigint FROM pg_class WHERE relname = :table"),
+                {'table': table.name}).scalar()
+        # reltuples vale -1 (o 0) en tablas que nunca se han analizado
+        if estimate is not None and estimate > 0:
+            return int(estimate)
+    return db.session.query(db.func.count()).select_from(table).filter(*criteria).scalar()
+
+
+def paginate_keyset(query, model, cursor=None, per_page=10, with_total=False):
+    """
+    Pagina `query` por (created_at, id) en orden descendente.
+    El costo de cada página es el mismo sin importar su profundidad, ya que
+    se usa el índice compuesto en lugar de OFFSET.
+    """
+    page = paginate_by(query, model.created_at, model.id, cursor=cursor, per_page=per_page)
+    page.total = approximate_count(model) if with_total else None
+    return page
+
+
+def paginate_by(query, order_column, id_column, cursor=None, per_page=10, descending=True):
+    """
+    Pagina `query` por (order_column, id_column), en orden descendente o,
+    con `descending=False`, ascendente. Debe existir un índice sobre ambas
+    columnas para que cada página sea una lectura de un rango del índice.
+    """
+    position = decode_cursor(cursor, order_column.type.python_type)
+    if position is not None:
+        value, item_id = position
+        if descending:
+            query = query.filter(or_(
+                order_column < value,
+                and_(order_column == value, id_column < item_id)))
+        else:
+            query = query.filter(or_(
+                order_column > value,
+                and_(order_column == value, id_column > item_id)))
+
+    if descending:
+        query = query.order_by(order_column.desc(), id_column.desc())
+    else:
+        query = query.order_by(order_column.asc(), id_column.asc())
+    rows = query.limit(per_page + 1).all()
+
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        next_cursor = encode_cursor(*_position(rows[-1], order_column, id_column))
+    return KeysetPage(rows, next_cursor)
+
+
+def _position(row, order_column, id_column):
+    # Las filas pueden ser instancias del modelo o tuplas con nombre
+    if hasattr(row, '_mapping'):
+        return row._mapping[order_column], row._mapping[id_column]
+    return getattr(row, order_column.key), getattr(row, id_column.key)
@@ -0,0 +1,126 @@
+import atexit
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+import bcrypt
+
+
+class PasswordHasherBusy(Exception):
+    """
+    Se lanza cuando la cola de trabajos de hashing está llena. La aplicación
+    la convierte en un 503 con la cabecera Retry-After.
+    """
+
+
+def _hash(password, rounds):
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+
+
+def _check(password_hash, password):
+    try:
+        return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
+    except ValueError:
+        # Hash con formato inválido
+        return False
+
+
+def hash_rounds(password_hash):
+    """
+    Devuelve el factor de costo de un hash bcrypt ("$2b$12$..." -> 12).
+    """
+    try:
+        return int(password_hash.split('$')[2])
+    except (IndexError, ValueError):
+        return None
+
+
+class PasswordHasher:
+    """
+    Servicio de hashing de contraseñas con bcrypt. El trabajo de CPU se hace
+    en un pool de procesos acotado para no bloquear los hilos del servidor;
+    si hay demasiados trabajos pendientes se rechaza la petición con un 503
+    en lugar de encolarla sin límite.
+
+    Configuración:
+        PASSWORD_HASH_ROUNDS: factor de costo de bcrypt
+        PASSWORD_HASH_WORKERS: procesos del pool (0 hace el hashing en el
+            mismo hilo, útil en pruebas)
+        PASSWORD_HASH_QUEUE: trabajos pendientes permitidos antes de responder 503
+        PASSWORD_HASH_RETRY_AFTER: segundos sugeridos en la cabecera Retry-After
+    """
+
+    def __init__(self, app=None):
+        self.rounds = 12
+        self.workers = 0
+        self.retry_after = 1
+        self._executor = None
+        self._slots = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.rounds = app.config.get('PASSWORD_HASH_ROUNDS', 12)
+        self.workers = app.config.get('PASSWORD_HASH_WORKERS', 2)
+        self.retry_after = app.config.get('PASSWORD_HASH_RETRY_AFTER', 1)
+        queue_size = app.config.get('PASSWORD_HASH_QUEUE') or max(self.workers, 1) * 4
+        self._slots = threading.BoundedSemaphore(queue_size)
+        app.register_error_handler(PasswordHasherBusy, self._busy_response)
+
+    def _busy_response(self, error):
+        return ("Demasiadas solicitudes de inicio de sesión. Intenta de nuevo en unos segundos.",
+                503, {'Retry-After': str(self.retry_after)})
+
+    def _get_executor(self):
+        # El pool se crea en el primer uso, dentro del proceso que atiende
+        # peticiones, y con 'spawn' para no heredar hilos ni conexiones
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn'))
+                atexit.register(self._executor.shutdown, wait=False)
+            return self._executor
+
+    def _run(self, fn, *args):
+        if not self.workers:
+            return fn(*args)
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHasherBusy()
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future.result()
+
+    def hash(self, password):
+        """
+        Devuelve el hash bcrypt de la contraseña con el costo configurado.
+        """
+        return self._run(_hash, password, self.rounds)
+
+    def check(self, password_hash, password):
+        """
+        Verifica una contraseña contra su hash.
+        """
+        return self._run(_check, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        """
+        Indica si el hash se generó con un costo distinto al configurado.
+        """
+        return hash_rounds(password_hash) != self.rounds
+
+    def verify_and_upgrade(self, user, password):
+        """
+        Verifica la contraseña del usuario y, si es correcta pero su hash usa
+        un costo distinto al actual, la vuelve a hashear. El llamador debe
+        hacer commit para guardar el hash nuevo.
+        """
+        if not self.check(user.password, password):
+            return False
+        if self.needs_rehash(user.password):
+            user.password = self.hash(password)
+        return True
@@ -0,0 +1,82 @@
+from datetime import datetime
+from . import db, jobs, rankings
+from .models import Question, Answer
+from .counters import increment_answers, increment_user_questions, increment_user_answers
+from .tags import attach_tags
+from .votes import vote_question, vote_answer
+
+# Escrituras de las rutas que publican contenido. Ninguna hace commit ni
+# devuelve objetos de la sesión: se ejecutan con group_commit.run (ver
+# app/writer.py), que las confirma en la petición o en el hilo escritor.
+
+
+class SelfVoteError(Exception):
+    """
+    Se lanza cuando un usuario intenta votar su propia pregunta o respuesta.
+    """
+
+
+def create_question(user_id, title, content, tags):
+    """
+    Publica una pregunta con sus etiquetas y devuelve su id.
+    """
+    question = Question(title=title, content=content, user_id=user_id)
+    db.session.add(question)
+    attach_tags(question, tags)
+    increment_user_questions(user_id)
+    db.session.flush()
+    # La fila de ranking entra en la misma transacción; la indexación se
+    # hace fuera de la petición
+    rankings.add_question(question.id, question.created_at)
+    jobs.enqueue('index_question', key=f'index_question:{question.id}',
+                 question_id=question.id)
+    return question.id
+
+
+def create_answer(user_id, question_id, content):
+    """
+    Publica una respuesta y devuelve su id.
+    """
+    answer = Answer(content=content, question_id=question_id, author_id=user_id)
+    db.session.add(answer)
+    # El contador se actualiza en la misma transacción que el INSERT
+    increment_answers(question_id)
+    increment_user_answers(user_id)
+    db.session.flush()
+    jobs.enqueue('index_answer', key=f'index_answer:{answer.id}', answer_id=answer.id)
+    jobs.enqueue('refresh_ranking', question_id=question_id,
+                 activity_at=datetime.utcnow().isoformat())
+    return answer.id
+
+
+def cast_question_vote(user_id, question_id, value):
+    """
+    Registra un voto sobre una pregunta. Devuelve el cambio de puntaje.
+    Lanza SelfVoteError si el usuario es el autor.
+    """
+    author_id = db.session.query(Question.user_id).filter(Question.id == question_id).scalar()
+    if author_id == user_id:
+        raise SelfVoteError("No se puede votar una pregunta propia")
+    delta = vote_question(user_id, question_id, value)
+    if delta:
+        jobs.enqueue('refresh_ranking', question_id=question_id,
+                     activity_at=datetime.utcnow().isoformat())
+    return delta
+
+
+def cast_answer_vote(user_id, answer_id, value):
+    """
+    Registra un voto sobre una respuesta. Devuelve (id de la pregunta,
+    cambio de puntaje), o None si la respuesta no existe. Lanza
+    SelfVoteError si el usuario es el autor.
+    """
+    answer = db.session.get(Answer, answer_id)
+    if answer is None:
+        return None
+    if answer.author_id == user_id:
+        raise SelfVoteError("No se puede votar una respuesta propia")
+    delta = vote_answer(user_id, answer, value)
+    if delta:
+        jobs.enqueue('refresh_ranking', question_id=answer.question_id,
+                     activity_at=datetime.utcnow().isoformat())
+    return answer.question_id, delta
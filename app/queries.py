@@ -0,0 +1,72 @@
+from contextlib import contextmanager
+from sqlalchemy import event
+from sqlalchemy.orm import joinedload, selectinload
+from . import db
+from .models import Question, Answer
+from .pagination import paginate_by
+
+# Órdenes del hilo de respuestas: (columna de orden, descendente)
+ANSWER_SORTS = {
+    'oldest': (Answer.created_at, False),
+    'newest': (Answer.created_at, True),
+    'votes': (Answer.total_votes, True),
+}
+
+ANSWERS_PER_PAGE = 20
+
+
+def feed_query():
+    """
+    Consulta base del feed: trae el autor en el mismo SELECT y las etiquetas
+    en una sola consulta adicional. El número de respuestas se lee del
+    contador total_answers, sin tocar la tabla answers.
+    """
+    return Question.query.options(
+        joinedload(Question.author),
+        selectinload(Question.tags))
+
+
+def question_header(question_id):
+    """
+    Carga una pregunta con su autor y su número de respuestas, sin cargar
+    las respuestas en sí. Lanza 404 si no existe.
+    """
+    return feed_query().filter(Question.id == question_id).first_or_404()
+
+
+def answers_page(question_id, sort='oldest', cursor=None, per_page=ANSWERS_PER_PAGE):
+    """
+    Una página de respuestas de una pregunta (cada una con su autor en el
+    mismo SELECT), paginada por cursor en el orden `sort`:
+        oldest, newest  -> ix_answers_question_id_created_at_id
+        votes           -> ix_answers_question_id_total_votes_id
+    No carga la pregunta.
+    """
+    order_column, descending = ANSWER_SORTS[sort]
+    query = Answer.query.options(joinedload(Answer.author)) \
+        .filter(Answer.question_id == question_id)
+    return paginate_by(query, order_column, Answer.id, cursor=cursor,
+                       per_page=per_page, descending=descending)
+
+
+@contextmanager
+def count_queries(engine=None):
+    """
+    Cuenta las sentencias SQL ejecutadas dentro del bloque `with`.
+    Sirve para verificar el presupuesto de consultas de cada endpoint:
+
+        with count_queries() as queries:
+            client.get('/')
+        assert len(queries) <= 3
+    """
+    engine = engine or db.engine
+    statements = []
+
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', _before_cursor_execute)
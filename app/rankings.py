@@ -0,0 +1,155 @@
+from datetime import datetime
+from sqlalchemy import bindparam, update
+from sqlalchemy.exc import IntegrityError
+from . import db
+from .models import Question, QuestionRanking
+from .pagination import approximate_count, paginate_by, paginate_keyset
+
+# Feeds disponibles en la página principal
+FEEDS = ('recent', 'hot', 'votes', 'unanswered', 'activity')
+
+# Cada respuesta cuenta como dos votos en el puntaje "hot"
+ANSWER_POINTS = 2
+
+# Exponente del decaimiento por edad: cuanto mayor, antes se hunden las
+# preguntas viejas
+GRAVITY = 1.5
+
+
+def hot_score(total_votes, total_answers, created_at, now=None):
+    """
+    Puntaje "hot" de una pregunta: sus puntos divididos por su edad en horas
+    elevada a GRAVITY. Como depende de la hora actual, los puntajes
+    guardados se recalculan periódicamente con `redecay`.
+    """
+    now = now or datetime.utcnow()
+    age_hours = max(0.0, (now - created_at).total_seconds() / 3600)
+    points = (total_votes or 0) + ANSWER_POINTS * (total_answers or 0)
+    return points / (age_hours + 2) ** GRAVITY
+
+
+def ranked_feed(query, sort, cursor=None, per_page=10):
+    """
+    Página del feed `sort` sobre `query` (una consulta de Question, p. ej.
+    feed_query()). Cada orden es una lectura de un rango de índice:
+        recent      -> ix_questions_created_at_id
+        hot         -> ix_question_rankings_hot
+        votes       -> ix_questions_total_votes_id
+        unanswered  -> ix_questions_unanswered (índice parcial)
+        activity    -> ix_question_rankings_activity
+    """
+    if sort == 'recent':
+        return paginate_keyset(query, Question, cursor=cursor, per_page=per_page,
+                               with_total=True)
+    if sort == 'votes':
+        page = paginate_by(query, Question.total_votes, Question.id,
+                           cursor=cursor, per_page=per_page)
+        page.total = approximate_count(Question)
+        return page
+    if sort == 'unanswered':
+        query = query.filter(Question.total_answers == 0)
+        page = paginate_by(query, Question.created_at, Question.id,
+                           cursor=cursor, per_page=per_page)
+        page.total = approximate_count(Question, Question.total_answers == 0)
+        return page
+    if sort in ('hot', 'activity'):
+        column = QuestionRanking.hot_score if sort == 'hot' else QuestionRanking.last_activity_at
+        query = query.join(QuestionRanking, QuestionRanking.question_id == Question.id) \
+            .add_columns(column, QuestionRanking.question_id)
+        page = paginate_by(query, column, QuestionRanking.question_id,
+                           cursor=cursor, per_page=per_page)
+        page.items = [row[0] for row in page.items]
+        page.total = approximate_count(Question)
+        return page
+    raise ValueError(f"Feed desconocido: {sort}")
+
+
+def add_question(question_id, created_at):
+    """
+    Crea la fila de ranking de una pregunta recién publicada, dentro de la
+    transacción que la inserta, para que aparezca en los feeds "hot" y
+    "activity" sin esperar a ningún trabajo.
+    """
+    db.session.add(QuestionRanking(
+        question_id=question_id, hot_score=hot_score(0, 0, created_at, created_at),
+        last_activity_at=created_at, refreshed_at=created_at))
+
+
+def refresh_question(question_id, activity_at=None):
+    """
+    Recalcula la fila de ranking de una pregunta después de una respuesta o
+    un voto, creándola si no existe. Es idempotente.
+    """
+    question = db.session.query(
+        Question.total_votes, Question.total_answers, Question.created_at,
+    ).filter(Question.id == question_id).first()
+    if question is None:
+        return
+    now = datetime.utcnow()
+    score = hot_score(question.total_votes, question.total_answers, question.created_at, now)
+    activity_at = activity_at or question.created_at
+
+    updated = db.session.execute(
+        update(QuestionRanking)
+        .where(QuestionRanking.question_id == question_id)
+        .values(hot_score=score, refreshed_at=now,
+                last_activity_at=db.case(
+                    (QuestionRanking.last_activity_at < activity_at, activity_at),
+                    else_=QuestionRanking.last_activity_at))
+        .execution_options(synchronize_session=False)).rowcount
+    if not updated:
+        try:
+            with db.session.begin_nested():
+                db.session.add(QuestionRanking(
+                    question_id=question_id, hot_score=score,
+                    last_activity_at=activity_at, refreshed_at=now))
+        except IntegrityError:
+            # Otro worker creó la fila primero; su puntaje es igual de válido
+            pass
+    db.session.commit()
+
+
+def redecay(batch_size=1000, since=None):
+    """
+    Recalcula en lotes los puntajes "hot" guardados para reflejar el paso
+    del tiempo, y crea las filas que falten. Con `since`, solo se recorren
+    las preguntas con actividad posterior (las más viejas apenas cambian).
+    Devuelve el número de preguntas procesadas.
+    """
+    now = datetime.utcnow()
+    table = QuestionRanking.__table__
+    set_score = table.update() \
+        .where(table.c.question_id == bindparam('qid')) \
+        .values(hot_score=bindparam('score'), refreshed_at=now)
+    processed = 0
+    last_id = 0
+    while True:
+        query = db.session.query(
+            Question.id, Question.total_votes, Question.total_answers, Question.created_at,
+            QuestionRanking.question_id.label('ranked'),
+        ).outerjoin(QuestionRanking, QuestionRanking.question_id == Question.id) \
+            .filter(Question.id > last_id)
+        if since is not None:
+            query = query.filter(db.or_(QuestionRanking.last_activity_at >= since,
+                                        QuestionRanking.question_id.is_(None)))
+        rows = query.order_by(Question.id).limit(batch_size).all()
+        if not rows:
+            break
+
+        scores = [{'qid': row.id, 'score': hot_score(row.total_votes, row.total_answers,
+                                                      row.created_at, now)}
+                  for row in rows if row.ranked is not None]
+        if scores:
+            db.session.execute(set_score, scores)
+        missing = [{'question_id': row.id, 'last_activity_at': row.created_at,
+                    'refreshed_at': now,
+                    'hot_score': hot_score(row.total_votes, row.total_answers,
+                                           row.created_at, now)}
+                   for row in rows if row.ranked is None]
+        if missing:
+            db.session.execute(table.insert(), missing)
+        db.session.commit()
+
+        processed += len(rows)
+        last_id = rows[-1].id
+    return processed
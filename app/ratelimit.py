@@ -0,0 +1,261 @@
+import threading
+import time
+from collections import OrderedDict
+from flask import request
+from flask_login import current_user
+from .cache import _shared_client
+
+# Políticas por defecto, por endpoint. Cada ámbito
+# tiene un balde de tokens con capacidad N que se rellena a N por periodo:
+#   ip      -> dirección del cliente
+#   user    -> usuario autenticado
+#   account -> cuenta que se intenta usar en el login (campo `email`)
+DEFAULT_POLICIES = {
+    'main.login': {'ip': '20/minute', 'account': '5/minute'},
+    'main.signup': {'ip': '5/minute'},
+    'main.ask_question': {'ip': '20/minute', 'user': '5/minute'},
+    'main.answer': {'ip': '30/minute', 'user': '10/minute'},
+    'api.token': {'ip': '20/minute', 'account': '5/minute'},
+}
+
+PERIODS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+
+# Solo se limitan las peticiones que hacen trabajo caro (bcrypt o escrituras)
+LIMITED_METHODS = ('POST',)
+
+
+class RateLimitExceeded(Exception):
+    """
+    Se lanza cuando un cliente agota su balde de tokens. La aplicación la
+    convierte en un 429 con la cabecera Retry-After.
+    """
+
+    def __init__(self, retry_after):
+        super().__init__(retry_after)
+        self.retry_after = retry_after
+
+
+def parse_rate(rate):
+    """
+    Convierte '10/minute' en (tokens por segundo, capacidad del balde).
+    """
+    amount, _, period = rate.partition('/')
+    try:
+        amount = int(amount)
+        seconds = PERIODS[period.strip().rstrip('s')]
+    except (ValueError, KeyError):
+        raise ValueError(f"Límite inválido: {rate!r}") from None
+    return amount / seconds, amount
+
+
+def _take(tokens, updated_at, now, rate, burst):
+    """
+    Rellena el balde según el tiempo transcurrido e intenta consumir un
+    token. Devuelve (tokens, permitido, segundos hasta el próximo token).
+    """
+    if tokens is None:
+        tokens = burst
+    else:
+        tokens = min(burst, tokens + max(0.0, now - updated_at) * rate)
+    if tokens >= 1:
+        return tokens - 1, True, 0.0
+    return tokens, False, (1 - tokens) / rate
+
+
+class MemoryBackend:
+    """
+    Baldes en memoria del proceso, acotados con LRU. Cada worker lleva su
+    propia cuenta, así que el límite efectivo se multiplica por el número de
+    procesos.
+    """
+
+    def __init__(self, maxsize=100000):
+        self.maxsize = maxsize
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key, rate, burst):
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (None, now))
+            tokens, allowed, retry_after = _take(tokens, updated_at, now, rate, burst)
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+        return allowed, retry_after
+
+    def refund(self, key, rate, burst):
+        with self._lock:
+            if key in self._buckets:
+                tokens, updated_at = self._buckets[key]
+                self._buckets[key] = (min(burst, tokens + 1), updated_at)
+
+
+# Misma lógica que `_take`, atómica en Redis
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1])
+if tokens == nil then
+    tokens = burst
+else
+    tokens = math.min(burst, tokens + math.max(0, now - tonumber(state[2])) * rate)
+end
+local allowed = 0
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    retry_after = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return {allowed, tostring(retry_after)}
+"""
+
+# Devuelve el token de una petición que no llegó a atenderse
+REFUND_SCRIPT = """
+local tokens = tonumber(redis.call('HGET', KEYS[1], 'tokens'))
+if tokens ~= nil then
+    redis.call('HSET', KEYS[1], 'tokens', tostring(math.min(tonumber(ARGV[1]), tokens + 1)))
+end
+return 0
+"""
+
+
+class SharedBackend:
+    """
+    Baldes compartidos entre procesos. Con Redis, cada consulta es un solo
+    EVAL del script TOKEN_BUCKET_SCRIPT; con el sustituto local (`LocalStore`)
+    se usa su operación atómica `update`.
+    """
+
+    def __init__(self, client, prefix='so:rl:'):
+        self.client = client
+        self.prefix = prefix
+        scripts = hasattr(client, 'register_script')
+        self._script = client.register_script(TOKEN_BUCKET_SCRIPT) if scripts else None
+        self._refund_script = client.register_script(REFUND_SCRIPT) if scripts else None
+
+    def take(self, key, rate, burst):
+        key = self.prefix + key
+        now = time.time()
+        if self._script is not None:
+            allowed, retry_after = self._script(keys=[key], args=[rate, burst, now])
+            return bool(allowed), float(retry_after)
+
+        result = {}
+
+        def refill(raw):
+            tokens, updated_at = (None, now) if raw is None else map(float, raw.split(b':'))
+            tokens, result['allowed'], result['retry_after'] = _take(
+                tokens, updated_at, now, rate, burst)
+            return f"{tokens}:{now}".encode('ascii')
+
+        self.client.update(key, refill, ex=int(burst / rate) + 1)
+        return result['allowed'], result['retry_after']
+
+    def refund(self, key, rate, burst):
+        key = self.prefix + key
+        if self._refund_script is not None:
+            self._refund_script(keys=[key], args=[burst])
+            return
+
+        def give_back(raw):
+            if raw is None:
+                return None
+            tokens, updated_at = map(float, raw.split(b':'))
+            return f"{min(burst, tokens + 1)}:{updated_at}".encode('ascii')
+
+        self.client.update(key, give_back, ex=int(burst / rate) + 1)
+
+
+class RateLimiter:
+    """
+    Limita por balde de tokens las peticiones POST de los endpoints con
+    política (ver DEFAULT_POLICIES), por IP, por usuario y, en el login, por
+    cuenta. La comprobación es un acceso al backend, sin consultas a la base
+    de datos; al agotarse el balde se responde 429 con Retry-After.
+
+    Configuración:
+        RATELIMIT_ENABLED: activa el límite (por defecto True)
+        RATELIMIT_BACKEND: 'memory' (por defecto) o 'shared'
+        RATELIMIT_URL: URL de Redis para el backend compartido (sin URL se
+            usa un almacén local, útil en pruebas)
+        RATELIMIT_SIZE: baldes máximos del backend en memoria
+        RATELIMIT_POLICIES: políticas por endpoint que reemplazan a las
+            de DEFAULT_POLICIES, p. ej. {'main.login': {'ip': '10/minute'}}
+
+    Detrás de un proxy, la IP del cliente sale de X-Forwarded-For solo si
+    PROXY_FIX_X_FOR indica cuántos proxies de confianza hay (ver create_app);
+    si no, todos los clientes comparten la dirección del proxy.
+    """
+
+    def __init__(self, app=None):
+        self.enabled = True
+        self.backend = None
+        self.policies = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('RATELIMIT_ENABLED', True)
+        kind = app.config.get('RATELIMIT_BACKEND', 'memory')
+        if kind == 'memory':
+            self.backend = MemoryBackend(app.config.get('RATELIMIT_SIZE', 100000))
+        elif kind == 'shared':
+            self.backend = SharedBackend(_shared_client(app.config.get('RATELIMIT_URL')))
+        else:
+            raise ValueError(f"RATELIMIT_BACKEND desconocido: {kind}")
+
+        policies = dict(DEFAULT_POLICIES)
+        policies.update(app.config.get('RATELIMIT_POLICIES') or {})
+        # Los límites se interpretan una sola vez, no en cada petición
+        self.policies = {
+            endpoint: {scope: parse_rate(rate) for scope, rate in rules.items()}
+            for endpoint, rules in policies.items()
+        }
+        app.before_request(self._check)
+        app.register_error_handler(RateLimitExceeded, self._limited_response)
+
+    def _check(self):
+        if not self.enabled or request.method not in LIMITED_METHODS:
+            return
+        rules = self.policies.get(request.endpoint)
+        if not rules:
+            return
+        taken = []
+        for scope, (rate, burst) in rules.items():
+            identity = self._identity(scope)
+            if identity is None:
+                continue
+            key = f"{request.endpoint}:{scope}:{identity}"
+            allowed, retry_after = self.backend.take(key, rate, burst)
+            if not allowed:
+                # Una petición rechazada no cuenta en los ámbitos anteriores
+                for taken_key, taken_rate, taken_burst in taken:
+                    self.backend.refund(taken_key, taken_rate, taken_burst)
+                raise RateLimitExceeded(retry_after)
+            taken.append((key, rate, burst))
+
+    @staticmethod
+    def _identity(scope):
+        if scope == 'ip':
+            return request.remote_addr or 'unknown'
+        if scope == 'user':
+            return current_user.get_id() if current_user.is_authenticated else None
+        if scope == 'account':
+            # Formulario de login o cuerpo JSON de /api/v1/token
+            account = request.form.get('email') or (request.get_json(silent=True) or {}).get('email')
+            account = str(account or '').strip().lower()
+            return account or None
+        raise ValueError(f"Ámbito de límite desconocido: {scope}")
+
+    @staticmethod
+    def _limited_response(error):
+        return ("Demasiadas solicitudes. Intenta de nuevo en unos segundos.",
+                429, {'Retry-After': str(max(1, int(error.retry_after + 0.999)))})
@@ -0,0 +1,184 @@
+from sqlalchemy import and_, func, or_, select
+from . import db
+from .models import Question, Answer, User, Tag, question_tags
+from .pagination import decode_cursor, encode_cursor
+from .timeago import iso_utc
+
+# Las sentencias de este módulo son de SQLAlchemy Core y no dependen de la
+# sesión, así que las ejecutan igual las rutas JSON de Flask (read_feed,
+# read_question) y el servidor ASGI con su motor asíncrono (app/asgi.py).
+
+FEED_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 50
+
+# Caracteres del contenido que se envían en cada elemento del feed
+EXCERPT_LENGTH = 100
+
+questions = Question.__table__
+answers = Answer.__table__
+users = User.__table__
+
+
+def page_size(limit):
+    """
+    Acota el `limit` pedido por el cliente.
+    """
+    return max(1, min(limit or FEED_PAGE_SIZE, MAX_PAGE_SIZE))
+
+
+def feed_statement(cursor=None, limit=FEED_PAGE_SIZE):
+    """
+    Página del feed por (created_at, id) descendente, con el autor en el
+    mismo SELECT. Pide una fila de más para saber si hay página siguiente.
+    """
+    statement = select(
+        questions.c.id, questions.c.title,
+        func.substr(questions.c.content, 1, EXCERPT_LENGTH).label('excerpt'),
+        questions.c.total_votes, questions.c.total_answers, questions.c.created_at,
+        users.c.username.label('author'),
+    ).select_from(questions.join(users, users.c.id == questions.c.user_id))
+    position = decode_cursor(cursor)
+    if position is not None:
+        created_at, question_id = position
+        statement = statement.where(or_(
+            questions.c.created_at < created_at,
+            and_(questions.c.created_at == created_at, questions.c.id < question_id)))
+    return statement.order_by(questions.c.created_at.desc(), questions.c.id.desc()) \
+        .limit(limit + 1)
+
+
+def tags_statement(question_ids):
+    """
+    Etiquetas de varias preguntas en una sola consulta.
+    """
+    return select(question_tags.c.question_id, Tag.__table__.c.name) \
+        .join(Tag.__table__, Tag.__table__.c.id == question_tags.c.tag_id) \
+        .where(question_tags.c.question_id.in_(question_ids)) \
+        .order_by(Tag.__table__.c.name)
+
+
+def question_statement(question_id):
+    """
+    Una pregunta con su autor.
+    """
+    return select(
+        questions.c.id, questions.c.title, questions.c.content,
+        questions.c.total_votes, questions.c.total_answers, questions.c.created_at,
+        users.c.username.label('author'),
+    ).select_from(questions.join(users, users.c.id == questions.c.user_id)) \
+        .where(questions.c.id == question_id)
+
+
+def answers_statement(question_id, cursor=None, limit=FEED_PAGE_SIZE):
+    """
+    Página de respuestas de una pregunta con su autor, de la más antigua a
+    la más nueva, por (created_at, id) sobre
+    ix_answers_question_id_created_at_id. Pide una fila de más para saber
+    si hay página siguiente.
+    """
+    statement = select(
+        answers.c.id, answers.c.content, answers.c.total_votes, answers.c.created_at,
+        users.c.username.label('author'),
+    ).select_from(answers.join(users, users.c.id == answers.c.author_id)) \
+        .where(answers.c.question_id == question_id)
+    position = decode_cursor(cursor)
+    if position is not None:
+        created_at, answer_id = position
+        statement = statement.where(or_(
+            answers.c.created_at > created_at,
+            and_(answers.c.created_at == created_at, answers.c.id > answer_id)))
+    return statement.order_by(answers.c.created_at, answers.c.id).limit(limit + 1)
+
+
+def _tags_by_question(tag_rows):
+    result = {}
+    for question_id, name in tag_rows:
+        result.setdefault(question_id, []).append(name)
+    return result
+
+
+def _serialize(row, **extra):
+    item = dict(row._mapping)
+    item['created_at'] = iso_utc(row.created_at)
+    item.update(extra)
+    return item
+
+
+def _page(rows, limit):
+    """
+    Separa la fila de más de una página y devuelve (filas, cursor de la
+    página siguiente o None).
+    """
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, encode_cursor(rows[-1].created_at, rows[-1].id)
+    return rows, None
+
+
+def feed_payload(rows, tag_rows, limit):
+    """
+    Arma la respuesta JSON del feed a partir de las filas de
+    `feed_statement` (con la fila de más) y de `tags_statement`.
+    """
+    tags = _tags_by_question(tag_rows)
+    rows, next_cursor = _page(rows, limit)
+    return {
+        'items': [_serialize(row, tags=tags.get(row.id, [])) for row in rows],
+        'next_cursor': next_cursor,
+    }
+
+
+def question_payload(row, tag_rows, answer_rows, limit):
+    """
+    Arma la respuesta JSON del detalle de una pregunta con una página de
+    respuestas (filas de `answers_statement`, con la fila de más) y el
+    cursor de la siguiente en `answers_next_cursor`.
+    """
+    answer_rows, next_cursor = _page(answer_rows, limit)
+    return _serialize(row, tags=[name for _, name in tag_rows],
+                      answers=[_serialize(answer) for answer in answer_rows],
+                      answers_next_cursor=next_cursor)
+
+
+def profile_statement(user_id):
+    """
+    Datos públicos del perfil de un usuario, con sus contadores.
+    """
+    return select(
+        users.c.id, users.c.username, users.c.question_count,
+        users.c.answer_count, users.c.reputation,
+    ).where(users.c.id == user_id)
+
+
+def read_feed(cursor=None, limit=FEED_PAGE_SIZE, with_tags=True):
+    """
+    Página del feed en formato JSON, en dos consultas (una sin etiquetas).
+    """
+    rows = db.session.execute(feed_statement(cursor, limit)).all()
+    ids = [row.id for row in rows[:limit]]
+    tag_rows = db.session.execute(tags_statement(ids)).all() if ids and with_tags else []
+    return feed_payload(rows, tag_rows, limit)
+
+
+def read_question(question_id, cursor=None, limit=FEED_PAGE_SIZE, with_tags=True,
+                  with_answers=True):
+    """
+    Detalle de una pregunta con una página de sus respuestas (desde
+    `cursor`) en formato JSON, o None si no existe. Las etiquetas y las
+    respuestas se pueden omitir para ahorrarse su consulta.
+    """
+    row = db.session.execute(question_statement(question_id)).first()
+    if row is None:
+        return None
+    tag_rows = db.session.execute(tags_statement([question_id])).all() if with_tags else []
+    answer_rows = db.session.execute(
+        answers_statement(question_id, cursor, limit)).all() if with_answers else []
+    return question_payload(row, tag_rows, answer_rows, limit)
+
+
+def read_profile(user_id):
+    """
+    Perfil público de un usuario en formato JSON, o None si no existe.
+    """
+    row = db.session.execute(profile_statement(user_id)).first()
+    return dict(row._mapping) if row is not None else None
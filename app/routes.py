@@ -1,67 +1,103 @@
 import logging
-from datetime import datetime
-from flask import Blueprint, render_template, redirect, url_for, request, session
+import time
+from flask import Blueprint, current_app, render_template, redirect, url_for, request, session, jsonify, abort
 from flask_login import login_user, login_required, logout_user, current_user
-from .models import db, User, Question, Answer
-from .forms import LoginForm, SignupForm, AnswerForm
-from . import bcrypt
+from .models import db, User, Question, Tag
+from .forms import LoginForm, SignupForm, AnswerForm, VoteForm
+from .pagination import paginate_keyset
+from .queries import ANSWER_SORTS, feed_query, question_header, answers_page
+from .rankings import FEEDS, ranked_feed
+from .activity import ACTIVITY_KINDS, user_activity, user_stats, serialize_activity
+from .votes import VOTE_VALUES
+from .posts import (SelfVoteError, create_question, create_answer, cast_question_vote,
+                    cast_answer_vote)
+from .writer import GroupCommitTimeout
+from .similarity import DUPLICATE_SCORE, suggestions
+from .identity import sync_session
+from .timeago import time_ago, iso_utc
+from .readapi import page_size, read_feed, read_question
+from .tags import parse_tags, autocomplete, tagged_query
+from . import fragment_cache, search_index, password_hasher, http_cache, group_commit
 
 # Definir el blueprint para las rutas principales
 main = Blueprint('main', __name__)
 
+logger = logging.getLogger(__name__)
 
-def format_time_diff(time_diff):
-    """
-    Calcula la diferencia de tiempo entre la fecha actual y una dada,
-    devolviendo un texto amigable para el usuario.
-    """
-    days, seconds = time_diff.days, time_diff.seconds
-    hours, remainder = divmod(seconds, 3600)
-    minutes, _ = divmod(remainder, 60)
-
-    if days > 365:
-        return f"hace {days // 365} años"
-    if days > 30:
-        return f"hace {days // 30} meses"
-    if days > 0:
-        return f"hace {days} días"
-    if hours > 0:
-        return f"hace {hours} horas"
-    if minutes > 0:
-        return f"hace {minutes} minutos"
-    return "hace unos segundos"
+# Fechas relativas en las plantillas: {{ fecha|time_ago }} y {{ fecha|iso_utc }}
+main.add_app_template_filter(time_ago)
+main.add_app_template_filter(iso_utc)
 
 
 @main.before_request
 def before_request():
     """
     Guarda en la sesión los datos del usuario autenticado antes de cada petición.
-    Esto asegura que la sesión contenga la información actualizada del usuario.
+    La sesión solo se reescribe cuando los datos cambiaron, para no reenviar
+    la cookie en cada respuesta.
     """
     if current_user.is_authenticated:
-        session['username'] = current_user.username
-        session['email'] = current_user.email
-        session['id'] = current_user.id
+        sync_session(session, current_user)
 
 
 @main.route('/')
 @login_required  # Requiere que el usuario esté autenticado
 def home():
     """
-    Muestra la página principal con una lista paginada de preguntas.
+    Muestra la página principal con una lista paginada de preguntas, en el
+    orden elegido con `sort` (ver app/rankings.py). La paginación es por
+    cursor sobre un índice, de modo que cualquier página cuesta lo mismo que
+    la primera.
     """
-    page = request.args.get('page', 1, type=int)
+    cursor = request.args.get('cursor')
+    sort = request.args.get('sort', 'recent')
+    if sort not in FEEDS:
+        abort(404)
     per_page = 10
-    questions = Question.query.paginate(page, per_page, error_out=False)
-    now = datetime.utcnow()
+    questions = ranked_feed(feed_query(), sort, cursor=cursor, per_page=per_page)
+
+    # Si ninguna pregunta de la página cambió, el navegador reutiliza su copia
+    etag = http_cache.etag('home', sort, cursor or '', questions.total,
+                           *[(question.id, question.revision) for question in questions.items])
+    not_modified = http_cache.not_modified(etag)
+    if not_modified:
+        return not_modified
+
+    # Cada tarjeta se sirve desde la caché de fragmentos mientras la pregunta no cambie
+    cards = [
+        fragment_cache.get_or_render(
+            question.id, question.revision, 'card',
+            lambda question=question: render_template('_question_card.html', question=question))
+        for question in questions.items
+    ]
+
+    return http_cache.finish(
+        render_template('index.html', questions=questions.items, cards=cards,
+                        pagination=questions, sort=sort),
+        etag)
+
+
+@main.route('/search')
+@login_required  # Requiere que el usuario esté autenticado
+def search():
+    """
+    Busca preguntas por título, contenido o por el texto de sus respuestas,
+    ordenadas por relevancia.
+    """
+    query = request.args.get('q', '').strip()
+    ids = search_index.search(query, limit=20)
+    found = {question.id: question
+             for question in feed_query().filter(Question.id.in_(ids))} if ids else {}
+    questions = [found[question_id] for question_id in ids if question_id in found]
 
-    # Añadir formato de tiempo y etiquetas a cada pregunta
-    for question in questions.items:
-        question.time_ago = format_time_diff(
-            now - question.created_at) if question.created_at else "Fecha no disponible"
-        question.tags = question.tags or []
+    cards = [
+        fragment_cache.get_or_render(
+            question.id, question.revision, 'card',
+            lambda question=question: render_template('_question_card.html', question=question))
+        for question in questions
+    ]
 
-    return render_template('index.html', questions=questions.items, pagination=questions)
+    return render_template('search.html', query=query, questions=questions, cards=cards)
 
 
 @main.route('/ask_question', methods=['GET', 'POST'])
@@ -73,26 +109,103 @@ def ask_question():
     if request.method == 'POST':
         title = request.form.get('titulo')
         content = request.form.get('detalle')
-        tags = request.form.get('etiquetas').split(',')
+        tags = parse_tags(request.form.get('etiquetas'))
 
         # Verifica si el título y el contenido cumplen con los requisitos
-        if title and len(content) > 20:
-            new_question = Question(
-                title=title, content=content, creator=current_user, tags=tags)
-            db.session.add(new_question)
-            db.session.commit()
+        if title and content and len(content) > 20:
+            # Si ya hay preguntas casi idénticas se muestran antes de publicar;
+            # al volver a enviar el formulario se publica de todas formas
+            if not request.form.get('publicar_igual'):
+                # Al publicar se compara la pregunta completa: dos preguntas
+                # con el mismo título y distinto contenido no son duplicadas
+                duplicates = suggestions(title, content, min_score=DUPLICATE_SCORE,
+                                         by_title=False)
+                if duplicates:
+                    return render_template('ask_question.html', duplicates=duplicates,
+                                           title=title, content=content,
+                                           tags=request.form.get('etiquetas'))
+            group_commit.run(create_question, current_user.id, title, content, tags)
             return redirect(url_for('main.home'))
 
     return render_template('ask_question.html')
 
 
+@main.route('/questions/similar', methods=['GET'])
+@login_required
+def similar_questions():
+    """
+    Devuelve en formato JSON las preguntas parecidas al título (y contenido)
+    que se está escribiendo en el formulario de preguntas. Basta con el
+    título: se compara también con los títulos guardados.
+    """
+    title = request.args.get('title', '')
+    if len(title.strip()) < 10:
+        return jsonify([])
+    return jsonify(suggestions(title, request.args.get('content', '')))
+
+
 @main.route('/profile')
 @login_required  # Requiere que el usuario esté autenticado
 def profile():
     """
-    Muestra el perfil del usuario con todas las preguntas realizadas por él.
+    Muestra el perfil del usuario: sus estadísticas y su actividad
+    (preguntas, respuestas o votos), paginada por cursor.
+    """
+    tab = request.args.get('tab', 'questions')
+    if tab not in ACTIVITY_KINDS:
+        abort(404)
+    activity = user_activity(current_user.id, tab, cursor=request.args.get('cursor'))
+    return render_template('profile.html', stats=user_stats(current_user.id),
+                           activity=activity, tab=tab)
+
+
+@main.route('/users/<int:user_id>/activity')
+@login_required
+def activity(user_id):
+    """
+    Devuelve en formato JSON las estadísticas y una página de actividad de
+    un usuario. Los votos de un usuario solo los puede ver él mismo.
+    """
+    kind = request.args.get('kind', 'questions')
+    if kind not in ACTIVITY_KINDS or (kind == 'votes' and user_id != current_user.id):
+        abort(404)
+    stats = user_stats(user_id)
+    if stats is None:
+        abort(404)
+    page = user_activity(user_id, kind, cursor=request.args.get('cursor'),
+                         per_page=max(1, min(request.args.get('limit', 20, type=int), 100)))
+    return jsonify({
+        'stats': dict(stats._mapping),
+        'kind': kind,
+        'items': [serialize_activity(row) for row in page.items],
+        'next_cursor': page.next_cursor,
+    })
+
+
+@main.route('/api/feed')
+@login_required
+def api_feed():
+    """
+    Devuelve en formato JSON una página del feed. En modo ASGI esta ruta la
+    atiende directamente app/asgi.py con el motor asíncrono.
     """
-    return render_template('profile.html', questions=Question.query.filter_by(user_id=current_user.id).all())
+    return jsonify(read_feed(request.args.get('cursor'),
+                             page_size(request.args.get('limit', type=int))))
+
+
+@main.route('/api/questions/<int:question_id>')
+@login_required
+def api_question(question_id):
+    """
+    Devuelve en formato JSON una pregunta con una página de sus respuestas
+    (?cursor=, ?limit=). En modo ASGI esta ruta la atiende directamente
+    app/asgi.py.
+    """
+    payload = read_question(question_id, request.args.get('cursor'),
+                            page_size(request.args.get('limit', type=int)))
+    if payload is None:
+        abort(404)
+    return jsonify(payload)
 
 
 @main.route('/settings')
@@ -114,8 +227,9 @@ def login():
         # Buscar al usuario por email o nombre de usuario
         user = User.query.filter((User.email == form.email.data) | (
             User.username == form.email.data)).first()
-        # Verificar contraseña
-        if user and bcrypt.check_password_hash(user.password, form.password.data):
+        # Verificar contraseña (y actualizar el hash si cambió el costo configurado)
+        if user and password_hasher.verify_and_upgrade(user, form.password.data):
+            db.session.commit()
             login_user(user)
             return redirect(url_for('main.home'))
         error = "Correo o contraseña incorrectos. Por favor, intenta de nuevo."
@@ -131,8 +245,7 @@ def signup():
     form = SignupForm()
     if form.validate_on_submit():
         # Crear un nuevo usuario con contraseña cifrada
-        hashed_password = bcrypt.generate_password_hash(
-            form.password.data).decode('utf-8')
+        hashed_password = password_hasher.hash(form.password.data)
         new_user = User(username=form.username.data, email=form.email.data,
                         password=hashed_password, role='standard')
         db.session.add(new_user)
@@ -155,16 +268,117 @@ def logout():
 @login_required  # Requiere que el usuario esté autenticado
 def question(question_id):
     """
-    Muestra una pregunta específica junto con sus respuestas.
-    Permite a los usuarios agregar nuevas respuestas.
+    Muestra una pregunta específica junto con una página de sus respuestas,
+    en el orden elegido con `sort` (ver ANSWER_SORTS). Las páginas
+    siguientes se piden con `cursor` o, desde el navegador, se cargan en la
+    misma página con `question_answers`.
     """
-    question = Question.query.get_or_404(question_id)
-
-    return render_template('question.html', question=question)
-
-
-# Configura el logger
-logging.basicConfig(level=logging.DEBUG)
+    sort, cursor = _answer_sort(), request.args.get('cursor')
+    # La revisión cambia con cada respuesta o voto: si el cliente ya tiene
+    # esta versión se responde 304 sin cargar nada más
+    revision = _question_revision(question_id)
+    etag = http_cache.etag('question', question_id, sort, cursor or '', revision, _csrf_epoch())
+    not_modified = http_cache.not_modified(etag)
+    if not_modified:
+        return not_modified
+
+    # Si los fragmentos están en caché no se consulta nada más
+    header = fragment_cache.get_or_render(
+        question_id, revision, 'header',
+        lambda: render_template('_question_header.html', question=question_header(question_id)))
+    answers = _answers_fragment(question_id, revision, sort, cursor)
+
+    return http_cache.finish(render_template('question.html', header=header, answers=answers,
+                                             question_id=question_id, sort=sort,
+                                             vote_form=VoteForm()), etag)
+
+
+def _csrf_epoch():
+    # La página lleva el token CSRF de los votos, que caduca a las
+    # WTF_CSRF_TIME_LIMIT segundos: el ETag cambia cada media vida del token
+    # para que un 304 nunca deje al navegador con un token vencido
+    limit = current_app.config.get('WTF_CSRF_TIME_LIMIT', 3600)
+    return int(time.time() // (limit / 2)) if limit else 0
+
+
+@main.route('/question/<int:question_id>/answers', methods=['GET'])
+@login_required  # Requiere que el usuario esté autenticado
+def question_answers(question_id):
+    """
+    Devuelve solo el HTML de una página de respuestas, para cargar más
+    respuestas sin volver a pedir la pregunta.
+    """
+    sort, cursor = _answer_sort(), request.args.get('cursor')
+    revision = _question_revision(question_id)
+    etag = http_cache.etag('answers', question_id, sort, cursor or '', revision)
+    not_modified = http_cache.not_modified(etag)
+    if not_modified:
+        return not_modified
+    return http_cache.finish(_answers_fragment(question_id, revision, sort, cursor), etag)
+
+
+def _question_revision(question_id):
+    # Lectura por clave primaria de la revisión (ver Question.revision), de
+    # la que salen el ETag y las claves de la caché. Un id inexistente
+    # responde 404 sin tocar la caché
+    revision = db.session.query(Question.revision).filter(Question.id == question_id).scalar()
+    if revision is None:
+        abort(404)
+    return revision
+
+
+def _answer_sort():
+    sort = request.args.get('sort', 'oldest')
+    if sort not in ANSWER_SORTS:
+        abort(404)
+    return sort
+
+
+def _answers_fragment(question_id, revision, sort, cursor):
+    # Cada página se guarda aparte; todas caducan juntas con la revisión de
+    # la pregunta
+    return fragment_cache.get_or_render(
+        question_id, revision, f'answers:{sort}:{cursor or ""}',
+        lambda: render_template('_answers.html', question_id=question_id, sort=sort,
+                                page=answers_page(question_id, sort, cursor)))
+
+
+@main.route('/question/<int:question_id>/vote', methods=['POST'])
+@login_required  # Requiere que el usuario esté autenticado
+def vote(question_id):
+    """
+    Registra el voto (a favor o en contra) del usuario actual sobre una pregunta.
+    """
+    form = VoteForm()
+    if not form.validate_on_submit():
+        abort(400)
+    Question.query.get_or_404(question_id)
+    try:
+        group_commit.run(cast_question_vote, current_user.id, question_id,
+                         VOTE_VALUES[form.value.data])
+    except SelfVoteError:
+        abort(403)
+    return redirect(url_for('main.question', question_id=question_id))
+
+
+@main.route('/answers/<int:answer_id>/vote', methods=['POST'])
+@login_required  # Requiere que el usuario esté autenticado
+def vote_on_answer(answer_id):
+    """
+    Registra el voto (a favor o en contra) del usuario actual sobre una respuesta.
+    """
+    form = VoteForm()
+    if not form.validate_on_submit():
+        abort(400)
+    try:
+        voted = group_commit.run(cast_answer_vote, current_user.id, answer_id,
+                                 VOTE_VALUES[form.value.data])
+    except SelfVoteError:
+        abort(403)
+    if voted is None:
+        abort(404)
+    question_id, _ = voted
+    return redirect(url_for('main.question', question_id=question_id))
 
 
 @main.route('/answer/<int:question_id>', methods=['GET', 'POST'])
@@ -173,34 +387,75 @@ def answer(question_id):
     """
     Permite a los usuarios responder a una pregunta específica.
     """
-    question = Question.query.get_or_404(question_id)
+    # Para guardar la respuesta basta con saber que la pregunta existe
+    revision = _question_revision(question_id)
     form = AnswerForm()
 
     if form.validate_on_submit():
         try:
-            new_answer = Answer(content=form.content.data,
-                                question=question, author=current_user)
-            db.session.add(new_answer)
-            db.session.commit()
-            return redirect(url_for('main.question', question_id=question.id))
+            group_commit.run(create_answer, current_user.id, question_id, form.content.data)
+            return redirect(url_for('main.question', question_id=question_id))
+        except GroupCommitTimeout:
+            # Se responde 503 con Retry-After (ver app/writer.py)
+            raise
         except Exception as e:
-            db.session.rollback()
             # Registra el error
-            logging.error(f"Ocurrió un error al guardar la respuesta: {e}")
+            logger.exception("Ocurrió un error al guardar la respuesta: %s", e)
             error_message = "Ocurrió un error al guardar tu respuesta. Por favor, inténtalo de nuevo."
-            return render_template('answer.html', question=question, form=form, error=error_message)
-
-    # Registro de depuración
-    logging.debug(f"Formulario enviado: {form.validate_on_submit()}")
-    return render_template('answer.html', question=question, form=form)
-
-
-# @main.route('/tags', methods=['GET'])
-# @login_required
-# def get_tags():
-#     """
-#     Devuelve las etiquetas existentes en la base de datos en formato JSON.
-#     """
-#     tags = Tags.query.all()  # Asegúrate de que el modelo Tag esté importado
-#     tag_names = [tag.name for tag in tags]
-#     return jsonify(tag_names)
+            return render_template('answer.html', summary=_answer_summary(question_id, revision),
+                                   form=form, error=error_message)
+
+    return render_template('answer.html', summary=_answer_summary(question_id, revision), form=form)
+
+
+def _answer_summary(question_id, revision):
+    # El resumen de la pregunta sobre el formulario sale de la caché de
+    # fragmentos, como la cabecera de la página de la pregunta
+    return fragment_cache.get_or_render(
+        question_id, revision, 'summary',
+        lambda: render_template('_answer_question.html', question=question_header(question_id)))
+
+
+@main.route('/tags', methods=['GET'])
+@login_required
+def get_tags():
+    """
+    Devuelve en formato JSON las etiquetas que empiezan con el texto `q`,
+    para el autocompletado del formulario de preguntas.
+    """
+    # Las etiquetas cambian poco: un minuto de caché en el navegador basta
+    return http_cache.finish(jsonify(autocomplete(request.args.get('q', ''))), None,
+                             'private, max-age=60')
+
+
+@main.route('/tagged/<name>')
+@login_required
+def tagged(name):
+    """
+    Muestra las preguntas con una etiqueta, paginadas por cursor.
+    """
+    tag = Tag.query.filter_by(name=name).first()
+    if tag is None:
+        abort(404)
+
+    questions = paginate_keyset(tagged_query(feed_query(), tag), Question,
+                                cursor=request.args.get('cursor'), per_page=10)
+    questions.total = tag.question_count
+
+    etag = http_cache.etag('tagged', tag.id, request.args.get('cursor') or '', questions.total,
+                           *[(question.id, question.revision) for question in questions.items])
+    not_modified = http_cache.not_modified(etag)
+    if not_modified:
+        return not_modified
+
+    cards = [
+        fragment_cache.get_or_render(
+            question.id, question.revision, 'card',
+            lambda question=question: render_template('_question_card.html', question=question))
+        for question in questions.items
+    ]
+
+    return http_cache.finish(
+        render_template('index.html', questions=questions.items, cards=cards,
+                        pagination=questions, heading=f'Preguntas con la etiqueta "{tag.name}"'),
+        etag)
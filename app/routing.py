@@ -0,0 +1,161 @@
+import logging
+import random
+import time
+from flask import current_app, g, has_app_context, request, session
+from flask_sqlalchemy import SQLAlchemy, SignallingSession
+from sqlalchemy import event, orm
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.sql.dml import UpdateBase
+
+logger = logging.getLogger(__name__)
+
+# Clave de la sesión de Flask con el instante hasta el que las lecturas de
+# un cliente van a la base principal después de que escribió algo
+STICKY_KEY = '_db_primary_until'
+
+# Opciones de create_engine que se toman de la configuración
+POOL_OPTIONS = {
+    'pool_size': 'DATABASE_POOL_SIZE',
+    'max_overflow': 'DATABASE_MAX_OVERFLOW',
+    'pool_timeout': 'DATABASE_POOL_TIMEOUT',
+    'pool_recycle': 'DATABASE_POOL_RECYCLE',
+    'pool_pre_ping': 'DATABASE_POOL_PRE_PING',
+}
+
+
+class RoutingSession(SignallingSession):
+    """
+    Sesión que envía las lecturas de las rutas de solo lectura a una réplica
+    (elegida por ReplicaRouter en `g._db_replica`) y todo lo demás a la base
+    principal. Cualquier escritura (flush o INSERT/UPDATE/DELETE) va siempre
+    a la principal y marca la sesión para activar la lectura de lo escrito.
+    """
+
+    def __init__(self, db, **options):
+        self.db = db
+        super().__init__(db, **options)
+
+    def get_bind(self, mapper=None, clause=None):
+        if self._flushing or isinstance(clause, UpdateBase):
+            self.info['_db_wrote'] = True
+            return super().get_bind(mapper, clause)
+        replica = g.get('_db_replica') if has_app_context() else None
+        if replica is not None:
+            return self.db.get_engine(self.app, bind=replica)
+        return super().get_bind(mapper, clause)
+
+
+class RoutingSQLAlchemy(SQLAlchemy):
+    """
+    SQLAlchemy de Flask-SQLAlchemy que crea sesiones `RoutingSession` y
+    configura el pool de conexiones de la principal y de las réplicas con
+    las opciones DATABASE_POOL_* (salvo en SQLite, que usa su propio pool).
+    SQLALCHEMY_ENGINE_OPTIONS tiene prioridad sobre ellas.
+    """
+
+    def create_session(self, options):
+        return orm.sessionmaker(class_=RoutingSession, db=self, **options)
+
+    def apply_driver_hacks(self, app, sa_url, options):
+        if not sa_url.drivername.startswith('sqlite'):
+            for option, key in POOL_OPTIONS.items():
+                if app.config.get(key) is not None:
+                    options.setdefault(option, app.config[key])
+        return super().apply_driver_hacks(app, sa_url, options)
+
+
+def _after_commit(db_session):
+    if db_session.info.pop('_db_wrote', False) and has_app_context():
+        g._db_wrote = True
+
+
+def _after_rollback(db_session):
+    db_session.info.pop('_db_wrote', None)
+
+
+class ReplicaRouter:
+    """
+    Reparte las lecturas entre réplicas. Las peticiones GET a los endpoints
+    de DATABASE_READ_ENDPOINTS usan una réplica elegida al azar (la misma
+    durante toda la petición); el resto usa la base principal. Después de
+    confirmar una escritura, el cliente lee de la principal durante
+    DATABASE_REPLICA_STICKY_SECONDS para ver lo que acaba de escribir
+    aunque las réplicas vayan atrasadas.
+
+    Antes de usar una réplica se toma una conexión de su pool; si falla, la
+    réplica se descarta durante DATABASE_REPLICA_RETRY_SECONDS y se prueba
+    otra. Sin réplicas disponibles la petición lee de la principal.
+
+    Configuración:
+        DATABASE_REPLICA_URLS: URLs de las réplicas (vacío = sin réplicas)
+        DATABASE_READ_ENDPOINTS: endpoints que pueden leer de una réplica
+        DATABASE_REPLICA_STICKY_SECONDS: segundos de lectura desde la
+            principal tras una escritura
+        DATABASE_REPLICA_RETRY_SECONDS: segundos sin usar una réplica que
+            no respondió
+    """
+
+    _events_registered = False
+
+    def __init__(self, app=None, db=None):
+        self.db = db
+        self.replicas = []
+        self.read_endpoints = frozenset()
+        self.sticky_seconds = 5
+        self.retry_seconds = 30
+        self._down_until = {}
+        if app is not None:
+            self.init_app(app, db)
+
+    def init_app(self, app, db):
+        self.db = db
+        urls = app.config.get('DATABASE_REPLICA_URLS') or []
+        self.read_endpoints = frozenset(app.config.get('DATABASE_READ_ENDPOINTS') or ())
+        self.sticky_seconds = app.config.get('DATABASE_REPLICA_STICKY_SECONDS', 5)
+        self.retry_seconds = app.config.get('DATABASE_REPLICA_RETRY_SECONDS', 30)
+        self._down_until = {}
+        # Cada réplica es un bind de Flask-SQLAlchemy sin tablas propias,
+        # así que create_all y las migraciones solo tocan la principal
+        binds = dict(app.config.get('SQLALCHEMY_BINDS') or {})
+        self.replicas = []
+        for index, url in enumerate(urls):
+            key = f'replica_{index}'
+            binds[key] = url
+            self.replicas.append(key)
+        app.config['SQLALCHEMY_BINDS'] = binds or None
+
+        if not ReplicaRouter._events_registered:
+            event.listen(RoutingSession, 'after_commit', _after_commit)
+            event.listen(RoutingSession, 'after_rollback', _after_rollback)
+            ReplicaRouter._events_registered = True
+
+        if self.replicas:
+            app.before_request(self._choose)
+            app.after_request(self._remember_write)
+
+    def _choose(self):
+        if (request.method in ('GET', 'HEAD')
+                and request.endpoint in self.read_endpoints
+                and session.get(STICKY_KEY, 0) < time.time()):
+            g._db_replica = self._available_replica()
+
+    def _available_replica(self):
+        now = time.monotonic()
+        candidates = [key for key in self.replicas if self._down_until.get(key, 0) <= now]
+        random.shuffle(candidates)
+        for key in candidates:
+            try:
+                with self.db.get_engine(current_app, bind=key).connect():
+                    pass
+            except DBAPIError as e:
+                logger.warning("La réplica %s no responde; se lee de otra o de la principal: %s",
+                               key, e)
+                self._down_until[key] = now + self.retry_seconds
+                continue
+            return key
+        return None
+
+    def _remember_write(self, response):
+        if g.pop('_db_wrote', False):
+            session[STICKY_KEY] = time.time() + self.sticky_seconds
+        return response
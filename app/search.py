@@ -0,0 +1,242 @@
+import math
+import re
+import threading
+import unicodedata
+from collections import defaultdict
+from sqlalchemy import text
+
+# Palabras demasiado frecuentes como para aportar al ranking
+STOPWORDS = {
+    'a', 'al', 'como', 'con', 'de', 'del', 'el', 'en', 'es', 'la', 'las',
+    'lo', 'los', 'me', 'mi', 'no', 'o', 'para', 'por', 'que', 'se', 'si',
+    'su', 'un', 'una', 'y', 'ya',
+}
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+# Peso de una coincidencia en una respuesta respecto a la pregunta
+ANSWER_WEIGHT = 0.5
+
+# Ids por debajo de la marca de agua que se revisan en cada sincronización:
+# un id bajo puede confirmarse después que otro más alto ya indexado
+CATCH_UP_OVERLAP = 1000
+
+
+def tokenize(value):
+    """
+    Normaliza el texto (minúsculas, sin tildes) y lo separa en términos.
+    """
+    value = unicodedata.normalize('NFKD', value.lower())
+    value = ''.join(c for c in value if not unicodedata.combining(c))
+    return [token for token in TOKEN_RE.findall(value)
+            if len(token) > 1 and token not in STOPWORDS]
+
+
+class InvertedIndex:
+    """
+    Índice invertido en memoria con ranking BM25. Cada documento es una
+    pregunta (título + contenido) o una respuesta, y apunta al id de la
+    pregunta a la que pertenece.
+    """
+
+    def __init__(self, k1=1.2, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings = defaultdict(dict)
+        self.doc_lengths = {}
+        self.doc_targets = {}
+        self.total_length = 0
+
+    def __contains__(self, doc_key):
+        return doc_key in self.doc_lengths
+
+    def add(self, doc_key, question_id, tokens, weight=1.0):
+        if doc_key in self.doc_lengths:
+            return
+        frequencies = defaultdict(int)
+        for token in tokens:
+            frequencies[token] += 1
+        for token, count in frequencies.items():
+            self.postings[token][doc_key] = count
+        self.doc_lengths[doc_key] = len(tokens)
+        self.doc_targets[doc_key] = (question_id, weight)
+        self.total_length += len(tokens)
+
+    def search(self, tokens, limit=20):
+        """
+        Devuelve [(question_id, score)] ordenado de mayor a menor relevancia.
+        """
+        total_docs = len(self.doc_lengths)
+        if not total_docs:
+            return []
+        average_length = self.total_length / total_docs
+
+        scores = defaultdict(float)
+        for token in set(tokens):
+            postings = self.postings.get(token)
+            if not postings:
+                continue
+            idf = math.log(1 + (total_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_key, frequency in postings.items():
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_key] / average_length)
+                scores[doc_key] += idf * frequency * (self.k1 + 1) / (frequency + norm)
+
+        # Una pregunta puntúa por su mejor documento (ella misma o una respuesta)
+        ranked = {}
+        for doc_key, score in scores.items():
+            question_id, weight = self.doc_targets[doc_key]
+            ranked[question_id] = max(ranked.get(question_id, 0.0), score * weight)
+        return sorted(ranked.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+
+class SearchIndex:
+    """
+    Búsqueda de texto completo sobre preguntas y respuestas.
+
+    En PostgreSQL usa índices GIN sobre `to_tsvector` (ver la migración
+    correspondiente), que se actualizan solos en cada INSERT. En otros motores
+    (SQLite en pruebas) mantiene un `InvertedIndex` en memoria que se llena
+    de forma incremental: las rutas de escritura agregan cada documento nuevo
+    y, antes de buscar, se leen las filas que falten a partir de la marca de
+    agua (ver `_catch_up`).
+
+    Configuración:
+        SEARCH_LANGUAGE: configuración de texto de PostgreSQL (por defecto
+            'spanish'); debe coincidir con la usada al crear los índices GIN
+    """
+
+    def __init__(self, app=None, db=None):
+        self.db = db
+        self.language = 'spanish'
+        self._lock = threading.Lock()
+        self._reset()
+        if app is not None:
+            self.init_app(app, db)
+
+    def init_app(self, app, db):
+        self.db = db
+        self.language = app.config.get('SEARCH_LANGUAGE', 'spanish')
+        self._reset()
+
+    def _reset(self):
+        self.index = InvertedIndex()
+        self.last_question_id = 0
+        self.last_answer_id = 0
+
+    def _uses_postgres(self):
+        return self.db.engine.dialect.name == 'postgresql'
+
+    def index_question(self, question):
+        """
+        Agrega una pregunta recién creada al índice en memoria.
+        """
+        if self._uses_postgres():
+            return
+        with self._lock:
+            self._add_question(question.id, question.title, question.content)
+
+    def index_answer(self, answer):
+        """
+        Agrega una respuesta recién creada al índice en memoria.
+        """
+        if self._uses_postgres():
+            return
+        with self._lock:
+            self._add_answer(answer.id, answer.question_id, answer.content)
+
+    # Las rutas agregan documentos sueltos sin mover la marca de agua: solo
+    # `_catch_up`, que lee las filas en orden, sabe hasta dónde está completo
+
+    def _add_question(self, question_id, title, content):
+        if ('q', question_id) in self.index:
+            return
+        # El título cuenta doble para que pese más que el cuerpo
+        tokens = tokenize(title) * 2 + tokenize(content)
+        self.index.add(('q', question_id), question_id, tokens)
+
+    def _add_answer(self, answer_id, question_id, content):
+        if ('a', answer_id) in self.index:
+            return
+        self.index.add(('a', answer_id), question_id, tokenize(content), ANSWER_WEIGHT)
+
+    def _catch_up(self, batch_size=1000):
+        """
+        Indexa las filas que todavía no están en el índice, leyendo por clave
+        primaria en lotes desde CATCH_UP_OVERLAP ids antes de la marca de
+        agua. Primero se leen solo los ids; el texto se carga únicamente
+        para los que faltan.
+        """
+        from .models import Question, Answer
+        self.last_question_id = self._catch_up_rows(
+            Question, 'q', self.last_question_id, batch_size,
+            lambda ids: self.db.session.query(Question.id, Question.title, Question.content)
+            .filter(Question.id.in_(ids)),
+            self._add_question)
+        self.last_answer_id = self._catch_up_rows(
+            Answer, 'a', self.last_answer_id, batch_size,
+            lambda ids: self.db.session.query(Answer.id, Answer.question_id, Answer.content)
+            .filter(Answer.id.in_(ids)),
+            self._add_answer)
+
+    def _catch_up_rows(self, model, kind, watermark, batch_size, load, add):
+        last_id = max(watermark - CATCH_UP_OVERLAP, 0)
+        while True:
+            ids = [row.id for row in self.db.session.query(model.id)
+                   .filter(model.id > last_id).order_by(model.id).limit(batch_size)]
+            missing = [doc_id for doc_id in ids if (kind, doc_id) not in self.index]
+            if missing:
+                for row in load(missing):
+                    add(*row)
+            if ids:
+                last_id = ids[-1]
+                watermark = max(watermark, last_id)
+            if len(ids) < batch_size:
+                return watermark
+
+    def search(self, query, limit=20):
+        """
+        Devuelve los ids de las preguntas que coinciden con `query`,
+        ordenados por relevancia.
+        """
+        if not query or not query.strip():
+            return []
+        if self._uses_postgres():
+            return self._search_postgres(query, limit)
+        tokens = tokenize(query)
+        with self._lock:
+            self._catch_up()
+            return [question_id for question_id, _ in self.index.search(tokens, limit)]
+
+    def _search_postgres(self, query, limit):
+        # Las expresiones to_tsvector deben coincidir con las de los índices GIN
+        rows = self.db.session.execute(text("""
+            SELECT id FROM (
+                SELECT q.id, ts_rank(to_tsvector(CAST(:language AS regconfig), q.title || ' ' || q.content), query) AS rank
+                FROM questions q, plainto_tsquery(CAST(:language AS regconfig), :query) query
+                WHERE to_tsvector(CAST(:language AS regconfig), q.title || ' ' || q.content) @@ query
+                UNION ALL
+                SELECT a.question_id, ts_rank(to_tsvector(CAST(:language AS regconfig), a.content), query) * :answer_weight
+                FROM answers a, plainto_tsquery(CAST(:language AS regconfig), :query) query
+                WHERE to_tsvector(CAST(:language AS regconfig), a.content) @@ query
+            ) hits
+            GROUP BY id
+            ORDER BY max(rank) DESC
+            LIMIT :limit
+        """), {'language': self.language, 'query': query,
+               'answer_weight': ANSWER_WEIGHT, 'limit': limit})
+        return [row.id for row in rows]
+
+    def reindex(self):
+        """
+        Reconstruye el índice completo. Devuelve el número de documentos.
+        """
+        if self._uses_postgres():
+            self.db.session.execute(text("REINDEX INDEX ix_questions_search"))
+            self.db.session.execute(text("REINDEX INDEX ix_answers_search"))
+            self.db.session.commit()
+            from .models import Question, Answer
+            return Question.query.count() + Answer.query.count()
+        with self._lock:
+            self._reset()
+            self._catch_up()
+            return len(self.index.doc_lengths)
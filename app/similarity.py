@@ -0,0 +1,286 @@
+import hashlib
+import struct
+from sqlalchemy import and_, delete, insert, or_
+from sqlalchemy.orm import aliased
+from . import db
+from .models import Question, QuestionSignature, QuestionBucket
+from .search import tokenize
+
+# Firma MinHash de NUM_PERM valores, partida en BANDS bandas de ROWS valores
+# para el LSH. Dos preguntas con similitud de Jaccard s comparten al menos
+# una banda con probabilidad 1 - (1 - s^ROWS)^BANDS: ~0.73 con s = 0.4 y
+# ~1 con s = 0.7. Cambiar estos valores obliga a `flask reindex-similarity`.
+BANDS = 20
+ROWS = 3
+NUM_PERM = BANDS * ROWS
+
+# Cada pregunta guarda además la firma de su título solo, con sus bandas
+# numeradas a partir de TITLE_BAND: mientras se escribe el título todavía
+# no hay contenido con el que comparar la firma completa
+TITLE_BAND = BANDS
+
+# Similitud mínima para sugerir una pregunta al escribir, y para considerarla
+# un duplicado (al publicar y en el reporte)
+SUGGEST_SCORE = 0.4
+DUPLICATE_SCORE = 0.7
+
+# Candidatas del LSH que se comparan con la firma completa
+MAX_CANDIDATES = 50
+
+# Bandas con más preguntas que esto no generan pares en el reporte
+MAX_BUCKET_SIZE = 100
+
+# Solo el comienzo de preguntas muy largas entra en la firma
+MAX_TOKENS = 200
+
+# Valores de la firma empaquetados como enteros de 32 bits
+_VALUES = struct.Struct(f'<{NUM_PERM}I')
+
+
+def shingles(title, content):
+    """
+    Conjunto de términos y pares de términos consecutivos de la pregunta,
+    normalizados como en la búsqueda (sin tildes ni palabras vacías).
+    """
+    tokens = tokenize(title or '') + tokenize(content or '')[:MAX_TOKENS]
+    return set(tokens) | {f'{a} {b}' for a, b in zip(tokens, tokens[1:])}
+
+
+def signature(title, content):
+    """
+    Firma MinHash (tupla de NUM_PERM enteros de 32 bits) o None si el
+    texto no tiene términos. Cada término se pasa por SHAKE-128, que da
+    NUM_PERM valores independientes (uno por función de hash); la firma es
+    el mínimo de cada posición. No depende de ninguna semilla, así que las
+    firmas guardadas se comparan entre procesos y despliegues.
+    """
+    hashed = [_VALUES.unpack(hashlib.shake_128(shingle.encode('utf-8')).digest(_VALUES.size))
+              for shingle in shingles(title, content)]
+    if not hashed:
+        return None
+    return tuple(map(min, zip(*hashed)))
+
+
+def band_keys(sig, first_band=0):
+    """
+    (banda, bucket) de cada banda de la firma, numeradas desde `first_band`.
+    """
+    keys = []
+    for band in range(BANDS):
+        chunk = struct.pack(f'<{ROWS}I', *sig[band * ROWS:(band + 1) * ROWS])
+        # Entero con signo de 64 bits para que quepa en un BIGINT
+        bucket = int.from_bytes(hashlib.blake2b(chunk, digest_size=8).digest(),
+                                'little', signed=True)
+        keys.append((first_band + band, bucket))
+    return keys
+
+
+def similarity(sig_a, sig_b):
+    """
+    Estimación de la similitud de Jaccard entre dos firmas.
+    """
+    return sum(a == b for a, b in zip(sig_a, sig_b)) / NUM_PERM
+
+
+def _pack(sig):
+    return _VALUES.pack(*sig)
+
+
+def _unpack(data):
+    return _VALUES.unpack(data)
+
+
+def _rows(question_id, title, content):
+    """
+    Fila de la firma y filas de las bandas de una pregunta, o (None, [])
+    si su texto no tiene términos.
+    """
+    sig = signature(title, content)
+    if sig is None:
+        return None, []
+    title_sig = signature(title, '')
+    keys = band_keys(sig) + (band_keys(title_sig, TITLE_BAND) if title_sig else [])
+    return ({'question_id': question_id, 'signature': _pack(sig),
+             'title_signature': _pack(title_sig) if title_sig else None},
+            [{'band': band, 'bucket': bucket, 'question_id': question_id}
+             for band, bucket in keys])
+
+
+def index_question(question_id, title, content):
+    """
+    Guarda (o reemplaza) las firmas y las bandas de una pregunta dentro de
+    la transacción actual. Es idempotente.
+    """
+    db.session.execute(delete(QuestionBucket).where(QuestionBucket.question_id == question_id))
+    db.session.execute(delete(QuestionSignature).where(QuestionSignature.question_id == question_id))
+    signature_row, bucket_rows = _rows(question_id, title, content)
+    if signature_row is None:
+        return
+    db.session.execute(insert(QuestionSignature), [signature_row])
+    db.session.execute(insert(QuestionBucket), bucket_rows)
+
+
+def reindex(batch_size=1000):
+    """
+    Recalcula las firmas de todas las preguntas, leyendo por clave primaria
+    en lotes y confirmando cada lote. Devuelve el número de preguntas.
+    """
+    db.session.execute(delete(QuestionBucket))
+    db.session.execute(delete(QuestionSignature))
+    db.session.commit()
+    last_id, total = 0, 0
+    while True:
+        rows = db.session.query(Question.id, Question.title, Question.content) \
+            .filter(Question.id > last_id).order_by(Question.id).limit(batch_size).all()
+        signatures, buckets = [], []
+        for row in rows:
+            signature_row, bucket_rows = _rows(row.id, row.title, row.content)
+            if signature_row is not None:
+                signatures.append(signature_row)
+                buckets.extend(bucket_rows)
+        if signatures:
+            db.session.execute(insert(QuestionSignature), signatures)
+            db.session.execute(insert(QuestionBucket), buckets)
+        db.session.commit()
+        total += len(rows)
+        if len(rows) < batch_size:
+            return total
+        last_id = rows[-1].id
+
+
+def find_similar(title, content, limit=5, min_score=SUGGEST_SCORE, by_title=True):
+    """
+    Devuelve [(question_id, similitud)] de las preguntas más parecidas al
+    texto, de mayor a menor. Solo lee las bandas que coinciden (una lectura
+    de índice por banda), así que el costo no crece con el número de
+    preguntas sino con el de candidatas.
+
+    La firma completa se compara solo si hay contenido. Con `by_title` se
+    compara además el título con los títulos guardados y cuenta la mayor de
+    las dos similitudes, de modo que un título repetido se encuentra aunque
+    el contenido todavía no se haya escrito.
+    """
+    sig = signature(title, content) if tokenize(content or '') else None
+    title_sig = signature(title, '') if by_title else None
+    keys = (band_keys(sig) if sig else []) + \
+        (band_keys(title_sig, TITLE_BAND) if title_sig else [])
+    if not keys:
+        return []
+    matches = db.func.count().label('matches')
+    candidates = db.session.query(QuestionBucket.question_id, matches) \
+        .filter(or_(*(and_(QuestionBucket.band == band, QuestionBucket.bucket == bucket)
+                      for band, bucket in keys))) \
+        .group_by(QuestionBucket.question_id) \
+        .order_by(matches.desc()).limit(MAX_CANDIDATES).all()
+    ids = [row.question_id for row in candidates]
+    if not ids:
+        return []
+    rows = db.session.query(QuestionSignature.question_id, QuestionSignature.signature,
+                            QuestionSignature.title_signature) \
+        .filter(QuestionSignature.question_id.in_(ids))
+    scored = []
+    for row in rows:
+        score = similarity(sig, _unpack(row.signature)) if sig else 0
+        if title_sig and row.title_signature is not None:
+            score = max(score, similarity(title_sig, _unpack(row.title_signature)))
+        if score >= min_score:
+            scored.append((row.question_id, score))
+    scored.sort(key=lambda item: (-item[1], item[0]))
+    return scored[:limit]
+
+
+def suggestions(title, content, limit=5, min_score=SUGGEST_SCORE, by_title=True):
+    """
+    Preguntas parecidas al texto, listas para mostrar o devolver en JSON:
+    [{'id', 'title', 'total_answers', 'score'}]. Ver `find_similar`.
+    """
+    scores = dict(find_similar(title, content, limit=limit, min_score=min_score,
+                               by_title=by_title))
+    if not scores:
+        return []
+    rows = db.session.query(Question.id, Question.title, Question.total_answers) \
+        .filter(Question.id.in_(scores))
+    found = [{'id': row.id, 'title': row.title, 'total_answers': row.total_answers,
+              'score': round(scores[row.id], 2)} for row in rows]
+    return sorted(found, key=lambda item: (-item['score'], item['id']))
+
+
+def duplicate_pairs(min_score=DUPLICATE_SCORE, batch_size=5000):
+    """
+    Recorre los pares de preguntas que comparten alguna banda y devuelve
+    [(id menor, id mayor, similitud)] de los que superan `min_score`. Los
+    pares salen de un self-join sobre las bandas, nunca de comparar todas
+    las preguntas entre sí. Las bandas con más de MAX_BUCKET_SIZE preguntas
+    (texto genérico que comparten muchas) se saltan: dos duplicados reales
+    coinciden también en otras bandas. Solo se usan las bandas de la firma
+    completa.
+    """
+    shared = db.session.query(QuestionBucket.band, QuestionBucket.bucket) \
+        .filter(QuestionBucket.band < TITLE_BAND) \
+        .group_by(QuestionBucket.band, QuestionBucket.bucket) \
+        .having(db.func.count().between(2, MAX_BUCKET_SIZE)).subquery()
+    first, second = aliased(QuestionBucket), aliased(QuestionBucket)
+    pairs = db.session.query(first.question_id.label('first'),
+                             second.question_id.label('second')) \
+        .join(shared, and_(first.band == shared.c.band, first.bucket == shared.c.bucket)) \
+        .join(second, and_(second.band == first.band,
+                           second.bucket == first.bucket,
+                           second.question_id > first.question_id)) \
+        .distinct().yield_per(batch_size)
+
+    found, batch = [], []
+    for pair in pairs:
+        batch.append((pair.first, pair.second))
+        if len(batch) >= batch_size:
+            found.extend(_score_pairs(batch, min_score))
+            batch = []
+    found.extend(_score_pairs(batch, min_score))
+    return found
+
+
+def _score_pairs(pairs, min_score):
+    if not pairs:
+        return []
+    ids = {question_id for pair in pairs for question_id in pair}
+    signatures = {row.question_id: _unpack(row.signature) for row in
+                  db.session.query(QuestionSignature.question_id, QuestionSignature.signature)
+                  .filter(QuestionSignature.question_id.in_(ids))}
+    scored = []
+    for first, second in pairs:
+        score = similarity(signatures[first], signatures[second])
+        if score >= min_score:
+            scored.append((first, second, score))
+    return scored
+
+
+def duplicate_clusters(min_score=DUPLICATE_SCORE):
+    """
+    Agrupa los pares de `duplicate_pairs` en conjuntos de preguntas
+    duplicadas entre sí. Devuelve una lista de grupos, los más grandes
+    primero; cada grupo es {'questions': [ids], 'pairs': [(a, b, similitud)]}
+    y su primera pregunta es la más antigua.
+    """
+    parent = {}
+
+    def find(question_id):
+        parent.setdefault(question_id, question_id)
+        while parent[question_id] != question_id:
+            parent[question_id] = parent[parent[question_id]]
+            question_id = parent[question_id]
+        return question_id
+
+    pairs = duplicate_pairs(min_score)
+    for first, second, _ in pairs:
+        root_a, root_b = find(first), find(second)
+        if root_a != root_b:
+            parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    clusters = {}
+    for first, second, score in pairs:
+        cluster = clusters.setdefault(find(first), {'questions': set(), 'pairs': []})
+        cluster['questions'].update((first, second))
+        cluster['pairs'].append((first, second, round(score, 2)))
+    result = [{'questions': sorted(cluster['questions']), 'pairs': cluster['pairs']}
+              for cluster in clusters.values()]
+    result.sort(key=lambda cluster: (-len(cluster['questions']), cluster['questions'][0]))
+    return result
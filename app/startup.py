@@ -0,0 +1,80 @@
+import json
+import os
+import subprocess
+import sys
+
+# Script que corre en un proceso nuevo: importa el paquete y crea la
+# aplicación midiendo cada paso. El reloj empieza antes del primer import
+# de la aplicación para incluir el costo de importar sus dependencias.
+CHILD_SCRIPT = """
+import json, resource, sys, time
+start = time.perf_counter()
+from app import create_app
+imported = time.perf_counter()
+app = create_app()
+created = time.perf_counter()
+# Una aplicación más con todo ya importado, como en una suite de pruebas
+create_app()
+warm = time.perf_counter()
+print(json.dumps({
+    'import_ms': (imported - start) * 1000,
+    'create_app_ms': (created - imported) * 1000,
+    'warm_create_app_ms': (warm - created) * 1000,
+    'total_ms': (created - start) * 1000,
+    'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    'steps_ms': {name: seconds * 1000
+                      for name, seconds in app.extensions['startup_timings'].items()},
+    'modules': len(sys.modules),
+}))
+"""
+
+
+def measure_startup(importtime=False, cwd=None):
+    """
+    Arranca la aplicación en un proceso nuevo (para que nada esté ya
+    importado) y devuelve sus tiempos. Con `importtime`, incluye además la
+    salida de `python -X importtime` ya interpretada.
+    """
+    command = [sys.executable]
+    if importtime:
+        command += ['-X', 'importtime']
+    command += ['-c', CHILD_SCRIPT]
+    result = subprocess.run(command, capture_output=True, text=True,
+                            cwd=cwd or os.getcwd(), check=False)
+    if result.returncode != 0:
+        raise RuntimeError(f"El arranque falló:\n{result.stderr[-2000:]}")
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    if importtime:
+        report['imports'] = parse_importtime(result.stderr)
+    return report
+
+
+def parse_importtime(output):
+    """
+    Interpreta la salida de `-X importtime` como una lista de
+    (módulo, ms propios, ms acumulados, profundidad).
+    """
+    imports = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        # El nombre va sangrado con dos espacios por nivel de anidamiento
+        depth = (len(name) - len(name.lstrip(' ')) - 1) // 2
+        imports.append((name.strip(), int(self_us) / 1000, int(cumulative_us) / 1000, depth))
+    return imports
+
+
+def imports_by_package(imports, limit=15):
+    """
+    Suma el tiempo propio de los módulos de cada paquete de primer nivel
+    (sqlalchemy, flask, app...) y devuelve los `limit` más caros como
+    (paquete, ms, módulos).
+    """
+    totals = {}
+    for name, self_ms, _, _ in imports:
+        package = name.split('.', 1)[0]
+        ms, count = totals.get(package, (0.0, 0))
+        totals[package] = (ms + self_ms, count + 1)
+    ranked = sorted(totals.items(), key=lambda item: item[1][0], reverse=True)
+    return [(package, ms, count) for package, (ms, count) in ranked[:limit]]
@@ -0,0 +1,107 @@
+// Fechas relativas (<time data-time-ago>). El servidor ya escribe el texto
+// redondeado; aquí solo se actualizan los elementos visibles, en un único
+// cuadro de animación y como mucho una vez por minuto.
+(function () {
+    const UNITS = [
+        [31536000, 'año', 'años'],
+        [2592000, 'mes', 'meses'],
+        [86400, 'día', 'días'],
+        [3600, 'hora', 'horas'],
+        [60, 'minuto', 'minutos']
+    ];
+
+    function timeAgo(timestamp, now) {
+        const seconds = Math.floor((now - timestamp) / 1000);
+        for (const [size, singular, plural] of UNITS) {
+            if (seconds >= size) {
+                const count = Math.floor(seconds / size);
+                return `Hace ${count} ${count === 1 ? singular : plural}`;
+            }
+        }
+        return 'Hace unos segundos';
+    }
+
+    if (!('IntersectionObserver' in window)) {
+        return;
+    }
+
+    // Elemento visible -> instante de creación (se interpreta una sola vez)
+    const visible = new Map();
+    let scheduled = false;
+
+    function refresh() {
+        scheduled = false;
+        const now = Date.now();
+        visible.forEach((timestamp, element) => {
+            const text = timeAgo(timestamp, now);
+            if (element.textContent !== text) {
+                element.textContent = text;
+            }
+        });
+    }
+
+    function schedule() {
+        if (!scheduled) {
+            scheduled = true;
+            requestAnimationFrame(refresh);
+        }
+    }
+
+    const observer = new IntersectionObserver(entries => {
+        entries.forEach(entry => {
+            if (entry.isIntersecting) {
+                visible.set(entry.target, Date.parse(entry.target.getAttribute('datetime')));
+            } else {
+                visible.delete(entry.target);
+            }
+        });
+        schedule();
+    });
+
+    function observeAll(root) {
+        root.querySelectorAll('time[data-time-ago]').forEach(element => observer.observe(element));
+    }
+
+    observeAll(document);
+    // Fragmentos cargados después (p. ej. más respuestas)
+    document.addEventListener('fragment:loaded', event => observeAll(event.detail));
+    setInterval(schedule, 60000);
+})();
+
+// "Cargar más respuestas": pide solo el fragmento de la página siguiente y
+// lo inserta en lugar del enlace. El fragmento trae su propio enlace si
+// quedan más páginas.
+(function () {
+    document.addEventListener('click', event => {
+        const link = event.target.closest('[data-load-more] a[data-fragment-url]');
+        if (!link) {
+            return;
+        }
+        event.preventDefault();
+        if (link.dataset.loading) {
+            return;
+        }
+        link.dataset.loading = '1';
+        const container = link.closest('[data-load-more]');
+        fetch(link.dataset.fragmentUrl, { credentials: 'same-origin' })
+            .then(response => {
+                if (!response.ok) {
+                    throw new Error(response.status);
+                }
+                return response.text();
+            })
+            .then(html => {
+                const template = document.createElement('template');
+                template.innerHTML = html;
+                const parent = container.parentNode;
+                const next = container.nextSibling;
+                container.remove();
+                parent.insertBefore(template.content, next);
+                document.dispatchEvent(new CustomEvent('fragment:loaded', { detail: parent }));
+            })
+            .catch(() => {
+                // Si falla, se navega a la página siguiente completa
+                window.location.href = link.href;
+            });
+    });
+})();
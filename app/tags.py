@@ -0,0 +1,97 @@
+import re
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from . import db
+from .models import Question, Tag, question_tags
+
+MAX_TAGS = 5
+MAX_TAG_LENGTH = 100
+
+SPACES_RE = re.compile(r'\s+')
+
+
+def normalize_tag(name):
+    """
+    Normaliza el nombre de una etiqueta: sin espacios a los lados, en
+    minúsculas y con los espacios internos reemplazados por guiones.
+    """
+    name = SPACES_RE.sub('-', (name or '').strip().lower())
+    return name[:MAX_TAG_LENGTH]
+
+
+def parse_tags(raw):
+    """
+    Convierte el texto del formulario ("Física, cálculo ,fisica") en una lista
+    de etiquetas normalizadas, sin repetidos y con un máximo de MAX_TAGS.
+    """
+    names = []
+    for part in (raw or '').split(','):
+        name = normalize_tag(part)
+        if name and name not in names:
+            names.append(name)
+    return names[:MAX_TAGS]
+
+
+def get_or_create_tags(names):
+    """
+    Devuelve las etiquetas con esos nombres, creando las que no existan.
+    Si otra petición crea la misma etiqueta a la vez, se reutiliza la suya.
+    """
+    if not names:
+        return []
+    tags = {tag.name: tag for tag in Tag.query.filter(Tag.name.in_(names))}
+    for name in names:
+        if name in tags:
+            continue
+        try:
+            with db.session.begin_nested():
+                tag = Tag(name=name)
+                db.session.add(tag)
+        except IntegrityError:
+            tag = Tag.query.filter_by(name=name).one()
+        tags[name] = tag
+    return [tags[name] for name in names]
+
+
+def attach_tags(question, names):
+    """
+    Asocia las etiquetas a una pregunta nueva e incrementa su contador en
+    una sola sentencia UPDATE, dentro de la transacción actual.
+    """
+    tags = get_or_create_tags(names)
+    if not tags:
+        return []
+    question.tags = tags
+    db.session.flush()
+    db.session.execute(
+        update(Tag)
+        .where(Tag.id.in_([tag.id for tag in tags]))
+        .values(question_count=Tag.question_count + 1)
+        .execution_options(synchronize_session=False))
+    return tags
+
+
+def autocomplete(prefix, limit=10):
+    """
+    Devuelve los nombres de las etiquetas que empiezan con `prefix`,
+    las más usadas primero.
+    """
+    prefix = normalize_tag(prefix)
+    if not prefix:
+        return []
+    # Se escapan los comodines de LIKE para que el prefijo sea literal
+    escaped = prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    rows = db.session.query(Tag.name) \
+        .filter(Tag.name.like(f'{escaped}%', escape='\\')) \
+        .order_by(Tag.question_count.desc(), Tag.name) \
+        .limit(limit).all()
+    return [row.name for row in rows]
+
+
+def tagged_query(query, tag):
+    """
+    Restringe una consulta de preguntas a las que tienen la etiqueta `tag`,
+    usando el índice (tag_id, question_id) de la tabla de asociación.
+    """
+    return query.join(question_tags, question_tags.c.question_id == Question.id) \
+        .filter(question_tags.c.tag_id == tag.id)
@@ -0,0 +1,37 @@
+from datetime import datetime
+from . import db, jobs, search_index
+from .models import Question, Answer
+from .rankings import refresh_question
+from .similarity import index_question as index_similarity
+
+
+@jobs.task('index_question')
+def index_question(question_id):
+    """
+    Agrega una pregunta nueva al índice de búsqueda y guarda su firma de
+    similitud (ver app/similarity.py).
+    """
+    question = db.session.get(Question, question_id)
+    if question is not None:
+        search_index.index_question(question)
+        index_similarity(question.id, question.title, question.content)
+        db.session.commit()
+
+
+@jobs.task('index_answer')
+def index_answer(answer_id):
+    """
+    Agrega una respuesta nueva al índice de búsqueda.
+    """
+    answer = db.session.get(Answer, answer_id)
+    if answer is not None:
+        search_index.index_answer(answer)
+
+
+@jobs.task('refresh_ranking')
+def refresh_ranking(question_id, activity_at=None):
+    """
+    Actualiza el puntaje "hot" y la última actividad de una pregunta.
+    """
+    refresh_question(question_id,
+                     datetime.fromisoformat(activity_at) if activity_at else None)
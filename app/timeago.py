@@ -0,0 +1,35 @@
+from datetime import datetime
+
+# (segundos, singular, plural), de la unidad mayor a la menor
+UNITS = (
+    (31536000, 'año', 'años'),
+    (2592000, 'mes', 'meses'),
+    (86400, 'día', 'días'),
+    (3600, 'hora', 'horas'),
+    (60, 'minuto', 'minutos'),
+)
+
+
+def time_ago(value, now=None):
+    """
+    Texto relativo ("Hace 3 horas") de una fecha en UTC, redondeado hacia
+    abajo a la mayor unidad que cabe. El texto solo cambia al pasar de un
+    tramo al siguiente, así que sigue siendo válido dentro de los fragmentos
+    cacheados; el navegador lo actualiza después (static/js/scripts.js).
+    """
+    if value is None:
+        return "Fecha no disponible"
+    seconds = int(((now or datetime.utcnow()) - value).total_seconds())
+    for size, singular, plural in UNITS:
+        if seconds >= size:
+            count = seconds // size
+            return f"Hace {count} {singular if count == 1 else plural}"
+    return "Hace unos segundos"
+
+
+def iso_utc(value):
+    """
+    Fecha en ISO 8601 con zona UTC explícita, para que el navegador no la
+    interprete como hora local.
+    """
+    return value.isoformat() + 'Z' if value is not None else ''
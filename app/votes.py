@@ -0,0 +1,134 @@
+from datetime import datetime
+from sqlalchemy import text, update
+from sqlalchemy.exc import IntegrityError
+from . import db
+from .models import Question, Answer, Vote
+from .counters import adjust_reputation, bump_revision
+
+UPVOTE = 1
+DOWNVOTE = -1
+
+VOTE_VALUES = {'up': UPVOTE, 'down': DOWNVOTE}
+
+# Upsert del voto y ajuste del contador en una sola sentencia. El INSERT ...
+# ON CONFLICT bloquea solo la fila del voto y RETURNING calcula el delta
+# exacto a partir de si la fila se insertó (xmax = 0) o cambió de signo:
+#   voto nuevo           -> +value
+#   voto que cambia      -> 2 * value
+#   voto repetido        -> no devuelve fila, no se toca el contador
+#
+# El UPDATE del contador sí toma el lock de la fila de la pregunta (o de la
+# respuesta) hasta el commit, y con él se ajustan la revisión y la
+# reputación del autor. Se acepta a propósito: total_votes, revision y
+# reputation se leen en cada página y deben coincidir con la tabla votes al
+# confirmar. Un contador asíncrono aplicaría cada delta fuera de la
+# transacción del voto, con el riesgo de aplicarlo dos veces al reintentar
+# un trabajo. La transacción del voto son tres sentencias cortas. Cuando una
+# pregunta recibe muchos votos a la vez, GROUP_COMMIT_ENABLED (ver
+# app/writer.py) junta los votos en un solo hilo escritor y una transacción
+# por lote, así que las peticiones ya no compiten por ese lock.
+_UPSERT_SQL = """
+    WITH upserted AS (
+        INSERT INTO votes (user_id, question_id, answer_id, value, created_at)
+        VALUES (:user_id, :question_id, :answer_id, :value, :created_at)
+        ON CONFLICT ({conflict}) WHERE {conflict_where}
+        DO UPDATE SET value = EXCLUDED.value
+        WHERE votes.value <> EXCLUDED.value
+        RETURNING CASE WHEN xmax = 0 THEN value ELSE 2 * value END AS delta
+    ), updated AS (
+        UPDATE {table} SET total_votes = {table}.total_votes + upserted.delta
+        FROM upserted
+        WHERE {table}.id = :target_id
+        RETURNING upserted.delta
+    )
+    SELECT delta FROM updated
+"""
+
+QUESTION_UPSERT = text(_UPSERT_SQL.format(
+    conflict='user_id, question_id', conflict_where='answer_id IS NULL',
+    table='questions'))
+
+ANSWER_UPSERT = text(_UPSERT_SQL.format(
+    conflict='user_id, answer_id', conflict_where='answer_id IS NOT NULL',
+    table='answers'))
+
+
+def vote_question(user_id, question_id, value):
+    """
+    Registra el voto de un usuario sobre una pregunta. Votar dos veces lo
+    mismo no tiene efecto; votar lo contrario cambia el signo del voto.
+    Devuelve el cambio aplicado al puntaje (0, ±1 o ±2).
+    """
+    return _cast(user_id, question_id, None, value, Question, QUESTION_UPSERT)
+
+
+def vote_answer(user_id, answer, value):
+    """
+    Registra el voto de un usuario sobre una respuesta. Mismas reglas que
+    `vote_question`.
+    """
+    return _cast(user_id, answer.question_id, answer.id, value, Answer, ANSWER_UPSERT)
+
+
+def _cast(user_id, question_id, answer_id, value, model, upsert):
+    if value not in (UPVOTE, DOWNVOTE):
+        raise ValueError(f"Valor de voto inválido: {value}")
+    target_id = answer_id if answer_id is not None else question_id
+
+    if db.engine.dialect.name == 'postgresql':
+        result = db.session.execute(upsert, {
+            'user_id': user_id, 'question_id': question_id,
+            'answer_id': answer_id, 'value': value,
+            'created_at': datetime.utcnow(), 'target_id': target_id,
+        })
+        delta = result.scalar() or 0
+    else:
+        delta = _cast_generic(user_id, question_id, answer_id, value, model, target_id)
+
+    # La reputación del autor y la revisión de la pregunta se ajustan en la
+    # misma transacción que el voto, que ya tiene el lock de la fila de la
+    # pregunta o respuesta (ver el comentario de _UPSERT_SQL)
+    if delta:
+        adjust_reputation(model, target_id, delta)
+        bump_revision(question_id)
+    return delta
+
+
+def _cast_generic(user_id, question_id, answer_id, value, model, target_id):
+    """
+    Variante para motores sin la forma de upsert de PostgreSQL (SQLite en
+    pruebas). Primero intenta cambiar el signo de un voto existente con un
+    UPDATE condicional, que es atómico y toma el lock de escritura; si no hay
+    voto, lo inserta en un savepoint y deja que el índice único resuelva la
+    carrera de dos inserciones simultáneas.
+    """
+    if _flip_vote(user_id, question_id, answer_id, value):
+        delta = 2 * value
+    else:
+        try:
+            with db.session.begin_nested():
+                db.session.add(Vote(user_id=user_id, question_id=question_id,
+                                    answer_id=answer_id, value=value))
+            delta = value
+        except IntegrityError:
+            # Otra petición insertó el voto primero
+            delta = 2 * value if _flip_vote(user_id, question_id, answer_id, value) else 0
+
+    if delta:
+        db.session.execute(
+            update(model)
+            .where(model.id == target_id)
+            .values(total_votes=model.total_votes + delta)
+            .execution_options(synchronize_session=False))
+    return delta
+
+
+def _flip_vote(user_id, question_id, answer_id, value):
+    result = db.session.execute(
+        update(Vote)
+        .where(Vote.user_id == user_id, Vote.question_id == question_id,
+               Vote.answer_id.is_(None) if answer_id is None else Vote.answer_id == answer_id,
+               Vote.value != value)
+        .values(value=value)
+        .execution_options(synchronize_session=False))
+    return result.rowcount > 0
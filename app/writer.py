@@ -0,0 +1,180 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from flask import g, has_app_context
+
+logger = logging.getLogger(__name__)
+
+
+class GroupCommitTimeout(Exception):
+    """
+    Se lanza cuando el escritor no confirmó la escritura a tiempo (o su cola
+    está llena). La aplicación la convierte en un 503 con Retry-After.
+    """
+
+
+class _Write:
+    __slots__ = ('unit', 'args', 'kwargs', 'future')
+
+    def __init__(self, unit, args, kwargs):
+        self.unit = unit
+        self.args = args
+        self.kwargs = kwargs
+        self.future = Future()
+
+
+class GroupCommitWriter:
+    """
+    Confirma las escrituras de las peticiones. Por defecto cada petición
+    ejecuta su escritura y hace su propio commit; con GROUP_COMMIT_ENABLED
+    las escrituras se envían a un único hilo escritor que junta las que
+    llegan en unos milisegundos y las confirma en una sola transacción, de
+    modo que una ráfaga de respuestas paga un commit (y un fsync) por lote
+    y no por petición.
+
+    Una escritura es una función que usa `db.session` sin hacer commit y
+    devuelve un valor simple (p. ej. el id creado), nunca objetos de la
+    sesión, que en modo agrupado es la del hilo escritor:
+
+        answer_id = group_commit.run(create_answer, user_id, question_id, content)
+
+    La petición recibe el valor devuelto o la misma excepción que lanzó su
+    escritura. Si una escritura del lote falla, el lote se revierte y cada
+    escritura se repite en su propia transacción, así el error solo llega a
+    la petición que lo causó.
+
+    Configuración:
+        GROUP_COMMIT_ENABLED: agrupa las escrituras en el hilo escritor
+        GROUP_COMMIT_WINDOW_MS: cuánto espera el escritor a que lleguen más
+            escrituras después de la primera de un lote
+        GROUP_COMMIT_MAX_BATCH: escrituras por transacción como máximo
+        GROUP_COMMIT_QUEUE: escrituras pendientes permitidas antes de
+            responder 503
+        GROUP_COMMIT_TIMEOUT: segundos que una petición espera su resultado
+    """
+
+    def __init__(self, app=None, db=None):
+        self.app = None
+        self.db = db
+        self.enabled = False
+        self.window = 0.005
+        self.max_batch = 100
+        self.timeout = 10.0
+        self.batches = 0
+        self.writes = 0
+        self._queue = None
+        self._thread = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app, db)
+
+    def init_app(self, app, db):
+        self.app = app
+        self.db = db
+        self.enabled = app.config.get('GROUP_COMMIT_ENABLED', False)
+        self.window = app.config.get('GROUP_COMMIT_WINDOW_MS', 5) / 1000
+        self.max_batch = app.config.get('GROUP_COMMIT_MAX_BATCH', 100)
+        self.timeout = app.config.get('GROUP_COMMIT_TIMEOUT', 10)
+        self._queue = queue.Queue(app.config.get('GROUP_COMMIT_QUEUE', 10000))
+        app.register_error_handler(GroupCommitTimeout, self._timeout_response)
+
+    def _timeout_response(self, error):
+        return ("El servidor está recibiendo demasiadas publicaciones. Intenta de nuevo en unos segundos.",
+                503, {'Retry-After': '1'})
+
+    def run(self, unit, *args, **kwargs):
+        """
+        Ejecuta la escritura `unit(*args, **kwargs)` y la confirma. Devuelve
+        lo que devuelva `unit`.
+        """
+        if not self.enabled:
+            return self._run_direct(unit, args, kwargs)
+
+        write = _Write(unit, args, kwargs)
+        self._ensure_writer()
+        try:
+            self._queue.put(write, timeout=self.timeout)
+        except queue.Full:
+            raise GroupCommitTimeout("La cola de escrituras está llena")
+        try:
+            result = write.future.result(timeout=self.timeout)
+        except FutureTimeout:
+            # La escritura puede confirmarse todavía; la petición no lo sabrá
+            raise GroupCommitTimeout("La escritura no se confirmó a tiempo")
+        # El commit ocurrió en otra sesión: se avisa al enrutador de réplicas
+        # para que este cliente lea de la principal
+        if has_app_context():
+            g._db_wrote = True
+        return result
+
+    def _run_direct(self, unit, args, kwargs):
+        session = self.db.session
+        try:
+            result = unit(*args, **kwargs)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        return result
+
+    def _ensure_writer(self):
+        # El hilo se crea en el primer uso, dentro del proceso que atiende
+        # peticiones
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._loop, name='group-commit', daemon=True)
+                self._thread.start()
+
+    def _loop(self):
+        with self.app.app_context():
+            while True:
+                batch = self._next_batch()
+                try:
+                    self._commit_batch(batch)
+                finally:
+                    self.db.session.remove()
+
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _commit_batch(self, batch):
+        session = self.db.session
+        try:
+            results = [write.unit(*write.args, **write.kwargs) for write in batch]
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            if len(batch) == 1:
+                batch[0].future.set_exception(e)
+                return
+            logger.warning("Falló un lote de %d escrituras; se repiten una a una", len(batch))
+            for write in batch:
+                self._run_alone(write)
+            return
+        self.batches += 1
+        self.writes += len(batch)
+        for write, result in zip(batch, results):
+            write.future.set_result(result)
+
+    def _run_alone(self, write):
+        try:
+            result = self._run_direct(write.unit, write.args, write.kwargs)
+        except Exception as e:
+            write.future.set_exception(e)
+            return
+        self.batches += 1
+        self.writes += 1
+        write.future.set_result(result)
@@ -0,0 +1,14 @@
+"""
+Punto de entrada ASGI: las rutas /api/feed y /api/questions/<id> se sirven
+con el motor asíncrono y el resto pasa a la aplicación Flask.
+
+    uvicorn asgi:application --workers 4
+"""
+from dotenv import load_dotenv
+from app import create_app
+from app.asgi import AsyncReadAPI
+
+# Cargar las variables de entorno desde .env antes de leer la configuración
+load_dotenv()
+
+application = AsyncReadAPI(create_app())
@@ -0,0 +1,3 @@
+"""
+Benchmarks de StudentOverflow. Cada módulo se ejecuta con `python -m benchmarks.<nombre>`.
+"""
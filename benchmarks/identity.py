@@ -0,0 +1,70 @@
+"""
+Compara peticiones por segundo de una ruta autenticada con la caché de
+identidad desactivada (un SELECT a users por petición) y activada.
+
+    python -m benchmarks.identity --requests 2000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from config import Config
+from app import create_app, db, password_hasher
+from app.models import User
+from app.queries import count_queries
+
+
+def build_app(ttl, db_path):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{db_path}'
+        WTF_CSRF_ENABLED = False
+        IDENTITY_CACHE_TTL = ttl
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        # La ruta medida solo necesita la tabla users
+        User.__table__.create(db.engine, checkfirst=True)
+        if not User.query.first():
+            password = password_hasher.hash('bench')
+            db.session.add(User(username='bench', email='bench@example.com',
+                                password=password, role='standard'))
+            db.session.commit()
+    return app
+
+
+def run(app, total):
+    client = app.test_client()
+    client.post('/login', data={'email': 'bench@example.com', 'password': 'bench'})
+
+    cookies_sent = 0
+    with app.app_context():
+        with count_queries() as queries:
+            start = time.perf_counter()
+            for _ in range(total):
+                response = client.get('/settings')
+                if 'Set-Cookie' in response.headers:
+                    cookies_sent += 1
+            elapsed = time.perf_counter() - start
+
+    return {
+        'requests_per_second': round(total / elapsed, 1),
+        'queries_per_request': round(len(queries) / total, 2),
+        'responses_with_set_cookie': cookies_sent,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.db')
+        for label, ttl in (('sin caché', 0), ('con caché', 30)):
+            result = run(build_app(ttl, db_path), args.requests)
+            print(f"{label:>10}: {result}")
+
+
+if __name__ == '__main__':
+    main()
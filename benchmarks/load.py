@@ -0,0 +1,210 @@
+"""
+Benchmark de carga de las rutas principales. Construye la aplicación con
+create_app sobre una base sembrada (SQLite temporal o DATABASE_URL), la
+recorre con varios hilos y reporta en JSON, por ruta, latencia p50/p95/p99,
+throughput y consultas SQL por petición.
+
+    python -m benchmarks.load --threads 8 --requests 200 --output resultado.json
+    python -m benchmarks.load --baseline resultado.json --tolerance 0.2
+
+Con --baseline el proceso termina con código 1 si alguna ruta empeora más
+que la tolerancia (p95 o consultas por petición) respecto a la referencia.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from itertools import count
+
+from config import Config
+from app import create_app, db, metrics
+from benchmarks.seed import BENCH_PASSWORD, seed
+
+ROUTES = ('home', 'question', 'answer', 'login', 'register')
+
+# Endpoint de Flask de cada ruta, para leer las consultas SQL de /metrics
+ENDPOINTS = {
+    'home': 'main.home',
+    'question': 'main.question',
+    'answer': 'main.answer',
+    'login': 'main.login',
+    'register': 'main.signup',
+}
+
+
+def build_app(database_url, hash_rounds):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = database_url
+        SQLALCHEMY_ENGINE_OPTIONS = (
+            {'connect_args': {'timeout': 30}} if database_url.startswith('sqlite') else {})
+        WTF_CSRF_ENABLED = False
+        PASSWORD_HASH_ROUNDS = hash_rounds
+        # Sin log de peticiones lentas para no distorsionar los tiempos
+        METRICS_SLOW_REQUEST_MS = 10 ** 9
+        # Todos los hilos comparten IP: el límite de peticiones daría 429
+        RATELIMIT_ENABLED = False
+
+    return create_app(BenchConfig)
+
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))
+    return ordered[index]
+
+
+class LoadClient:
+    """
+    Cliente de un hilo: inicia sesión con un usuario sembrado y hace
+    peticiones a las rutas elegidas, guardando la latencia de cada una.
+    """
+
+    _register_ids = count()
+
+    def __init__(self, app, user_count, question_ids, rng):
+        self.client = app.test_client()
+        self.question_ids = question_ids
+        self.rng = rng
+        self.email = f'user{rng.randrange(user_count)}@example.com'
+        self.client.post('/login', data={'email': self.email, 'password': BENCH_PASSWORD})
+
+    def request(self, route):
+        question_id = self.rng.choice(self.question_ids)
+        if route == 'home':
+            return self.client.get('/')
+        if route == 'question':
+            return self.client.get(f'/question/{question_id}')
+        if route == 'answer':
+            return self.client.get(f'/answer/{question_id}')
+        if route == 'login':
+            return self.client.post('/login', data={'email': self.email, 'password': BENCH_PASSWORD})
+        if route == 'register':
+            n = next(self._register_ids)
+            return self.client.post('/register', data={
+                'username': f'bench{n}', 'email': f'bench{n}@example.com', 'password': 'x'})
+        raise ValueError(route)
+
+
+def run(app, ids, routes, threads, requests_per_thread):
+    latencies = {route: [] for route in routes}
+    errors = {route: 0 for route in routes}
+    lock = threading.Lock()
+
+    def worker(index):
+        rng = random.Random(index)
+        client = LoadClient(app, len(ids['users']), ids['questions'], rng)
+        local = {route: [] for route in routes}
+        local_errors = {route: 0 for route in routes}
+        for _ in range(requests_per_thread):
+            route = rng.choice(routes)
+            start = time.perf_counter()
+            response = client.request(route)
+            local[route].append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                local_errors[route] += 1
+        with lock:
+            for route in routes:
+                latencies[route].extend(local[route])
+                errors[route] += local_errors[route]
+
+    metrics.registry.clear()
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    report = {}
+    for route in routes:
+        values = latencies[route]
+        report[route] = {
+            'requests': len(values),
+            'errors': errors[route],
+            'p50_ms': round(percentile(values, 0.50) * 1000, 2) if values else None,
+            'p95_ms': round(percentile(values, 0.95) * 1000, 2) if values else None,
+            'p99_ms': round(percentile(values, 0.99) * 1000, 2) if values else None,
+            'queries_per_request': round(
+                metrics.registry.mean('sql_queries_per_request', ENDPOINTS[route]) or 0.0, 2),
+        }
+    total = sum(len(values) for values in latencies.values())
+    return {'throughput_rps': round(total / elapsed, 1), 'routes': report}
+
+
+def compare(result, baseline, tolerance):
+    """
+    Devuelve la lista de regresiones respecto a la referencia.
+    """
+    regressions = []
+    for route, current in result['routes'].items():
+        previous = baseline.get('routes', {}).get(route)
+        if not previous:
+            continue
+        for key in ('p95_ms', 'queries_per_request'):
+            old, new = previous.get(key), current.get(key)
+            if old is None or new is None:
+                continue
+            # Pequeño margen absoluto para que rutas muy rápidas no fallen por ruido
+            if new > old * (1 + tolerance) + (0.5 if key == 'p95_ms' else 0):
+                regressions.append(f"{route}.{key}: {old} -> {new}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--questions', type=int, default=1000)
+    parser.add_argument('--answers', type=int, default=3000)
+    parser.add_argument('--votes', type=int, default=5000)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=200, help='peticiones por hilo')
+    parser.add_argument('--routes', default=','.join(ROUTES))
+    parser.add_argument('--hash-rounds', type=int, default=4,
+                        help='costo de bcrypt (bajo por defecto para medir las rutas, no el hash)')
+    parser.add_argument('--output', help='archivo donde guardar el resultado JSON')
+    parser.add_argument('--baseline', help='resultado JSON de referencia para comparar')
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    args = parser.parse_args()
+
+    routes = [route for route in args.routes.split(',') if route]
+    unknown = set(routes) - set(ROUTES)
+    if unknown:
+        parser.error(f"rutas desconocidas: {', '.join(sorted(unknown))}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = os.environ.get('DATABASE_URL') or f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        app = build_app(database_url, args.hash_rounds)
+        with app.app_context():
+            db.create_all()
+            ids = seed(args.users, args.questions, args.answers, args.votes)
+
+        result = run(app, ids, routes, args.threads, args.requests)
+        result['config'] = {key: getattr(args, key) for key in
+                            ('users', 'questions', 'answers', 'votes', 'threads', 'requests')}
+
+    output = json.dumps(result, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(result, json.load(f), args.tolerance)
+        if regressions:
+            print("Regresiones respecto a la referencia:", file=sys.stderr)
+            for line in regressions:
+                print(f"  {line}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
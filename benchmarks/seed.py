@@ -0,0 +1,69 @@
+"""
+Carga datos sintéticos (usuarios, preguntas, respuestas y votos) para los
+benchmarks, con inserciones por lotes.
+"""
+import random
+from datetime import datetime, timedelta
+
+from app import db, password_hasher
+from app.counters import reconcile_counters
+from app.models import User, Question, Answer, Vote
+
+BATCH_SIZE = 1000
+
+BENCH_PASSWORD = 'benchmark'
+
+WORDS = ('integral derivada matriz vector física química álgebra límite función '
+         'ecuación probabilidad estadística programación algoritmo python recursión '
+         'base datos consulta índice energía fuerza movimiento átomo célula').split()
+
+
+def _sentence(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def _insert(model, rows):
+    for start in range(0, len(rows), BATCH_SIZE):
+        db.session.execute(model.__table__.insert(), rows[start:start + BATCH_SIZE])
+
+
+def seed(users=100, questions=1000, answers=3000, votes=5000, seed_value=42):
+    """
+    Llena la base de datos del contexto actual. Todos los usuarios tienen la
+    contraseña BENCH_PASSWORD y el correo userN@example.com.
+    Devuelve un dict con los ids creados.
+    """
+    rng = random.Random(seed_value)
+    now = datetime.utcnow()
+    # Un solo hash para todos: el costo de bcrypt no es lo que se mide aquí
+    password = password_hasher.hash(BENCH_PASSWORD)
+
+    _insert(User, [{'username': f'user{i}', 'email': f'user{i}@example.com',
+                    'password': password, 'role': 'standard'} for i in range(users)])
+    user_ids = [row.id for row in db.session.query(User.id).order_by(User.id)]
+
+    _insert(Question, [{
+        'title': _sentence(rng, 6), 'content': _sentence(rng, 40),
+        'user_id': rng.choice(user_ids), 'total_votes': 0, 'total_answers': 0,
+        'created_at': now - timedelta(minutes=rng.randrange(60 * 24 * 365)),
+    } for _ in range(questions)])
+    question_ids = [row.id for row in db.session.query(Question.id).order_by(Question.id)]
+
+    _insert(Answer, [{
+        'content': _sentence(rng, 30), 'question_id': rng.choice(question_ids),
+        'author_id': rng.choice(user_ids), 'total_votes': 0,
+        'created_at': now - timedelta(minutes=rng.randrange(60 * 24 * 365)),
+    } for _ in range(answers)])
+
+    pairs = set()
+    limit = min(votes, len(user_ids) * len(question_ids))
+    while len(pairs) < limit:
+        pairs.add((rng.choice(user_ids), rng.choice(question_ids)))
+    _insert(Vote, [{'user_id': user_id, 'question_id': question_id, 'answer_id': None,
+                    'value': rng.choice((1, 1, 1, -1)), 'created_at': now}
+                   for user_id, question_id in pairs])
+    db.session.commit()
+
+    # Los contadores desnormalizados se calculan al final, en bloque
+    reconcile_counters()
+    return {'users': user_ids, 'questions': question_ids}
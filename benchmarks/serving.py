@@ -0,0 +1,198 @@
+"""
+Benchmark de los modos de servicio. Siembra una base (SQLite temporal o
+DATABASE_URL), levanta la aplicación en cada modo como proceso aparte y la
+recorre con muchos clientes concurrentes, reportando en JSON latencia
+p50/p95/p99, throughput y errores por ruta y modo:
+
+    wsgi-sync     gunicorn, workers síncronos (una petición por proceso)
+    wsgi-threads  gunicorn con gunicorn.conf.py (prefork con hilos)
+    asgi          uvicorn asgi:application (JSON con el motor asíncrono)
+
+    python -m benchmarks.serving --workers 2 --clients 64 --output serving.json
+
+Los modos cuyo servidor no está instalado se reportan como omitidos.
+"""
+import argparse
+import importlib.util
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+
+from app import db
+from benchmarks.load import build_app, percentile
+from benchmarks.seed import seed
+
+MODES = ('wsgi-sync', 'wsgi-threads', 'asgi')
+
+# Módulo que debe estar instalado para cada modo
+SERVERS = {'wsgi-sync': 'gunicorn', 'wsgi-threads': 'gunicorn', 'asgi': 'uvicorn'}
+
+ROUTES = ('feed', 'question', 'home')
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def server_command(mode, port, workers, threads):
+    address = f'127.0.0.1:{port}'
+    if mode == 'wsgi-sync':
+        return [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--worker-class', 'sync',
+                '--workers', str(workers), '--bind', address, 'wsgi:app']
+    if mode == 'wsgi-threads':
+        return [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--threads', str(threads),
+                '--workers', str(workers), '--bind', address, 'wsgi:app']
+    if mode == 'asgi':
+        return [sys.executable, '-m', 'uvicorn', 'asgi:application', '--workers', str(workers),
+                '--host', '127.0.0.1', '--port', str(port), '--no-access-log']
+    raise ValueError(mode)
+
+
+def wait_until_ready(base_url, process, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("El servidor terminó al arrancar")
+        try:
+            requests.get(f'{base_url}/login', timeout=5)
+            return
+        except requests.RequestException:
+            time.sleep(0.2)
+    raise RuntimeError("El servidor no respondió a tiempo")
+
+
+def session_cookie(app, user_id):
+    """
+    Firma una cookie de sesión de Flask para `user_id`, para no pasar por el
+    login (y por bcrypt) en cada cliente.
+    """
+    serializer = app.session_interface.get_signing_serializer(app)
+    return serializer.dumps({'_user_id': str(user_id), '_fresh': True})
+
+
+def run(base_url, cookies, question_ids, routes, clients, requests_per_client):
+    latencies = {route: [] for route in routes}
+    errors = {route: 0 for route in routes}
+    lock = threading.Lock()
+
+    def client(index):
+        rng = random.Random(index)
+        http = requests.Session()
+        http.cookies.set('session', rng.choice(cookies))
+        local = {route: [] for route in routes}
+        local_errors = {route: 0 for route in routes}
+        for _ in range(requests_per_client):
+            route = rng.choice(routes)
+            path = {'feed': '/api/feed',
+                    'question': f'/api/questions/{rng.choice(question_ids)}',
+                    'home': '/'}[route]
+            start = time.perf_counter()
+            try:
+                response = http.get(base_url + path, allow_redirects=False, timeout=30)
+                failed = response.status_code >= 300
+            except requests.RequestException:
+                failed = True
+            local[route].append(time.perf_counter() - start)
+            local_errors[route] += failed
+        with lock:
+            for route in routes:
+                latencies[route].extend(local[route])
+                errors[route] += local_errors[route]
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    report = {}
+    for route in routes:
+        values = latencies[route]
+        report[route] = {
+            'requests': len(values),
+            'errors': errors[route],
+            'p50_ms': round(percentile(values, 0.50) * 1000, 2) if values else None,
+            'p95_ms': round(percentile(values, 0.95) * 1000, 2) if values else None,
+            'p99_ms': round(percentile(values, 0.99) * 1000, 2) if values else None,
+        }
+    total = sum(len(values) for values in latencies.values())
+    return {'throughput_rps': round(total / elapsed, 1), 'routes': report}
+
+
+def benchmark_mode(mode, args, env, cookies, question_ids, routes):
+    if importlib.util.find_spec(SERVERS[mode]) is None:
+        return {'skipped': f"{SERVERS[mode]} no está instalado"}
+    base_url = f'http://127.0.0.1:{args.port}'
+    process = subprocess.Popen(server_command(mode, args.port, args.workers, args.threads),
+                               cwd=ROOT, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_until_ready(base_url, process)
+        # Una pasada corta para que cada worker abra sus conexiones
+        run(base_url, cookies, question_ids, routes, args.workers * 2, 5)
+        return run(base_url, cookies, question_ids, routes, args.clients, args.requests)
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--questions', type=int, default=1000)
+    parser.add_argument('--answers', type=int, default=3000)
+    parser.add_argument('--votes', type=int, default=5000)
+    parser.add_argument('--modes', default=','.join(MODES))
+    parser.add_argument('--routes', default='feed,question')
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--threads', type=int, default=4, help='hilos por worker (wsgi-threads)')
+    parser.add_argument('--clients', type=int, default=64, help='clientes concurrentes')
+    parser.add_argument('--requests', type=int, default=50, help='peticiones por cliente')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--output', help='archivo donde guardar el resultado JSON')
+    args = parser.parse_args()
+
+    modes = [mode for mode in args.modes.split(',') if mode]
+    routes = [route for route in args.routes.split(',') if route]
+    for name, values, valid in (('modos', modes, MODES), ('rutas', routes, ROUTES)):
+        unknown = set(values) - set(valid)
+        if unknown:
+            parser.error(f"{name} desconocidos: {', '.join(sorted(unknown))}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = os.environ.get('DATABASE_URL') or f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        app = build_app(database_url, hash_rounds=4)
+        with app.app_context():
+            db.create_all()
+            ids = seed(args.users, args.questions, args.answers, args.votes)
+        cookies = [session_cookie(app, user_id) for user_id in ids['users'][:50]]
+
+        env = dict(os.environ, DATABASE_URL=database_url, SECRET_KEY=app.config['SECRET_KEY'],
+                   RATELIMIT_ENABLED='0', METRICS_SLOW_REQUEST_MS=str(10 ** 9),
+                   WEB_THREADS=str(args.threads))
+        result = {'modes': {}}
+        for mode in modes:
+            result['modes'][mode] = benchmark_mode(mode, args, env, cookies, ids['questions'], routes)
+        result['config'] = {key: getattr(args, key) for key in
+                            ('questions', 'workers', 'threads', 'clients', 'requests')}
+
+    output = json.dumps(result, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark del arranque de la aplicación. Lanza varios procesos nuevos que
+importan el paquete y llaman a create_app(), y reporta en JSON la mediana y
+el máximo de cada medida (tiempo de imports, create_app en frío y con todo
+ya importado, total y memoria máxima).
+
+    python -m benchmarks.startup --runs 10 --output arranque.json
+    python -m benchmarks.startup --baseline arranque.json --tolerance 0.2
+
+Con --baseline el proceso termina con código 1 si la mediana del tiempo
+total, de create_app o de la memoria empeora más que la tolerancia.
+"""
+import argparse
+import json
+import statistics
+import sys
+
+from app.startup import measure_startup
+
+METRICS = ('import_ms', 'create_app_ms', 'warm_create_app_ms', 'total_ms', 'max_rss_kb')
+
+# Medidas que se comparan contra la referencia
+CHECKED = ('total_ms', 'create_app_ms', 'max_rss_kb')
+
+
+def run(runs):
+    samples = [measure_startup() for _ in range(runs)]
+    report = {}
+    for metric in METRICS:
+        values = [sample[metric] for sample in samples]
+        report[metric] = {'median': round(statistics.median(values), 2),
+                          'max': round(max(values), 2)}
+    report['modules'] = samples[-1]['modules']
+    return report
+
+
+def compare(result, baseline, tolerance):
+    """
+    Devuelve la lista de regresiones respecto a la referencia.
+    """
+    regressions = []
+    for metric in CHECKED:
+        old = baseline.get(metric, {}).get('median')
+        new = result[metric]['median']
+        if old is None:
+            continue
+        # Margen absoluto pequeño para que el ruido no falle medidas muy cortas
+        if new > old * (1 + tolerance) + (5 if metric.endswith('_ms') else 0):
+            regressions.append(f"{metric}: {old} -> {new}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--output', help='archivo donde guardar el resultado JSON')
+    parser.add_argument('--baseline', help='resultado JSON de referencia para comparar')
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    args = parser.parse_args()
+
+    result = run(args.runs)
+    result['config'] = {'runs': args.runs}
+
+    output = json.dumps(result, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(result, json.load(f), args.tolerance)
+        if regressions:
+            print("Regresiones respecto a la referencia:", file=sys.stderr)
+            for line in regressions:
+                print(f"  {line}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
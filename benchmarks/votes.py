@@ -0,0 +1,105 @@
+"""
+Prueba de carga concurrente de votos sobre una misma pregunta "caliente".
+Varios hilos votan a la vez (incluyendo votos repetidos y cambios de signo)
+y al final se verifica que questions.total_votes coincida con la suma de
+votes.value, es decir, que no hubo votos contados dos veces ni perdidos.
+
+    python -m benchmarks.votes --threads 16 --votes 2000
+    DATABASE_URL=postgresql://... python -m benchmarks.votes
+
+Sin DATABASE_URL se usa un archivo SQLite temporal.
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+
+from config import Config
+from app import create_app, db
+from app.models import User, Question, Vote
+from app.votes import UPVOTE, DOWNVOTE, vote_question
+
+
+def build_app(database_url):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = database_url
+        # SQLite serializa las escrituras; se espera el lock en vez de fallar
+        SQLALCHEMY_ENGINE_OPTIONS = (
+            {'connect_args': {'timeout': 30}} if database_url.startswith('sqlite') else {})
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def seed(users):
+    author = User(username='autor', email='autor@example.com', password='x', role='standard')
+    db.session.add(author)
+    db.session.flush()
+    question = Question(title='Pregunta caliente', content='x' * 30, user_id=author.id)
+    db.session.add(question)
+    db.session.add_all(User(username=f'votante{i}', email=f'votante{i}@example.com',
+                            password='x', role='standard') for i in range(users))
+    db.session.commit()
+    user_ids = [row.id for row in db.session.query(User.id).filter(User.id != author.id)]
+    return question.id, user_ids
+
+
+def worker(app, question_id, user_ids, total, errors, seed_value):
+    rng = random.Random(seed_value)
+    with app.app_context():
+        for _ in range(total):
+            try:
+                vote_question(rng.choice(user_ids), question_id, rng.choice((UPVOTE, DOWNVOTE)))
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                errors.append(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--votes', type=int, default=2000, help='votos totales')
+    parser.add_argument('--users', type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = os.environ.get('DATABASE_URL') or f"sqlite:///{os.path.join(tmp, 'votes.db')}"
+        app = build_app(database_url)
+        with app.app_context():
+            question_id, user_ids = seed(args.users)
+
+        errors = []
+        per_thread = args.votes // args.threads
+        threads = [threading.Thread(target=worker,
+                                    args=(app, question_id, user_ids, per_thread, errors, i))
+                   for i in range(args.threads)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        with app.app_context():
+            counter = db.session.query(Question.total_votes).filter_by(id=question_id).scalar()
+            actual = db.session.query(db.func.coalesce(db.func.sum(Vote.value), 0)) \
+                .filter(Vote.question_id == question_id, Vote.answer_id.is_(None)).scalar()
+            rows = Vote.query.filter_by(question_id=question_id).count()
+
+        print({
+            'votes_per_second': round(per_thread * args.threads / elapsed, 1),
+            'errors': len(errors),
+            'vote_rows': rows,
+            'total_votes': counter,
+            'sum_of_votes': actual,
+            'consistent': counter == actual and rows <= len(user_ids),
+        })
+
+
+if __name__ == '__main__':
+    main()
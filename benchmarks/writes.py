@@ -0,0 +1,145 @@
+"""
+Benchmark de escrituras concurrentes: varios hilos publican respuestas a la
+vez, primero con un commit por petición y después con commits agrupados
+(GROUP_COMMIT_ENABLED, ver app/writer.py). Reporta en JSON, por modo,
+inserciones por segundo, latencia p50/p95/p99 de cada escritura, errores y
+el tamaño medio de los lotes.
+
+    python -m benchmarks.writes --threads 32 --answers 5000 --output escrituras.json
+    DATABASE_URL=postgresql://... python -m benchmarks.writes --window-ms 2
+
+Sin DATABASE_URL se usa un archivo SQLite temporal. Al final se verifica
+que el contador de respuestas coincida con las filas insertadas.
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+
+from config import Config
+from app import create_app, db, group_commit
+from app.models import User, Question, Answer
+from app.posts import create_answer
+from benchmarks.load import percentile
+
+MODES = ('per-request', 'group')
+
+
+def build_app(database_url, grouped, window_ms, max_batch):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = database_url
+        # SQLite serializa las escrituras; se espera el lock en vez de fallar
+        SQLALCHEMY_ENGINE_OPTIONS = (
+            {'connect_args': {'timeout': 30}} if database_url.startswith('sqlite') else {})
+        GROUP_COMMIT_ENABLED = grouped
+        GROUP_COMMIT_WINDOW_MS = window_ms
+        GROUP_COMMIT_MAX_BATCH = max_batch
+        # Los trabajos de indexación no deben competir con las escrituras
+        JOBS_WORKERS = 0
+
+    return create_app(BenchConfig)
+
+
+def seed(users, questions):
+    authors = [User(username=f'escritor{i}', email=f'escritor{i}@example.com',
+                    password='x', role='standard') for i in range(users)]
+    db.session.add_all(authors)
+    db.session.flush()
+    db.session.add_all(Question(title=f'Pregunta {i}', content='x' * 30,
+                                user_id=authors[i % users].id) for i in range(questions))
+    db.session.commit()
+    return ([row.id for row in db.session.query(User.id)],
+            [row.id for row in db.session.query(Question.id)])
+
+
+def worker(app, user_ids, question_ids, total, latencies, errors, seed_value):
+    rng = random.Random(seed_value)
+    local = []
+    # Un contexto de petición por escritura, como en una ruta
+    for index in range(total):
+        with app.test_request_context():
+            start = time.perf_counter()
+            try:
+                group_commit.run(create_answer, rng.choice(user_ids), rng.choice(question_ids),
+                                 f'Respuesta de prueba {seed_value}-{index}')
+            except Exception:
+                errors.append(1)
+            local.append(time.perf_counter() - start)
+            db.session.remove()
+    latencies.extend(local)
+
+
+def run(app, args, user_ids, question_ids):
+    latencies, errors = [], []
+    per_thread = args.answers // args.threads
+    threads = [threading.Thread(target=worker, args=(app, user_ids, question_ids, per_thread,
+                                                     latencies, errors, i))
+               for i in range(args.threads)]
+    batches, writes = group_commit.batches, group_commit.writes
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    batches, writes = group_commit.batches - batches, group_commit.writes - writes
+
+    return {
+        'inserts_per_second': round(len(latencies) / elapsed, 1),
+        'errors': len(errors),
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+        'mean_batch': round(writes / batches, 1) if batches else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, default=32)
+    parser.add_argument('--answers', type=int, default=5000, help='respuestas por modo')
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--questions', type=int, default=50)
+    parser.add_argument('--window-ms', type=float, default=5)
+    parser.add_argument('--max-batch', type=int, default=100)
+    parser.add_argument('--modes', default=','.join(MODES))
+    parser.add_argument('--output', help='archivo donde guardar el resultado JSON')
+    args = parser.parse_args()
+
+    modes = [mode for mode in args.modes.split(',') if mode]
+    unknown = set(modes) - set(MODES)
+    if unknown:
+        parser.error(f"modos desconocidos: {', '.join(sorted(unknown))}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = os.environ.get('DATABASE_URL') or f"sqlite:///{os.path.join(tmp, 'writes.db')}"
+        result = {'modes': {}}
+        seeded = None
+        for mode in modes:
+            app = build_app(database_url, mode == 'group', args.window_ms, args.max_batch)
+            with app.app_context():
+                if seeded is None:
+                    db.create_all()
+                    seeded = seed(args.users, args.questions)
+            result['modes'][mode] = run(app, args, *seeded)
+
+        with app.app_context():
+            rows = db.session.query(db.func.count(Answer.id)).scalar()
+            counter = db.session.query(db.func.sum(Question.total_answers)).scalar()
+        result['consistent'] = rows == counter
+        result['config'] = {key: getattr(args, key) for key in
+                            ('threads', 'answers', 'window_ms', 'max_batch')}
+
+    output = json.dumps(result, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+
+
+if __name__ == '__main__':
+    main()
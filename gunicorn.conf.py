@@ -0,0 +1,37 @@
+"""
+Configuración de gunicorn para producción (prefork con hilos):
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Cada worker es un proceso con su propio pool de conexiones, así que la base
+de datos ve hasta workers * (DATABASE_POOL_SIZE + DATABASE_MAX_OVERFLOW)
+conexiones. Conviene que `threads` no supere DATABASE_POOL_SIZE para que los
+hilos no esperen por una conexión libre.
+"""
+import multiprocessing
+import os
+
+bind = os.environ.get('BIND') or f"0.0.0.0:{os.environ.get('PORT') or 8000}"
+
+# Procesos: uno por núcleo más uno, salvo que se indique WEB_CONCURRENCY
+workers = int(os.environ.get('WEB_CONCURRENCY') or multiprocessing.cpu_count() + 1)
+
+# Hilos por proceso: las peticiones que esperan a la base de datos o a un
+# cliente lento no bloquean al resto del worker
+worker_class = 'gthread'
+threads = int(os.environ.get('WEB_THREADS') or 4)
+
+timeout = int(os.environ.get('WEB_TIMEOUT') or 30)
+graceful_timeout = 30
+keepalive = 5
+
+# Reciclar los workers de vez en cuando acota cualquier fuga de memoria
+max_requests = int(os.environ.get('WEB_MAX_REQUESTS') or 2000)
+max_requests_jitter = max_requests // 10
+
+# La aplicación se crea en cada worker (no antes del fork), así que ningún
+# proceso hereda conexiones ni hilos de otro
+preload_app = False
+
+accesslog = os.environ.get('WEB_ACCESS_LOG')
+errorlog = '-'
@@ -0,0 +1,33 @@
+"""Questions feed keyset index
+
+Revision ID: 3c1f5a2b7d40
+Revises: 9409b011aeda
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c1f5a2b7d40'
+down_revision = '9409b011aeda'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # La paginación por cursor necesita que created_at nunca sea NULL
+    op.execute("UPDATE questions SET created_at = CURRENT_TIMESTAMP WHERE created_at IS NULL")
+    op.alter_column('questions', 'created_at',
+               existing_type=sa.DateTime(),
+               nullable=False)
+    op.create_index('ix_questions_created_at_id', 'questions',
+                    ['created_at', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_questions_created_at_id', table_name='questions')
+    op.alter_column('questions', 'created_at',
+               existing_type=sa.DateTime(),
+               nullable=True)
@@ -0,0 +1,30 @@
+"""Answer thread indexes
+
+Revision ID: 5e8b1d3f7a29
+Revises: c2e5a7b9d046
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e8b1d3f7a29'
+down_revision = 'c2e5a7b9d046'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Respuestas de una pregunta paginadas por fecha y por votos. El primer
+    # índice cubre también las búsquedas por question_id, que no tenían índice
+    op.create_index('ix_answers_question_id_created_at_id', 'answers',
+                    ['question_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_answers_question_id_total_votes_id', 'answers',
+                    ['question_id', 'total_votes', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_answers_question_id_total_votes_id', table_name='answers')
+    op.drop_index('ix_answers_question_id_created_at_id', table_name='answers')
@@ -0,0 +1,44 @@
+"""Question counters not null
+
+Revision ID: 7a2d9e4c1b85
+Revises: 3c1f5a2b7d40
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7a2d9e4c1b85'
+down_revision = '3c1f5a2b7d40'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Rellena los contadores a partir de los datos existentes
+    op.execute("""
+        UPDATE questions SET
+            total_answers = (SELECT count(*) FROM answers WHERE answers.question_id = questions.id),
+            total_votes = (SELECT count(*) FROM votes WHERE votes.question_id = questions.id)
+    """)
+    op.alter_column('questions', 'total_answers',
+               existing_type=sa.Integer(),
+               nullable=False,
+               server_default='0')
+    op.alter_column('questions', 'total_votes',
+               existing_type=sa.Integer(),
+               nullable=False,
+               server_default='0')
+
+
+def downgrade():
+    op.alter_column('questions', 'total_votes',
+               existing_type=sa.Integer(),
+               nullable=True,
+               server_default=None)
+    op.alter_column('questions', 'total_answers',
+               existing_type=sa.Integer(),
+               nullable=True,
+               server_default=None)
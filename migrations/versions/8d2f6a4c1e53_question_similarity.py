@@ -0,0 +1,42 @@
+"""Question similarity signatures and LSH buckets
+
+Revision ID: 8d2f6a4c1e53
+Revises: 5e8b1d3f7a29
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d2f6a4c1e53'
+down_revision = '5e8b1d3f7a29'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('question_signatures',
+    sa.Column('question_id', sa.Integer(), nullable=False),
+    sa.Column('signature', sa.LargeBinary(), nullable=False),
+    sa.ForeignKeyConstraint(['question_id'], ['questions.id'], ),
+    sa.PrimaryKeyConstraint('question_id')
+    )
+    op.create_table('question_lsh_buckets',
+    sa.Column('band', sa.SmallInteger(), autoincrement=False, nullable=False),
+    sa.Column('bucket', sa.BigInteger(), autoincrement=False, nullable=False),
+    sa.Column('question_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['question_id'], ['questions.id'], ),
+    sa.PrimaryKeyConstraint('band', 'bucket', 'question_id')
+    )
+    op.create_index('ix_question_lsh_buckets_question_id', 'question_lsh_buckets',
+                    ['question_id'], unique=False)
+    # Las firmas de las preguntas existentes se calculan con
+    # `flask reindex-similarity`
+
+
+def downgrade():
+    op.drop_index('ix_question_lsh_buckets_question_id', table_name='question_lsh_buckets')
+    op.drop_table('question_lsh_buckets')
+    op.drop_table('question_signatures')
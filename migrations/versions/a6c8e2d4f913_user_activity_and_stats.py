@@ -0,0 +1,69 @@
+"""User activity indexes and profile stats
+
+Revision ID: a6c8e2d4f913
+Revises: f4b9d1e6a372
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a6c8e2d4f913'
+down_revision = 'f4b9d1e6a372'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # La paginación por cursor necesita created_at en todas las filas: las
+    # respuestas y votos antiguos sin fecha toman la de su pregunta
+    op.execute("""
+        UPDATE answers SET created_at = (
+            SELECT questions.created_at FROM questions WHERE questions.id = answers.question_id)
+        WHERE created_at IS NULL
+    """)
+    op.execute("""
+        UPDATE votes SET created_at = (
+            SELECT questions.created_at FROM questions WHERE questions.id = votes.question_id)
+        WHERE created_at IS NULL
+    """)
+    op.alter_column('answers', 'created_at', existing_type=sa.DateTime(), nullable=False)
+    op.alter_column('votes', 'created_at', existing_type=sa.DateTime(), nullable=False)
+
+    op.create_index('ix_questions_user_id_created_at_id', 'questions',
+                    ['user_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_answers_author_id_created_at_id', 'answers',
+                    ['author_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_votes_user_id_created_at_id', 'votes',
+                    ['user_id', 'created_at', 'id'], unique=False)
+
+    op.add_column('users', sa.Column('question_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('users', sa.Column('answer_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('users', sa.Column('reputation', sa.Integer(), server_default='0', nullable=False))
+
+    # Rellena las estadísticas; los pesos coinciden con app/counters.py
+    op.execute("""
+        UPDATE users SET
+            question_count = (SELECT count(*) FROM questions WHERE questions.user_id = users.id),
+            answer_count = (SELECT count(*) FROM answers WHERE answers.author_id = users.id),
+            reputation =
+                5 * (SELECT coalesce(sum(votes.value), 0) FROM votes
+                     JOIN questions ON questions.id = votes.question_id
+                     WHERE votes.answer_id IS NULL AND questions.user_id = users.id)
+                + 10 * (SELECT coalesce(sum(votes.value), 0) FROM votes
+                        JOIN answers ON answers.id = votes.answer_id
+                        WHERE answers.author_id = users.id)
+    """)
+
+
+def downgrade():
+    op.drop_column('users', 'reputation')
+    op.drop_column('users', 'answer_count')
+    op.drop_column('users', 'question_count')
+    op.drop_index('ix_votes_user_id_created_at_id', table_name='votes')
+    op.drop_index('ix_answers_author_id_created_at_id', table_name='answers')
+    op.drop_index('ix_questions_user_id_created_at_id', table_name='questions')
+    op.alter_column('votes', 'created_at', existing_type=sa.DateTime(), nullable=True)
+    op.alter_column('answers', 'created_at', existing_type=sa.DateTime(), nullable=True)
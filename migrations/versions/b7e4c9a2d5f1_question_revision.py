@@ -0,0 +1,27 @@
+"""Question revision counter
+
+Revision ID: b7e4c9a2d5f1
+Revises: 8d2f6a4c1e53
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e4c9a2d5f1'
+down_revision = '8d2f6a4c1e53'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Versión de lo que muestra la página de la pregunta; las claves de la
+    # caché de fragmentos y los ETag se calculan a partir de ella
+    op.add_column('questions', sa.Column('revision', sa.Integer(), nullable=False,
+                                         server_default='0'))
+
+
+def downgrade():
+    op.drop_column('questions', 'revision')
@@ -0,0 +1,37 @@
+"""Full text search indexes
+
+Revision ID: b84e0f6d2a13
+Revises: 7a2d9e4c1b85
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'b84e0f6d2a13'
+down_revision = '7a2d9e4c1b85'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Índices GIN de texto completo; las expresiones deben coincidir con las
+    # consultas de app/search.py. Solo aplican en PostgreSQL.
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute("""
+        CREATE INDEX ix_questions_search ON questions
+        USING gin (to_tsvector('spanish'::regconfig, title || ' ' || content))
+    """)
+    op.execute("""
+        CREATE INDEX ix_answers_search ON answers
+        USING gin (to_tsvector('spanish'::regconfig, content))
+    """)
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute("DROP INDEX IF EXISTS ix_answers_search")
+    op.execute("DROP INDEX IF EXISTS ix_questions_search")
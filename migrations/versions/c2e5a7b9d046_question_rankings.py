@@ -0,0 +1,54 @@
+"""Question rankings for ranked feeds
+
+Revision ID: c2e5a7b9d046
+Revises: a6c8e2d4f913
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c2e5a7b9d046'
+down_revision = 'a6c8e2d4f913'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('question_rankings',
+    sa.Column('question_id', sa.Integer(), nullable=False),
+    sa.Column('hot_score', sa.Float(), server_default='0', nullable=False),
+    sa.Column('last_activity_at', sa.DateTime(), nullable=False),
+    sa.Column('refreshed_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['question_id'], ['questions.id'], ),
+    sa.PrimaryKeyConstraint('question_id')
+    )
+    op.create_index('ix_question_rankings_hot', 'question_rankings',
+                    ['hot_score', 'question_id'], unique=False)
+    op.create_index('ix_question_rankings_activity', 'question_rankings',
+                    ['last_activity_at', 'question_id'], unique=False)
+    op.create_index('ix_questions_total_votes_id', 'questions', ['total_votes', 'id'], unique=False)
+    op.create_index('ix_questions_unanswered', 'questions', ['created_at', 'id'], unique=False,
+                    postgresql_where=sa.text('total_answers = 0'),
+                    sqlite_where=sa.text('total_answers = 0'))
+
+    # Una fila por pregunta; el puntaje se calcula después con
+    # `flask refresh-rankings`
+    op.execute("""
+        INSERT INTO question_rankings (question_id, hot_score, last_activity_at, refreshed_at)
+        SELECT id, 0,
+               coalesce((SELECT max(answers.created_at) FROM answers
+                         WHERE answers.question_id = questions.id), created_at),
+               CURRENT_TIMESTAMP
+        FROM questions
+    """)
+
+
+def downgrade():
+    op.drop_index('ix_questions_unanswered', table_name='questions')
+    op.drop_index('ix_questions_total_votes_id', table_name='questions')
+    op.drop_index('ix_question_rankings_activity', table_name='question_rankings')
+    op.drop_index('ix_question_rankings_hot', table_name='question_rankings')
+    op.drop_table('question_rankings')
@@ -0,0 +1,30 @@
+"""Question title signatures
+
+Revision ID: c3f8a1d6e924
+Revises: b7e4c9a2d5f1
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3f8a1d6e924'
+down_revision = 'b7e4c9a2d5f1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('question_signatures',
+                  sa.Column('title_signature', sa.LargeBinary(), nullable=True))
+    # Las firmas y bandas de los títulos existentes se calculan con
+    # `flask reindex-similarity`
+
+
+def downgrade():
+    # Las bandas del título (band >= 20, ver app/similarity.py) quedan
+    # huérfanas sin la columna
+    op.execute("DELETE FROM question_lsh_buckets WHERE band >= 20")
+    op.drop_column('question_signatures', 'title_signature')
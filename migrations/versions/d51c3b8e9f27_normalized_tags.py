@@ -0,0 +1,78 @@
+"""Normalized tags
+
+Revision ID: d51c3b8e9f27
+Revises: b84e0f6d2a13
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'd51c3b8e9f27'
+down_revision = 'b84e0f6d2a13'
+branch_labels = None
+depends_on = None
+
+# Misma normalización que app/tags.py:normalize_tag
+NORMALIZED = "left(lower(regexp_replace(trim(t), '\\s+', '-', 'g')), 100)"
+
+
+def upgrade():
+    op.create_table('tags',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('question_count', sa.Integer(), server_default='0', nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+    op.create_table('question_tags',
+    sa.Column('question_id', sa.Integer(), nullable=False),
+    sa.Column('tag_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['question_id'], ['questions.id'], ),
+    sa.ForeignKeyConstraint(['tag_id'], ['tags.id'], ),
+    sa.PrimaryKeyConstraint('question_id', 'tag_id')
+    )
+    op.create_index('ix_question_tags_tag_id_question_id', 'question_tags',
+                    ['tag_id', 'question_id'], unique=False)
+
+    if op.get_bind().dialect.name == 'postgresql':
+        # Índice para búsquedas LIKE 'prefijo%' independiente de la collation
+        op.execute("CREATE INDEX ix_tags_name_prefix ON tags (name varchar_pattern_ops)")
+
+        # Copia las etiquetas del arreglo questions.tags a las tablas nuevas
+        op.execute(f"""
+            INSERT INTO tags (name)
+            SELECT DISTINCT {NORMALIZED}
+            FROM questions, unnest(questions.tags) AS t
+            WHERE trim(t) <> ''
+        """)
+        op.execute(f"""
+            INSERT INTO question_tags (question_id, tag_id)
+            SELECT DISTINCT questions.id, tags.id
+            FROM questions, unnest(questions.tags) AS t
+            JOIN tags ON tags.name = {NORMALIZED}
+        """)
+        op.execute("""
+            UPDATE tags SET question_count = (
+                SELECT count(*) FROM question_tags WHERE question_tags.tag_id = tags.id)
+        """)
+
+    op.drop_column('questions', 'tags')
+
+
+def downgrade():
+    op.add_column('questions', sa.Column('tags', postgresql.ARRAY(sa.VARCHAR()), autoincrement=False, nullable=True))
+    op.execute("""
+        UPDATE questions SET tags = ARRAY(
+            SELECT tags.name FROM question_tags
+            JOIN tags ON tags.id = question_tags.tag_id
+            WHERE question_tags.question_id = questions.id
+            ORDER BY tags.name)
+    """)
+    op.execute("DROP INDEX IF EXISTS ix_tags_name_prefix")
+    op.drop_index('ix_question_tags_tag_id_question_id', table_name='question_tags')
+    op.drop_table('question_tags')
+    op.drop_table('tags')
@@ -0,0 +1,37 @@
+"""Import progress and id maps
+
+Revision ID: d9a2e6b4f718
+Revises: c3f8a1d6e924
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd9a2e6b4f718'
+down_revision = 'c3f8a1d6e924'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('import_progress',
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('kind', sa.String(length=20), nullable=False),
+    sa.Column('imported', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('name', 'kind')
+    )
+    op.create_table('import_id_maps',
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('kind', sa.String(length=20), nullable=False),
+    sa.Column('source_id', sa.String(length=100), nullable=False),
+    sa.Column('new_id', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('name', 'kind', 'source_id')
+    )
+
+
+def downgrade():
+    op.drop_table('import_id_maps')
+    op.drop_table('import_progress')
@@ -0,0 +1,54 @@
+"""Vote types and unique vote targets
+
+Revision ID: e3a7c2f5d168
+Revises: d51c3b8e9f27
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e3a7c2f5d168'
+down_revision = 'd51c3b8e9f27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('votes', sa.Column('answer_id', sa.Integer(), nullable=True))
+    op.add_column('votes', sa.Column('value', sa.SmallInteger(), server_default='1', nullable=False))
+    op.add_column('votes', sa.Column('created_at', sa.DateTime(), nullable=True))
+    op.create_foreign_key('votes_answer_id_fkey', 'votes', 'answers', ['answer_id'], ['id'])
+    op.create_check_constraint('ck_votes_value', 'votes', 'value IN (-1, 1)')
+    op.add_column('answers', sa.Column('total_votes', sa.Integer(), server_default='0', nullable=False))
+
+    # Todos los votos existentes son a preguntas; se deja uno por usuario
+    op.execute("""
+        DELETE FROM votes WHERE id NOT IN (
+            SELECT min(id) FROM votes GROUP BY user_id, question_id)
+    """)
+    op.create_index('uq_votes_user_question', 'votes', ['user_id', 'question_id'], unique=True,
+                    postgresql_where=sa.text('answer_id IS NULL'),
+                    sqlite_where=sa.text('answer_id IS NULL'))
+    op.create_index('uq_votes_user_answer', 'votes', ['user_id', 'answer_id'], unique=True,
+                    postgresql_where=sa.text('answer_id IS NOT NULL'),
+                    sqlite_where=sa.text('answer_id IS NOT NULL'))
+
+    op.execute("""
+        UPDATE questions SET total_votes = (
+            SELECT coalesce(sum(value), 0) FROM votes
+            WHERE votes.question_id = questions.id AND votes.answer_id IS NULL)
+    """)
+
+
+def downgrade():
+    op.drop_index('uq_votes_user_answer', table_name='votes')
+    op.drop_index('uq_votes_user_question', table_name='votes')
+    op.drop_column('answers', 'total_votes')
+    op.drop_constraint('ck_votes_value', 'votes', type_='check')
+    op.drop_constraint('votes_answer_id_fkey', 'votes', type_='foreignkey')
+    op.drop_column('votes', 'created_at')
+    op.drop_column('votes', 'value')
+    op.drop_column('votes', 'answer_id')
@@ -1,19 +1,19 @@
-from app import create_app
-from dotenv import load_dotenv
+"""
+Servidor de desarrollo: `python run.py`. Los comandos de `flask` y los
+servidores de producción (wsgi.py, asgi.py) crean la aplicación por su
+cuenta, así que importar este módulo no hace nada.
+"""
 import os
 
-# Cargar las variables de entorno desde .env
-load_dotenv()
 
-# Configurar la aplicación para usar el entorno de desarrollo o producción
-env = os.getenv('FLASK_ENV', 'development')
+if __name__ == '__main__':
+    from dotenv import load_dotenv
+    from app import create_app
 
-if env == 'development':
-    app = create_app()
-    app.config['DEBUG'] = True
-else:
-    app = create_app()
-    app.config['DEBUG'] = False
+    # Cargar las variables de entorno desde .env
+    load_dotenv()
 
-if __name__ == '__main__':
+    # Configurar la aplicación para usar el entorno de desarrollo o producción
+    app = create_app()
+    app.config['DEBUG'] = os.getenv('FLASK_ENV', 'development') == 'development'
     app.run()
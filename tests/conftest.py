@@ -0,0 +1,78 @@
+import pytest
+
+from config import Config
+from app import create_app, db
+from app.models import User, Question, Answer
+from app.tags import attach_tags
+
+
+def make_config(tmp_path, **overrides):
+    """
+    Configuración de pruebas: una base SQLite en un archivo temporal, sin
+    CSRF, sin límite de peticiones y con los trabajos en segundo plano
+    ejecutados a mano (jobs.run_pending()).
+    """
+    options = {
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'test.db'}",
+        'TESTING': True,
+        'WTF_CSRF_ENABLED': False,
+        'RATELIMIT_ENABLED': False,
+        'JOBS_WORKERS': 0,
+        'PASSWORD_HASH_WORKERS': 0,
+        'PASSWORD_HASH_ROUNDS': 4,
+    }
+    options.update(overrides)
+    return type('TestConfig', (Config,), options)
+
+
+@pytest.fixture
+def make_app(tmp_path):
+    def factory(**overrides):
+        app = create_app(make_config(tmp_path, **overrides))
+        with app.app_context():
+            # Solo la principal: las réplicas son binds sin tablas propias
+            db.create_all(bind=None)
+        return app
+    return factory
+
+
+@pytest.fixture
+def app(make_app):
+    return make_app()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def login(client, user_id):
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user_id)
+        session['_fresh'] = True
+
+
+def seed(app, questions=15, answers_per_question=3):
+    """
+    Dos usuarios, `questions` preguntas con la etiqueta 'python' y
+    `answers_per_question` respuestas en cada una. Devuelve los ids
+    (usuarios, preguntas).
+    """
+    with app.app_context():
+        users = [User(username=f'user{i}', email=f'user{i}@example.com',
+                      password='x', role='standard') for i in range(2)]
+        db.session.add_all(users)
+        db.session.flush()
+        question_ids = []
+        for i in range(questions):
+            question = Question(title=f'Pregunta {i}', content='x' * 30, user_id=users[0].id,
+                                total_answers=answers_per_question)
+            db.session.add(question)
+            attach_tags(question, ['python'])
+            db.session.flush()
+            db.session.add_all(Answer(content=f'Respuesta {i}-{j} ' + 'y' * 20,
+                                      question_id=question.id, author_id=users[1].id)
+                               for j in range(answers_per_question))
+            question_ids.append(question.id)
+        db.session.commit()
+        return [user.id for user in users], question_ids
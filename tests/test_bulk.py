@@ -0,0 +1,102 @@
+import json
+
+import pytest
+
+from app import db
+from app.bulk import Checkpoint, Importer
+from app.models import (User, Question, Answer, Tag, Vote, QuestionRanking,
+                        QuestionSignature)
+
+
+def _write(path, records):
+    path.write_text(''.join(json.dumps(record) + '\n' for record in records), encoding='utf-8')
+    return str(path)
+
+
+@pytest.fixture
+def dumps(tmp_path):
+    users = [{'id': 100 + i, 'username': f'importado{i}', 'email': f'importado{i}@example.com'}
+             for i in range(5)]
+    questions = [{'id': 500 + i, 'title': f'Pregunta importada {i}', 'content': 'x' * 30,
+                  'user_id': 100 + i % 5, 'tags': ['python', f'tema-{i % 3}']}
+                 for i in range(12)]
+    answers = [{'id': 900 + i, 'content': f'Respuesta importada {i}', 'question_id': 500 + i % 12,
+                'author_id': 100 + (i + 1) % 5} for i in range(20)]
+    return {'users': _write(tmp_path / 'users.jsonl', users),
+            'questions': _write(tmp_path / 'questions.jsonl', questions),
+            'answers': _write(tmp_path / 'answers.jsonl', answers)}
+
+
+def _import(dumps, name, batch_size=5):
+    importer = Importer(Checkpoint(name), batch_size=batch_size)
+    for kind in ('users', 'questions', 'answers'):
+        importer.run(kind, dumps[kind])
+
+
+def _counts():
+    return (User.query.count(), Question.query.count(), Answer.query.count())
+
+
+def test_import_translates_ids_and_attaches_tags(app, dumps):
+    with app.app_context():
+        _import(dumps, 'completa')
+
+        assert _counts() == (5, 12, 20)
+        assert Tag.query.filter_by(name='python').one().question_count == 12
+        answer = Answer.query.filter_by(content='Respuesta importada 13').one()
+        assert answer.question.title == 'Pregunta importada 1'
+        assert answer.author.username == 'importado4'
+
+
+def test_interrupted_import_resumes_without_duplicates(app, dumps, monkeypatch):
+    with app.app_context():
+        advance = Checkpoint.advance
+        calls = []
+
+        def crash_on_third_batch(self, kind, count, id_pairs):
+            calls.append(kind)
+            if len(calls) == 3:
+                raise RuntimeError("proceso interrumpido")
+            advance(self, kind, count, id_pairs)
+
+        monkeypatch.setattr(Checkpoint, 'advance', crash_on_third_batch)
+        with pytest.raises(RuntimeError):
+            _import(dumps, 'retomada')
+        db.session.rollback()
+        # Solo los lotes confirmados: los usuarios y el primer lote de preguntas
+        assert _counts() == (5, 5, 0)
+
+        monkeypatch.setattr(Checkpoint, 'advance', advance)
+        _import(dumps, 'retomada')
+
+        assert _counts() == (5, 12, 20)
+
+
+def test_import_skips_invalid_and_repeated_votes(app, dumps, tmp_path):
+    votes = _write(tmp_path / 'votes.jsonl', [
+        {'user_id': 101, 'question_id': 500, 'value': 1},
+        {'user_id': 102, 'question_id': 500},
+        {'user_id': 103, 'question_id': 500, 'value': 5},
+        {'user_id': 101, 'question_id': 500, 'value': -1},
+        {'user_id': 101, 'question_id': 500, 'answer_id': 900, 'value': -1},
+        {'user_id': 104, 'question_id': 500, 'value': 0},
+    ])
+    with app.app_context():
+        _import(dumps, 'votos')
+        importer = Importer(Checkpoint('votos'), batch_size=2)
+
+        # El voto repetido llega en el segundo lote, con el primero ya guardado
+        assert importer.run('votes', votes) == 2
+        assert importer.skipped['votes'] == 4
+        assert sorted(vote.value for vote in Vote.query) == [-1, 1]
+        assert Checkpoint('votos').offset('votes') == 6
+
+
+def test_import_command_ranks_and_signs_imported_questions(app, dumps):
+    result = app.test_cli_runner().invoke(args=[
+        'import-data', '--users', dumps['users'], '--questions', dumps['questions']])
+
+    assert result.exit_code == 0, result.output
+    with app.app_context():
+        assert QuestionRanking.query.count() == 12
+        assert QuestionSignature.query.count() == 12
@@ -0,0 +1,18 @@
+def test_metrics_rejects_anonymous_requests(client):
+    assert client.get('/metrics').status_code == 403
+
+
+def test_metrics_accepts_token(make_app):
+    client = make_app(METRICS_TOKEN='secreto').test_client()
+
+    assert client.get('/metrics', headers={'Authorization': 'Bearer otro'}).status_code == 403
+    response = client.get('/metrics', headers={'Authorization': 'Bearer secreto'})
+    assert response.status_code == 200
+    assert b'http_request_duration_seconds' in response.data
+
+
+def test_metrics_accepts_allowed_ip(make_app):
+    client = make_app(METRICS_ALLOWED_IPS=['10.0.0.5']).test_client()
+
+    assert client.get('/metrics').status_code == 403
+    assert client.get('/metrics', environ_base={'REMOTE_ADDR': '10.0.0.5'}).status_code == 200
@@ -0,0 +1,47 @@
+import pytest
+
+from app import db
+from app.queries import count_queries
+from conftest import login, seed
+
+# Consultas SQL permitidas por endpoint con la caché vacía (incluye cargar
+# el usuario de la sesión). Deben mantenerse aunque crezca el número de
+# preguntas, respuestas o etiquetas mostradas.
+BUDGETS = {
+    '/': 4,
+    # Incluye la comprobación de existencia previa a la caché
+    '/question/{question_id}': 5,
+    '/profile': 3,
+    '/tagged/python': 4,
+}
+
+
+def _count(app, client, url):
+    with app.app_context():
+        with count_queries(db.engine) as statements:
+            response = client.get(url)
+    assert response.status_code == 200
+    return len(statements)
+
+
+@pytest.mark.parametrize('path', BUDGETS)
+def test_query_budget(app, client, path):
+    user_ids, question_ids = seed(app)
+    login(client, user_ids[0])
+    url = path.format(question_id=question_ids[0])
+    assert _count(app, client, url) <= BUDGETS[path]
+
+
+@pytest.mark.parametrize('path', BUDGETS)
+def test_query_count_does_not_grow_with_data(make_app, path):
+    counts = []
+    for answers in (1, 8):
+        app = make_app()
+        with app.app_context():
+            db.drop_all()
+            db.create_all()
+        user_ids, question_ids = seed(app, questions=12, answers_per_question=answers)
+        client = app.test_client()
+        login(client, user_ids[0])
+        counts.append(_count(app, client, path.format(question_id=question_ids[0])))
+    assert counts[0] == counts[1]
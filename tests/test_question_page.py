@@ -0,0 +1,44 @@
+import pytest
+
+from conftest import login, seed
+
+
+@pytest.mark.parametrize('path', ['/question/{id}', '/question/{id}/answers', '/answer/{id}'])
+def test_missing_question_is_404(app, client, path):
+    user_ids, question_ids = seed(app, questions=1)
+    login(client, user_ids[0])
+
+    response = client.get(path.format(id=question_ids[-1] + 1))
+
+    assert response.status_code == 404
+
+
+def test_answers_fragment_of_existing_question(app, client):
+    user_ids, question_ids = seed(app, questions=1, answers_per_question=2)
+    login(client, user_ids[0])
+
+    response = client.get(f'/question/{question_ids[0]}/answers')
+
+    assert response.status_code == 200
+    assert 'Respuesta 0-1' in response.get_data(as_text=True)
+
+
+def test_vote_in_another_worker_changes_etag_and_fragments(make_app):
+    # Dos aplicaciones sobre la misma base, cada una con su caché LRU, como
+    # dos workers de gunicorn
+    reader, writer = make_app(), make_app()
+    user_ids, question_ids = seed(reader, questions=1)
+    url = f'/question/{question_ids[0]}'
+    reader_client, writer_client = reader.test_client(), writer.test_client()
+    login(reader_client, user_ids[1])
+    login(writer_client, user_ids[1])
+
+    first = reader_client.get(url)
+    assert '0 Votos' in first.get_data(as_text=True)
+    assert reader_client.get(url, headers={'If-None-Match': first.headers['ETag']}).status_code == 304
+
+    assert writer_client.post(f'{url}/vote', data={'value': 'up'}).status_code == 302
+
+    second = reader_client.get(url, headers={'If-None-Match': first.headers['ETag']})
+    assert second.status_code == 200
+    assert '1 Votos' in second.get_data(as_text=True)
@@ -0,0 +1,31 @@
+from app import db
+from app.models import Question
+from app.rankings import ranked_feed
+from app.routes import feed_query
+from conftest import login, seed
+
+
+def test_new_question_appears_in_ranked_feeds_without_jobs(app, client):
+    user_ids, _ = seed(app, questions=0)
+    login(client, user_ids[0])
+
+    response = client.post('/ask_question', data={
+        'titulo': 'Pregunta recién publicada',
+        'detalle': 'Contenido suficientemente largo para publicarse.',
+        'etiquetas': 'python',
+    })
+    assert response.status_code == 302
+
+    # Ningún trabajo se ejecuta: la fila de ranking se crea con la pregunta
+    for sort in ('hot', 'activity', 'unanswered'):
+        html = client.get(f'/?sort={sort}').get_data(as_text=True)
+        assert 'Pregunta recién publicada' in html
+
+
+def test_unanswered_feed_counts_only_unanswered_questions(app):
+    _, question_ids = seed(app, questions=3, answers_per_question=0)
+    with app.test_request_context():
+        db.session.get(Question, question_ids[0]).total_answers = 1
+        db.session.commit()
+
+        assert ranked_feed(feed_query(), 'unanswered').total == 2
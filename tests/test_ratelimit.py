@@ -0,0 +1,43 @@
+import pytest
+
+
+@pytest.fixture(params=['memory', 'shared'])
+def limited_app(make_app, request):
+    def factory(policy, **overrides):
+        return make_app(RATELIMIT_ENABLED=True, RATELIMIT_BACKEND=request.param,
+                        RATELIMIT_POLICIES={'main.login': policy}, **overrides)
+    return factory
+
+
+def _login(client, email, **kwargs):
+    return client.post('/login', data={'email': email, 'password': 'incorrecta'},
+                       **kwargs).status_code
+
+
+def test_rejected_request_does_not_spend_earlier_scopes(limited_app):
+    app = limited_app({'ip': '3/minute', 'account': '1/minute'})
+    client = app.test_client()
+
+    assert _login(client, 'a@example.com') != 429
+    # La cuenta rechaza el segundo intento; el token de la IP se devuelve
+    assert _login(client, 'a@example.com') == 429
+    assert _login(client, 'b@example.com') != 429
+    assert _login(client, 'c@example.com') != 429
+    assert _login(client, 'd@example.com') == 429
+
+
+def test_ip_limit_uses_forwarded_address_behind_proxy(limited_app):
+    app = limited_app({'ip': '1/minute'}, PROXY_FIX_X_FOR=1)
+    client = app.test_client()
+
+    assert _login(client, 'a@example.com', headers={'X-Forwarded-For': '10.0.0.1'}) != 429
+    assert _login(client, 'a@example.com', headers={'X-Forwarded-For': '10.0.0.2'}) != 429
+    assert _login(client, 'a@example.com', headers={'X-Forwarded-For': '10.0.0.1'}) == 429
+
+
+def test_forwarded_address_is_ignored_without_proxy_fix(limited_app):
+    app = limited_app({'ip': '1/minute'})
+    client = app.test_client()
+
+    assert _login(client, 'a@example.com', headers={'X-Forwarded-For': '10.0.0.1'}) != 429
+    assert _login(client, 'a@example.com', headers={'X-Forwarded-For': '10.0.0.2'}) == 429
@@ -0,0 +1,111 @@
+import asyncio
+import json
+
+from app.asgi import AsyncReadAPI
+from conftest import login, seed
+
+
+def _asgi_get(app, path, query_string=b'', user_id=None):
+    """
+    Ejecuta una petición GET contra AsyncReadAPI y devuelve (status, cuerpo).
+    """
+    asgi = AsyncReadAPI(app)
+    cookie = app.session_interface.get_signing_serializer(app).dumps({'_user_id': str(user_id)})
+    scope = {'type': 'http', 'http_version': '1.1', 'method': 'GET', 'path': path,
+             'root_path': '', 'query_string': query_string, 'scheme': 'http',
+             'server': ('localhost', 80),
+             'headers': [(b'cookie', f"{app.config['SESSION_COOKIE_NAME']}={cookie}".encode())]}
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    async def run():
+        try:
+            await asgi(scope, receive, send)
+        finally:
+            if asgi.engine is not None:
+                await asgi.engine.dispose()
+
+    asyncio.run(run())
+    body = b''.join(message.get('body', b'') for message in messages)
+    return messages[0]['status'], body
+
+
+def test_question_answers_are_paginated(app, client):
+    user_ids, question_ids = seed(app, questions=1, answers_per_question=5)
+    login(client, user_ids[0])
+    url = f'/api/questions/{question_ids[0]}'
+
+    first = client.get(url, query_string={'limit': 2}).get_json()
+    second = client.get(url, query_string={'limit': 2,
+                                           'cursor': first['answers_next_cursor']}).get_json()
+    third = client.get(url, query_string={'limit': 2,
+                                          'cursor': second['answers_next_cursor']}).get_json()
+
+    contents = [answer['content'].split()[1]
+                for page in (first, second, third) for answer in page['answers']]
+    assert contents == ['0-0', '0-1', '0-2', '0-3', '0-4']
+    assert third['answers_next_cursor'] is None
+
+
+def test_asgi_question_answers_are_paginated(app):
+    user_ids, question_ids = seed(app, questions=1, answers_per_question=3)
+    path = f'/api/questions/{question_ids[0]}'
+
+    status, body = _asgi_get(app, path, b'limit=2', user_ids[0])
+    first = json.loads(body)
+    _, body = _asgi_get(app, path, f"limit=2&cursor={first['answers_next_cursor']}".encode(),
+                        user_ids[0])
+    second = json.loads(body)
+
+    assert status == 200
+    assert len(first['answers']) == 2
+    assert len(second['answers']) == 1
+    assert second['answers_next_cursor'] is None
+
+
+def test_asgi_missing_question_matches_flask_404(app, client):
+    user_ids, question_ids = seed(app, questions=1)
+    login(client, user_ids[0])
+    path = f'/api/questions/{question_ids[0] + 1}'
+
+    status, body = _asgi_get(app, path, user_id=user_ids[0])
+    expected = client.get(path)
+
+    assert status == expected.status_code == 404
+    assert body == expected.get_data()
+
+
+def _jwt_headers(app, client, user_id):
+    from flask_jwt_extended import create_access_token
+    # La extensión JWT se carga antes de la primera petición (ver app/lazy.py)
+    assert client.get('/api/v1/feed').status_code == 401
+    with app.app_context():
+        return {'Authorization': f'Bearer {create_access_token(identity=str(user_id))}'}
+
+
+def test_v1_question_returns_answers_cursor(app, client):
+    user_ids, question_ids = seed(app, questions=1, answers_per_question=3)
+    headers = _jwt_headers(app, client, user_ids[0])
+
+    page = client.get(f'/api/v1/questions/{question_ids[0]}',
+                      query_string={'limit': 2, 'fields': 'id,answers'}, headers=headers).get_json()
+
+    assert set(page) == {'id', 'answers', 'answers_next_cursor'}
+    assert len(page['answers']) == 2
+    assert page['answers_next_cursor']
+
+
+def test_v1_timestamps_are_utc(app, client):
+    user_ids, question_ids = seed(app, questions=1, answers_per_question=1)
+    headers = _jwt_headers(app, client, user_ids[0])
+
+    feed = client.get('/api/v1/feed', headers=headers).get_json()
+    activity = client.get(f'/api/v1/users/{user_ids[0]}/activity', headers=headers).get_json()
+
+    assert feed['items'][0]['created_at'].endswith('Z')
+    assert activity['items'][0]['created_at'].endswith('Z')
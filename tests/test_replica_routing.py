@@ -0,0 +1,85 @@
+import shutil
+import time
+
+import pytest
+
+from app import db
+from app.models import Answer
+from app.routing import STICKY_KEY
+from conftest import login, seed
+
+
+@pytest.fixture
+def replicated(make_app, tmp_path):
+    """
+    Aplicación con una base principal y una réplica en dos archivos SQLite.
+    La réplica es una copia de la principal tomada después de sembrarla, así
+    que lo escrito después solo está en la principal, como en una réplica
+    atrasada. Devuelve (app, usuarios, preguntas).
+    """
+    replica_url = f"sqlite:///{tmp_path / 'replica.db'}"
+    app = make_app(DATABASE_REPLICA_URLS=[replica_url], FRAGMENT_CACHE_BACKEND='null')
+    user_ids, question_ids = seed(app, questions=1, answers_per_question=1)
+    with app.app_context():
+        db.engine.dispose()
+    shutil.copy(tmp_path / 'test.db', tmp_path / 'replica.db')
+    return app, user_ids, question_ids
+
+
+def _answer(client, question_id, content):
+    return client.post(f'/answer/{question_id}', data={'content': content})
+
+
+def test_writes_go_to_the_primary(replicated):
+    app, user_ids, question_ids = replicated
+    client = app.test_client()
+    login(client, user_ids[1])
+
+    assert _answer(client, question_ids[0], 'Respuesta nueva en la principal').status_code == 302
+
+    with app.app_context():
+        primary = db.session.query(Answer.content).all()
+        replica = db.get_engine(app, bind='replica_0').execute(
+            db.select(Answer.content)).all()
+    assert ('Respuesta nueva en la principal',) in primary
+    assert ('Respuesta nueva en la principal',) not in replica
+
+
+def test_reads_own_writes_within_sticky_window(replicated):
+    app, user_ids, question_ids = replicated
+    client = app.test_client()
+    login(client, user_ids[1])
+    _answer(client, question_ids[0], 'Respuesta recién escrita')
+
+    with client.session_transaction() as session:
+        assert session[STICKY_KEY] > time.time()
+    page = client.get(f'/question/{question_ids[0]}').get_data(as_text=True)
+
+    assert 'Respuesta recién escrita' in page
+
+
+def test_reads_from_replica_after_sticky_window(replicated):
+    app, user_ids, question_ids = replicated
+    client = app.test_client()
+    login(client, user_ids[1])
+    _answer(client, question_ids[0], 'Respuesta que la réplica no tiene')
+
+    with client.session_transaction() as session:
+        session[STICKY_KEY] = time.time() - 1
+    page = client.get(f'/question/{question_ids[0]}').get_data(as_text=True)
+
+    assert 'Respuesta 0-0' in page
+    assert 'Respuesta que la réplica no tiene' not in page
+
+
+def test_falls_back_to_primary_when_replica_is_down(make_app, tmp_path):
+    missing = tmp_path / 'no-existe' / 'replica.db'
+    app = make_app(DATABASE_REPLICA_URLS=[f'sqlite:///{missing}'], FRAGMENT_CACHE_BACKEND='null')
+    user_ids, question_ids = seed(app, questions=1, answers_per_question=1)
+    client = app.test_client()
+    login(client, user_ids[1])
+
+    response = client.get(f'/question/{question_ids[0]}')
+
+    assert response.status_code == 200
+    assert 'Respuesta 0-0' in response.get_data(as_text=True)
@@ -0,0 +1,43 @@
+from app import db, search_index
+from app.models import Question
+from conftest import seed
+
+
+def _insert(app, question_id, title, user_id, push=False):
+    with app.app_context():
+        question = Question(id=question_id, title=title, content='Contenido de la pregunta',
+                            user_id=user_id)
+        db.session.add(question)
+        db.session.commit()
+        if push:
+            # Como el trabajo de indexación después de crear la pregunta
+            search_index.index_question(question)
+
+
+def _search(app, query):
+    with app.app_context():
+        return search_index.search(query)
+
+
+def test_pushed_higher_id_does_not_skip_lower_id_committed_later(app):
+    user_ids, question_ids = seed(app, questions=1)
+    assert _search(app, 'pregunta') == question_ids
+    base = question_ids[-1]
+
+    _insert(app, base + 2, 'Ordenar listas enlazadas', user_ids[0], push=True)
+    _insert(app, base + 1, 'Recorrer arboles binarios', user_ids[0])
+
+    assert _search(app, 'arboles') == [base + 1]
+    assert _search(app, 'enlazadas') == [base + 2]
+
+
+def test_catch_up_revisits_ids_below_the_watermark(app):
+    user_ids, question_ids = seed(app, questions=1)
+    base = question_ids[-1]
+    _insert(app, base + 2, 'Ordenar listas enlazadas', user_ids[0])
+    assert _search(app, 'enlazadas') == [base + 2]
+
+    # Un id menor que la marca de agua que se confirmó después
+    _insert(app, base + 1, 'Recorrer arboles binarios', user_ids[0])
+
+    assert _search(app, 'arboles') == [base + 1]
@@ -0,0 +1,55 @@
+from app import db
+from app.models import Question
+from app.similarity import index_question
+from conftest import login, seed
+
+TITLE = 'Cómo ordenar un diccionario por sus valores en Python'
+CONTENT = ('Tengo un diccionario con nombres y puntajes y quiero recorrerlo '
+           'de mayor a menor puntaje sin perder las claves originales.')
+
+
+def _add_question(app, user_id, title, content):
+    with app.app_context():
+        question = Question(title=title, content=content, user_id=user_id)
+        db.session.add(question)
+        db.session.flush()
+        index_question(question.id, title, content)
+        db.session.commit()
+        return question.id
+
+
+def test_exact_title_matches_while_typing(app, client):
+    user_ids, _ = seed(app, questions=1)
+    question_id = _add_question(app, user_ids[0], TITLE, CONTENT)
+    _add_question(app, user_ids[0], 'Error al instalar paquetes con pip en Windows',
+                  'Al ejecutar pip install aparece un error de permisos en la carpeta del sistema.')
+    login(client, user_ids[1])
+
+    found = client.get('/questions/similar', query_string={'title': TITLE}).get_json()
+
+    assert [item['id'] for item in found] == [question_id]
+    assert found[0]['score'] == 1.0
+
+
+def test_exact_title_matches_with_partial_content(app, client):
+    user_ids, _ = seed(app, questions=1)
+    question_id = _add_question(app, user_ids[0], TITLE, CONTENT)
+    login(client, user_ids[1])
+
+    found = client.get('/questions/similar',
+                       query_string={'title': TITLE, 'content': 'Tengo un'}).get_json()
+
+    assert question_id in [item['id'] for item in found]
+
+
+def test_same_title_with_other_content_is_not_a_duplicate(app, client):
+    user_ids, _ = seed(app, questions=1)
+    _add_question(app, user_ids[0], TITLE, CONTENT)
+    login(client, user_ids[1])
+
+    response = client.post('/ask_question', data={
+        'titulo': TITLE,
+        'detalle': 'Necesito invertir el orden de una lista de tuplas según el segundo elemento.',
+        'etiquetas': 'python'})
+
+    assert response.status_code == 302
@@ -0,0 +1,90 @@
+import re
+
+import pytest
+
+from app import db
+from app.models import Question, Answer
+from conftest import login, seed
+
+
+@pytest.fixture
+def csrf_app(make_app):
+    return make_app(WTF_CSRF_ENABLED=True)
+
+
+def _csrf_token(client, question_id):
+    html = client.get(f'/question/{question_id}').get_data(as_text=True)
+    return re.search(r'name="csrf_token" type="hidden" value="([^"]+)"', html).group(1)
+
+
+def _votes(app, model, target_id):
+    with app.app_context():
+        return db.session.get(model, target_id).total_votes
+
+
+def test_question_vote_without_csrf_token_is_rejected(csrf_app):
+    user_ids, question_ids = seed(csrf_app, questions=1)
+    client = csrf_app.test_client()
+    login(client, user_ids[1])
+
+    response = client.post(f'/question/{question_ids[0]}/vote', data={'value': 'up'})
+
+    assert response.status_code == 400
+    assert _votes(csrf_app, Question, question_ids[0]) == 0
+
+
+def test_answer_vote_without_csrf_token_is_rejected(csrf_app):
+    user_ids, _ = seed(csrf_app, questions=1, answers_per_question=1)
+    client = csrf_app.test_client()
+    login(client, user_ids[0])
+    with csrf_app.app_context():
+        answer_id = db.session.query(Answer.id).scalar()
+
+    response = client.post(f'/answers/{answer_id}/vote', data={'value': 'up'})
+
+    assert response.status_code == 400
+    assert _votes(csrf_app, Answer, answer_id) == 0
+
+
+def test_vote_with_csrf_token_from_question_page(csrf_app):
+    user_ids, question_ids = seed(csrf_app, questions=1)
+    client = csrf_app.test_client()
+    login(client, user_ids[1])
+    token = _csrf_token(client, question_ids[0])
+
+    response = client.post(f'/question/{question_ids[0]}/vote',
+                           data={'value': 'up', 'csrf_token': token})
+
+    assert response.status_code == 302
+    assert _votes(csrf_app, Question, question_ids[0]) == 1
+
+
+def test_invalid_vote_value_is_rejected(app, client):
+    user_ids, question_ids = seed(app, questions=1)
+    login(client, user_ids[1])
+
+    response = client.post(f'/question/{question_ids[0]}/vote', data={'value': 'sideways'})
+
+    assert response.status_code == 400
+
+
+def test_author_cannot_vote_own_question(app, client):
+    user_ids, question_ids = seed(app, questions=1)
+    login(client, user_ids[0])
+
+    response = client.post(f'/question/{question_ids[0]}/vote', data={'value': 'up'})
+
+    assert response.status_code == 403
+    assert _votes(app, Question, question_ids[0]) == 0
+
+
+def test_author_cannot_vote_own_answer(app, client):
+    user_ids, _ = seed(app, questions=1, answers_per_question=1)
+    login(client, user_ids[1])
+    with app.app_context():
+        answer_id = db.session.query(Answer.id).scalar()
+
+    response = client.post(f'/answers/{answer_id}/vote', data={'value': 'down'})
+
+    assert response.status_code == 403
+    assert _votes(app, Answer, answer_id) == 0
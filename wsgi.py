@@ -0,0 +1,12 @@
+"""
+Punto de entrada WSGI de producción:
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+"""
+from dotenv import load_dotenv
+from app import create_app
+
+# Cargar las variables de entorno desde .env antes de leer la configuración
+load_dotenv()
+
+app = create_app()